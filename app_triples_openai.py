@@ -4,9 +4,15 @@ import json, os
 import requests, time
 from typing import Dict, Any
 from dotenv import load_dotenv
+from services.llm_client_service import get_llm_client
+from services.sequence_parser_service import CITATION_PATTERN, CitationStripper, IncrementalSequenceParser, format_sequence
 
 load_dotenv()
 
+# Assistants API endpoints require the beta header on raw HTTP calls
+ASSISTANTS_HEADERS = {"OpenAI-Beta": "assistants=v2"}
+RUN_POLL_INTERVAL = 1  # Seconds between run status checks
+
 #Used the @st.cache_resource decorator on this function. 
 #This Streamlit decorator ensures that the function is only executed once and its result (the OpenAI client) is cached. 
 #Subsequent calls to this function will return the cached client, avoiding unnecessary recreation.
@@ -143,9 +149,9 @@ def parse_response(raw_response):
                 
     return parsed_response
 
-def analyze_company_information(company_name, assistant_id, user_query):
-    global client
-    thread = client.beta.threads.create(
+def build_company_thread(company_name, user_query):
+    # Thread with the structured list-of-lists prompt, shared by the polling and streaming paths
+    return dict(
         #messages=[
         #    {
         #        "role": "user",
@@ -197,11 +203,23 @@ Example output :
             }
         ]
     )
+
+def analyze_company_information(company_name, assistant_id, user_query):
+    # Assistant runs go through the shared pooled client (keep-alive, retries on 429/5xx)
+    llm_client = get_llm_client("openai", api_key=os.getenv("OPENAI_API_KEY"))
+    thread = build_company_thread(company_name, user_query)
     
-    run = client.beta.threads.runs.create_and_poll(
-        thread_id=thread.id,
-        assistant_id=assistant_id
+    # Create the thread and run in one call, then poll the run until it finishes
+    run = llm_client.post_json(
+        "threads/runs",
+        {"assistant_id": assistant_id, "thread": thread},
+        headers=ASSISTANTS_HEADERS
     )
+    while run["status"] in ("queued", "in_progress", "cancelling"):
+        time.sleep(RUN_POLL_INTERVAL)
+        run = llm_client.get_json(f"threads/{run['thread_id']}/runs/{run['id']}", headers=ASSISTANTS_HEADERS)
+    if run["status"] != "completed":
+        raise RuntimeError(f"Assistant run ended with status {run['status']}: {run.get('last_error')}")
     
     # Polling loop to wait for a response in the thread
     messages = []
@@ -210,7 +228,11 @@ Example output :
     wait_time = 2  # Seconds to wait between retries
 
     while retries < max_retries:
-        messages = list(client.beta.threads.messages.list(thread_id=thread.id, run_id=run.id))
+        messages = llm_client.get_json(
+            f"threads/{run['thread_id']}/messages",
+            params={"run_id": run["id"]},
+            headers=ASSISTANTS_HEADERS
+        )["data"]
         if messages:  # If we receive any messages, break the loop
             break
         retries += 1
@@ -220,16 +242,60 @@ Example output :
     if not messages:
         raise TimeoutError("No messages were returned after polling.")
 
-    message_content = messages[0].content[0].text
-    annotations = message_content.annotations
+    message_content = messages[0]["content"][0]["text"]
+    annotations = message_content["annotations"]
     #citations = []
     for index, annotation in enumerate(annotations):
-        message_content.value = message_content.value.replace(annotation.text, "")
+        message_content["value"] = message_content["value"].replace(annotation["text"], "")
         #if file_citation := getattr(annotation, "file_citation", None):
         #    cited_file = client.files.retrieve(file_citation.file_id)
         #    citations.append(f"[{index}] {cited_file.filename}")
 
-    return message_content.value
+    return message_content["value"]
+
+def stream_company_information(company_name, assistant_id, user_query):
+    """
+    Streaming variant of analyze_company_information
+    
+    Starts the run with stream=True and consumes its server-sent events instead
+    of polling. Yields the rendered response so far each time a sequence
+    completes; the last value matches parse_response on the full message.
+    """
+    llm_client = get_llm_client("openai", api_key=os.getenv("OPENAI_API_KEY"))
+    payload = {"assistant_id": assistant_id, "thread": build_company_thread(company_name, user_query), "stream": True}
+    
+    parser = IncrementalSequenceParser()
+    # File-search citation markers are stripped before parsing, as in the polling path
+    citations = CitationStripper()
+    raw_response = ""
+    parsed_response = ""
+    start_time = time.time()
+
+    def render(text):
+        nonlocal parsed_response
+        completed = parser.feed(text)
+        # One delta can complete several sequences; number them from the first
+        for index, sequence in enumerate(completed, start=parser.count - len(completed) + 1):
+            if index == 1:
+                print(f"Time to first sequence: {time.time() - start_time:.2f} secs")
+            # parse_response ends every sequence with a newline
+            parsed_response += format_sequence(index, sequence) + "\n"
+            yield parsed_response
+
+    for event, data in llm_client.stream_events("threads/runs", payload, headers=ASSISTANTS_HEADERS):
+        if event in ("thread.run.failed", "thread.run.cancelled", "thread.run.expired", "error"):
+            raise RuntimeError(f"Assistant run ended with {event}: {data}")
+        if event != "thread.message.delta":
+            continue
+        for part in json.loads(data)["delta"].get("content", []):
+            text = part.get("text", {}).get("value", "")
+            raw_response += text
+            yield from render(citations.feed(text))
+    yield from render(citations.flush())
+    
+    print(f"Streamed response in {time.time() - start_time:.2f} secs")
+    if parser.count == 0:
+        yield parse_response(CITATION_PATTERN.sub("", raw_response))
 
 def main():
     st.title("Link Logic - Insights Simplified for the Time-Strapped Investor!")
@@ -237,8 +303,18 @@ def main():
     company_name = st.selectbox("Select the company name:", options=["Reliance"])
     user_query = st.text_area("Enter your query:", placeholder = "Reliance in healthcare")
 
+    stream_response = st.checkbox("Stream response", value=True)
+
     if st.button("Analyze"):
         global assistant1
+        if stream_response:
+            # Show each sequence as soon as it completes, then settle into the usual text area
+            placeholder = st.empty()
+            response = ""
+            for response in stream_company_information(company_name, assistant1.id, user_query):
+                placeholder.text(response)
+            placeholder.text_area("Response", response, height=400)
+            return
         raw_response = analyze_company_information(company_name, assistant1.id, user_query)
         response = parse_response(raw_response)
         st.text_area("Response", response, height=400)
@@ -1,34 +1,33 @@
 import numpy as np
-from typing import List, Dict, Tuple, Set, Optional
-from sentence_transformers import SentenceTransformer, util
+from typing import Iterator, List, Dict, Tuple, Set, Optional
 import networkx as nx
 import torch
-#import torch.nn.functional as F
+import torch.nn.functional as F
 from dataclasses import dataclass
 from collections import defaultdict
+from contextlib import contextmanager, nullcontext
 from dotenv import load_dotenv
-import os, requests
+import os, sys, requests, hashlib
 import random
+import threading
+import time
 import streamlit as st
 import json
-from utils import tuples_to_list, generate_embeddings
+from utils import tuples_to_list, generate_embeddings, generate_embeddings_batch, get_sentence_transformer, EMBEDDING_MODEL_NAME
+from services.embedding_store_service import EmbeddingStore
+from services import ann_index_service
+from services.query_cache_service import QUERY_CACHE_MODEL_NAME, SemanticQueryCache
+from services.llm_client_service import get_llm_client
+from services.sequence_parser_service import IncrementalSequenceParser, format_sequence
+from services.compact_graph_service import (
+    AdjacencySnapshot, CompactTripleGraph, EdgeEmbeddingView, EdgeKeyView, EdgeRowView, EmbeddingTable,
+    RelationIndexView, StoredEmbeddingView, TripleEdgeView, TripleIdSet
+)
 
 load_dotenv()
 
 groq_api_key = os.getenv('GROQ_API_KEY')
 
-def find_cosine_similarity(embedding1, embedding2):
-  global model
-  # Encode the texts to get their embeddings
-  #embedding1 = model.encode(text1, convert_to_tensor=True)
-  #embedding2 = model.encode(text2, convert_to_tensor=True)
-  
-  # Compute cosine similarity
-  cosine_sim = util.pytorch_cos_sim(embedding1, embedding2)
-  
-  # Print the cosine similarity score
-  return cosine_sim.item()
-
 def parse_response(raw_response):    
     # Example raw response as a string
     #raw_response = "[[\"entity1\", \"entity2\", \"entity3\"], [\"entity4\", \"entity5\", \"entity6\"]]"
@@ -70,7 +69,10 @@ class Triple:
     """
     Represents a knowledge graph triple (head, relation, tail)
     Using dataclass for automatic implementation of __eq__, __hash__, etc.
+    Slotted so large result sets carry no per-instance __dict__
     """
+    __slots__ = ('head', 'relation', 'tail')
+
     head: str
     relation: str
     tail: str
@@ -83,7 +85,14 @@ class KnowledgeGraphRAG:
         self,
         embedding_model: str = 'all-MiniLM-L6-v2',
         device: Optional[str] = None,
-        seed: int = 42
+        seed: int = 42,
+        embedding_cache_dir: Optional[str] = '.embedding_cache',
+        ann_backend: str = 'hnsw',
+        ann_params: Optional[Dict] = None,
+        ann_candidate_pool: int = 100,
+        graph_backend: str = 'networkx',
+        embedding_dtype: Optional[torch.dtype] = None,
+        multigraph: bool = False
         ):
         """
         Initialize RAG system with embedding model and empty knowledge graph
@@ -92,6 +101,13 @@ class KnowledgeGraphRAG:
             embedding_model: Name of the sentence-transformers model to use
             device: Device to run the model on ('cpu', 'cuda', etc.)
             seed: Random seed for reproducibility
+            embedding_cache_dir: Directory of the persistent embedding store (None disables it)
+            ann_backend: Index used by build_ann_index ('hnsw', 'ivfpq' or 'exact')
+            ann_params: Backend parameters passed to the index
+            ann_candidate_pool: Candidates fetched from the ANN index before exact re-ranking
+            graph_backend: 'networkx' or 'compact' (interned ids, CSR adjacency, contiguous embeddings)
+            embedding_dtype: Storage dtype of the embedding matrices (compact defaults to float16)
+            multigraph: Keep every relation between a pair; edges are keyed by (head, relation, tail)
         """
         # Set deterministic behavior across all libraries
         self._set_deterministic_settings(seed)
@@ -99,13 +115,63 @@ class KnowledgeGraphRAG:
         # Determine device and initialize encoder
         self.device = device or ('cuda' if torch.cuda.is_available() else 'cpu')
         print(f"Using device: {self.device}")
-        self.encoder = self._init_encoder(embedding_model)
+        self.embedding_model = embedding_model
         
+        # Persistent store so already-seen texts are never re-encoded
+        self.embedding_store: Optional[EmbeddingStore] = None
+        if embedding_cache_dir is not None:
+            self.embedding_store = EmbeddingStore(embedding_cache_dir, EMBEDDING_MODEL_NAME)
+
         # Initialize graph and embedding storage
-        self.knowledge_graph = nx.DiGraph()
-        self.node_embeddings: Dict[str, torch.Tensor] = {}
-        self.edge_embeddings: Dict[Tuple[str, str], torch.Tensor] = {}
-        self.triple_to_edge: Dict[Triple, Tuple[str, str]] = {}
+        self.multigraph = multigraph
+        if graph_backend == 'networkx':
+            self.embedding_dtype = embedding_dtype or torch.float32
+            self.knowledge_graph = nx.MultiDiGraph() if multigraph else nx.DiGraph()
+            self.node_embeddings: Dict[str, torch.Tensor] = {}
+            self.edge_embeddings: Dict[Tuple[str, str], torch.Tensor] = {}
+        elif graph_backend == 'compact':
+            # Edge embeddings are served from the store or the edge matrix and its row norms
+            # (one copy), node embeddings from the memory-mapped store when there is one
+            self.embedding_dtype = embedding_dtype or torch.float16
+            self.knowledge_graph = CompactTripleGraph(multigraph=multigraph)
+            if self.embedding_store is not None:
+                self.node_embeddings = StoredEmbeddingView(self.embedding_store, self.device)
+            else:
+                self.node_embeddings = EmbeddingTable(dtype=self.embedding_dtype, device=self.device)
+            self.edge_embeddings = EdgeEmbeddingView(self)
+        else:
+            raise ValueError(f"Unsupported graph backend: {graph_backend}")
+        self.graph_backend = graph_backend
+        self._adjacency_cache: Optional[AdjacencySnapshot] = None
+        self.triple_to_edge: Dict[Triple, Tuple[str, ...]] = {}
+
+        # Contiguous, L2-normalized edge matrix kept in sync with edge_embeddings
+        # Removed edges leave a tombstone (key None, alive False) so row numbers stay stable
+        self._edge_keys: List[Optional[Tuple[str, str]]] = []
+        self._edge_rows: Dict[Tuple[str, str], int] = {}
+        self._edge_matrix: Optional[torch.Tensor] = None
+        self._edge_alive: Optional[torch.Tensor] = None
+        # L2 norm of each row before normalization, so raw embeddings can be recovered
+        self._edge_norms: Optional[torch.Tensor] = None
+
+        # Inverted index relation -> edge matrix rows, for relation filters and boosts
+        self.relation_index: Dict[str, Set[int]] = defaultdict(set)
+        self._edge_relations: List[Optional[str]] = []
+
+        if graph_backend == 'compact':
+            # Edge matrix rows are the compact graph's edge ids, so keys, rows, relations
+            # and triples are read off its id arrays instead of per-edge Python objects
+            self.triple_to_edge = TripleEdgeView(self.knowledge_graph, Triple)
+            self._edge_keys = EdgeKeyView(self.knowledge_graph)
+            self._edge_rows = EdgeRowView(self.knowledge_graph)
+            self.relation_index = RelationIndexView(self.knowledge_graph)
+
+        # Optional ANN index over edge matrix rows [0, _ann_size); retrieval uses it once built
+        self.ann_backend = ann_backend
+        self.ann_params = ann_params or {}
+        self.ann_candidate_pool = ann_candidate_pool
+        self.ann_index = None
+        self._ann_size = 0
 
     def _set_deterministic_settings(self, seed: int) -> None:
         """
@@ -128,20 +194,13 @@ class KnowledgeGraphRAG:
         # Set hash seed for consistent dictionary ordering
         os.environ['PYTHONHASHSEED'] = str(seed)
         
-    def _init_encoder(self, model_name: str):
+    @property
+    def encoder(self):
         """
-        Initialize the encoder with deterministic settings
-        Ensures consistent behavior across runs
+        SentenceTransformer encoder, loaded on first access from the shared model registry
+        Embeddings are computed with utils.generate_embeddings, so most runs never load it
         """
-        # Wrap encoder.encode with no_grad for determinism
-        with torch.no_grad():
-            encoder = SentenceTransformer(model_name, device=self.device)
-            
-            # Freeze parameters for consistency
-            for param in encoder.parameters():
-                param.requires_grad = False
-            
-            return encoder
+        return get_sentence_transformer(self.embedding_model, self.device)
 
     def _compute_embedding(self, text: str) -> torch.Tensor:
         """
@@ -152,11 +211,19 @@ class KnowledgeGraphRAG:
             # Normalize text for consistent processing
             text = ' '.join(text.lower().split())
             
+            # Reuse a stored vector when this text has been encoded before
+            cached = self.embedding_store.get(text) if self.embedding_store is not None else None
+            if cached is not None:
+                return torch.from_numpy(cached).unsqueeze(0).to(self.device)
+
             # Compute embedding
             #embedding = self.encoder.encode(text, convert_to_tensor=True)
             embedding = generate_embeddings(text)
             # Ensure consistent numerical precision
             embedding = embedding.to(dtype=torch.float32)
+
+            if self.embedding_store is not None:
+                self.embedding_store.put(text, embedding.cpu().numpy())
             
             # Sort for consistent ordering
             #embedding = torch.sort(embedding)[0]
@@ -173,10 +240,14 @@ class KnowledgeGraphRAG:
             tail: Target node of the triple
         """
         try:
-            triple = Triple(head, relation, tail)
-            
+            if self.graph_backend == 'compact':
+                head, relation, tail = sys.intern(head), sys.intern(relation), sys.intern(tail)
             # Add to graph with deterministic ordering
-            self.knowledge_graph.add_edge(head, tail, relation=relation)
+            self._adjacency_cache = None
+            if self.multigraph:
+                self.knowledge_graph.add_edge(head, tail, key=relation, relation=relation)
+            else:
+                self.knowledge_graph.add_edge(head, tail, relation=relation)
             
             # Compute node embeddings if not already present
             for node in sorted([head, tail]):  # Sort for consistency
@@ -185,18 +256,345 @@ class KnowledgeGraphRAG:
                     
             # Compute edge embedding
             edge_text = f"{head} {relation} {tail}"
-            edge_key = (head, tail)
-            self.edge_embeddings[edge_key] = self._compute_embedding(edge_text)
-            self.triple_to_edge[triple] = edge_key
+            edge_key = self._edge_key(head, relation, tail)
+            self._store_edge_embedding(edge_key, relation, self._compute_embedding(edge_text))
+            if self.graph_backend != 'compact':
+                self.triple_to_edge[Triple(head, relation, tail)] = edge_key
             
         except Exception as e:
             raise ValueError(f"Failed to add triple: {e}")
+
+    def _compute_embeddings(
+        self,
+        texts: List[str],
+        batch_size: int = 64
+    ) -> Dict[str, torch.Tensor]:
+        """
+        Compute embeddings for many texts, encoding only the ones not already stored
+        
+        Args:
+            texts: Raw texts to embed (duplicates are fine)
+            batch_size: Texts per encoder forward pass
+                
+        Returns:
+            Dict of normalized text -> [1, hidden_size] embedding
+        """
+        # Normalize and dedupe while keeping first-seen order
+        normalized = list(dict.fromkeys(' '.join(text.lower().split()) for text in texts))
+
+        embeddings: Dict[str, torch.Tensor] = {}
+        missing: List[str] = []
+        for text in normalized:
+            cached = self.embedding_store.get(text) if self.embedding_store is not None else None
+            if cached is not None:
+                embeddings[text] = torch.from_numpy(cached).unsqueeze(0).to(self.device)
+            else:
+                missing.append(text)
+
+        if missing:
+            print(f"Encoding {len(missing)} of {len(normalized)} unique texts")
+            encoded = generate_embeddings_batch(missing, batch_size=batch_size)
+            encoded = encoded.to(dtype=torch.float32)
+            if self.embedding_store is not None:
+                self.embedding_store.put_many(missing, encoded.cpu().numpy())
+            for text, embedding in zip(missing, encoded):
+                embeddings[text] = embedding.unsqueeze(0).to(self.device)
+
+        return embeddings
+
+    def add_triples_bulk(
+        self,
+        triples: List[Tuple[str, str, str]],
+        batch_size: int = 64
+    ) -> None:
+        """
+        Add many knowledge triples at once with batched embedding
+        
+        Node and edge texts are deduped across the whole list and encoded in
+        padded batches, then everything is inserted into the graph in one go.
+        The end state matches calling add_triple for each triple in order.
+        
+        Args:
+            triples: (head, relation, tail) tuples
+            batch_size: Texts per encoder forward pass
+        """
+        try:
+            triples = list(dict.fromkeys(tuple(triple) for triple in triples))
+            if self.graph_backend == 'compact':
+                triples = [tuple(sys.intern(part) for part in triple) for triple in triples]
+            nodes = sorted({node for head, _, tail in triples for node in (head, tail)})
+            new_nodes = [node for node in nodes if node not in self.node_embeddings]
+            edge_texts = [f"{head} {relation} {tail}" for head, relation, tail in triples]
+
+            embeddings = self._compute_embeddings(new_nodes + edge_texts, batch_size)
+            normalize = lambda text: ' '.join(text.lower().split())
+
+            self._adjacency_cache = None
+            if self.multigraph:
+                self.knowledge_graph.add_edges_from(
+                    (head, tail, relation, {'relation': relation}) for head, relation, tail in triples
+                )
+            else:
+                self.knowledge_graph.add_edges_from(
+                    (head, tail, {'relation': relation}) for head, relation, tail in triples
+                )
+            for node in new_nodes:
+                self.node_embeddings[node] = embeddings[normalize(node)]
+            for (head, relation, tail), edge_text in zip(triples, edge_texts):
+                edge_key = self._edge_key(head, relation, tail)
+                self._store_edge_embedding(edge_key, relation, embeddings[normalize(edge_text)])
+                if self.graph_backend != 'compact':
+                    self.triple_to_edge[Triple(head, relation, tail)] = edge_key
+
+        except Exception as e:
+            raise ValueError(f"Failed to add triples: {e}")
+
+    def _edge_key(self, head: str, relation: str, tail: str) -> Tuple[str, ...]:
+        """
+        Key of the edge a triple lives on: (head, tail), or (head, relation, tail) in multigraph mode
+        """
+        return (head, relation, tail) if self.multigraph else (head, tail)
+
+    def _store_edge_embedding(self, edge_key: Tuple[str, ...], relation: str, embedding: torch.Tensor) -> None:
+        """
+        Record an edge embedding; the compact backend keeps only the normalized matrix row and its norm
+        """
+        if self.graph_backend != 'compact':
+            self.edge_embeddings[edge_key] = embedding
+        self._index_edge(edge_key, relation, embedding)
+
+    def _index_edge(self, edge_key: Tuple[str, ...], relation: str, embedding: torch.Tensor) -> None:
+        """
+        Write an edge's normalized embedding into the contiguous edge matrix
+        Re-adding an existing edge key overwrites its row in place
+        """
+        embedding = embedding.reshape(-1).to(torch.float32)
+        vector = F.normalize(embedding, dim=0)
+        if self.graph_backend == 'compact':
+            # The graph already assigned the edge id; its arrays carry key and relation
+            row = self._edge_rows[edge_key]
+            self._reserve_edge_rows(row + 1, vector.shape[0])
+            self._write_edge_row(row, vector, embedding)
+            return
+
+        row = self._edge_rows.get(edge_key)
+        if row is None:
+            row = len(self._edge_keys)
+            self._reserve_edge_rows(row + 1, vector.shape[0])
+            self._edge_keys.append(edge_key)
+            self._edge_relations.append(None)
+            self._edge_rows[edge_key] = row
+        self._write_edge_row(row, vector, embedding)
+
+        # A simple graph can change the relation carried by an existing row
+        previous_relation = self._edge_relations[row]
+        if previous_relation != relation:
+            if previous_relation is not None:
+                self._unindex_relation(previous_relation, row)
+            self.relation_index[relation].add(row)
+            self._edge_relations[row] = relation
+
+    def _reserve_edge_rows(self, size: int, dim: int) -> None:
+        """
+        Make room for `size` edge matrix rows, growing geometrically so appends stay amortized O(1)
+        """
+        current = 0 if self._edge_matrix is None else self._edge_matrix.shape[0]
+        if size <= current:
+            return
+        capacity = max(1024, 2 * current, size)
+        grown = torch.zeros((capacity, dim), dtype=self.embedding_dtype, device=self.device)
+        grown_alive = torch.zeros(capacity, dtype=torch.bool, device=self.device)
+        grown_norms = torch.zeros(capacity, dtype=torch.float32, device=self.device)
+        if self._edge_matrix is not None:
+            grown[:current] = self._edge_matrix
+            grown_alive[:current] = self._edge_alive
+            grown_norms[:current] = self._edge_norms
+        self._edge_matrix = grown
+        self._edge_alive = grown_alive
+        self._edge_norms = grown_norms
+
+    def _write_edge_row(self, row: int, vector: torch.Tensor, embedding: torch.Tensor) -> None:
+        self._edge_matrix[row] = vector
+        self._edge_alive[row] = True
+        self._edge_norms[row] = embedding.norm()
+
+    def _unindex_relation(self, relation: str, row: int) -> None:
+        rows = self.relation_index[relation]
+        rows.discard(row)
+        if not rows:
+            del self.relation_index[relation]
+
+    def remove_triple(self, head: str, relation: str, tail: str) -> bool:
+        """
+        Remove a knowledge triple from the graph
         
+        In a simple graph the (head, tail) edge is only dropped if it still
+        carries this relation; nodes left without any edge are dropped too.
+        
+        Args:
+            head: Source node of the triple
+            relation: Relationship between head and tail
+            tail: Target node of the triple
+                
+        Returns:
+            True if an edge was removed
+        """
+        if self.graph_backend == 'compact':
+            edge_key = self.triple_to_edge.get(Triple(head, relation, tail))
+            if edge_key is None:
+                return False
+            # Edge ids are not reused, so the row is read before the edge goes
+            row = self._edge_rows[edge_key]
+        else:
+            edge_key = self.triple_to_edge.pop(Triple(head, relation, tail), None)
+            if edge_key is None:
+                return False
+        self._adjacency_cache = None
+        if self.multigraph:
+            if not self.knowledge_graph.has_edge(head, tail, key=relation):
+                return False
+            self.knowledge_graph.remove_edge(head, tail, key=relation)
+        else:
+            if not self.knowledge_graph.has_edge(head, tail):
+                return False
+            if self.knowledge_graph[head][tail]['relation'] != relation:
+                return False
+            self.knowledge_graph.remove_edge(head, tail)
+
+        if self.graph_backend != 'compact':
+            self.edge_embeddings.pop(edge_key, None)
+            row = self._edge_rows.pop(edge_key)
+            self._edge_keys[row] = None
+            self._unindex_relation(self._edge_relations[row], row)
+            self._edge_relations[row] = None
+        self._edge_alive[row] = False
+        self._edge_matrix[row] = 0
+
+        for node in (head, tail):
+            if node in self.knowledge_graph and self.knowledge_graph.degree(node) == 0:
+                self.knowledge_graph.remove_node(node)
+                self.node_embeddings.pop(node, None)
+        return True
+
+    def _triple_for_edge(self, edge_key: Tuple[str, ...]) -> Triple:
+        """
+        Rebuild the Triple stored on an edge
+        """
+        if self.multigraph:
+            return Triple(*edge_key)
+        head, tail = edge_key
+        return Triple(head, self.knowledge_graph[head][tail]['relation'], tail)
+
+    def flush_embeddings(self) -> None:
+        """
+        Persist any newly computed embeddings to the on-disk store
+        """
+        if self.embedding_store is not None:
+            self.embedding_store.flush()
+        
+    def build_ann_index(self, backend: Optional[str] = None, **params) -> None:
+        """
+        Build an approximate nearest-neighbour index over the current edges
+        
+        Args:
+            backend: 'hnsw', 'ivfpq' or 'exact' (defaults to the backend given at init)
+            params: Backend parameters, e.g. M/ef_search for hnsw or nlist/m/nprobe for ivfpq
+        """
+        backend = backend or self.ann_backend
+        params = {**self.ann_params, **params}
+        edge_count = len(self._edge_keys)
+        self.ann_index = ann_index_service.create_ann_index(backend, self._edge_matrix.shape[1], **params)
+        self.ann_index.build(self._edge_matrix[:edge_count].to(torch.float32).cpu().numpy())
+        self._ann_size = edge_count
+
+    def _edge_digest(self, count: int) -> str:
+        """
+        Fingerprint of the first `count` edge rows (keys and vectors), used to validate persisted indexes
+
+        The vectors are included because a simple graph overwrites a row in
+        place when the relation between a pair changes, keeping its key.
+        """
+        digest = hashlib.sha256()
+        for edge_key in self._edge_keys[:count]:
+            digest.update(f"{edge_key!r}\x1e".encode('utf-8'))
+        if count:
+            digest.update(self._edge_matrix[:count].cpu().numpy().tobytes())
+        return digest.hexdigest()
+
+    def save_ann_index(self, path: str) -> None:
+        """
+        Persist the ANN index together with a fingerprint of the edges it covers
+        """
+        if self.ann_index is None:
+            raise ValueError("No ANN index has been built")
+        ann_index_service.save_ann_index(self.ann_index, path, {
+            "edge_count": self._ann_size,
+            "edge_digest": self._edge_digest(self._ann_size)
+        })
+
+    def load_ann_index(self, path: str) -> None:
+        """
+        Load a persisted ANN index, refusing it if it was built over different edges or vectors
+        """
+        index, metadata = ann_index_service.load_ann_index(path)
+        edge_count = metadata["edge_count"]
+        # Indexes saved before vectors were fingerprinted carry no edge_digest and are refused too
+        if edge_count > len(self._edge_keys) or metadata.get("edge_digest") != self._edge_digest(edge_count):
+            raise ValueError(f"ANN index at {path} does not match the edges in this graph")
+        self.ann_index = index
+        self._ann_size = edge_count
+
+    def set_ann_search_params(self, **params) -> None:
+        """
+        Tune the recall-vs-latency trade-off (ef_search for hnsw, nprobe for ivfpq)
+        """
+        if self.ann_index is not None:
+            self.ann_index.set_search_params(**params)
+
+    def _score_edges(
+        self,
+        query_vector: torch.Tensor,
+        top_k: int,
+        exact: bool,
+        relations: Optional[List[str]] = None
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        Score candidate edges against a normalized query vector
+        
+        A relation filter scores only the rows listed in the relation index.
+        Otherwise exact mode scores every edge with one matrix-vector product,
+        and ANN mode takes a candidate pool from the index, adds any edges
+        inserted after the index was built, and re-ranks the pool exactly.
+                
+        Returns:
+            (edge rows, cosine scores) aligned tensors
+        """
+        edge_count = len(self._edge_keys)
+        if relations is not None:
+            relation_rows = sorted(set().union(*(self.relation_index.get(relation, ()) for relation in relations)))
+            rows = torch.tensor(relation_rows, dtype=torch.long, device=self._edge_matrix.device)
+        elif exact or self.ann_index is None:
+            rows = torch.arange(edge_count, device=self._edge_matrix.device)
+        else:
+            _, ann_rows = self.ann_index.search(query_vector.cpu().numpy(), max(top_k, self.ann_candidate_pool))
+            rows = torch.cat([
+                torch.from_numpy(ann_rows).to(self._edge_matrix.device),
+                torch.arange(self._ann_size, edge_count, device=self._edge_matrix.device)
+            ])
+
+        # Skip tombstoned rows left behind by remove_triple
+        rows = rows[self._edge_alive[rows]]
+        scores = self._edge_matrix[rows] @ query_vector.to(self._edge_matrix.dtype)
+        return rows, scores.to(torch.float32)
+
     def retrieve_relevant_subgraph(
         self,
         query: str,
         top_k: int = 5,
-        similarity_threshold: float = 0.5
+        similarity_threshold: float = 0.5,
+        exact: bool = False,
+        relations: Optional[List[str]] = None,
+        relation_boost: Optional[Dict[str, float]] = None
     ) -> List[Triple]:
         """
         Retrieve relevant subgraph with deterministic ordering
@@ -205,9 +603,12 @@ class KnowledgeGraphRAG:
             query: Input query text
             top_k: Number of top similar triples to return
             similarity_threshold: Minimum similarity score threshold
+            exact: Score every edge even when an ANN index is loaded (for regression comparison)
+            relations: Only consider edges carrying one of these relations
+            relation_boost: Amount added to the score of edges carrying each relation
         """
-        if not self.edge_embeddings:
-            return []
+        if not self._edge_rows or top_k <= 0:
+            return [], -1, None
             
         # Normalize query
         query = ' '.join(query.lower().split())
@@ -219,52 +620,55 @@ class KnowledgeGraphRAG:
         # Compute query embedding
         with torch.no_grad():
             query_embedding = self._compute_embedding(query)
-        
-        # Use ordered dictionary for consistent ordering
-        from collections import OrderedDict
-        similarities = OrderedDict()
-        
-        # Stack embeddings in deterministic order
-        edge_keys = sorted(self.edge_embeddings.keys())
-        #edge_embeddings_tensor = torch.stack([
-        #    self.edge_embeddings[key] for key in edge_keys
-        #])
-        similarity_scores = []
-        for key in edge_keys:
-            similarity_scores.append(find_cosine_similarity(query_embedding, self.edge_embeddings[key]))
-
-        # Compute similarities with fixed precision
-        #with torch.no_grad():
-        #    similarity_scores = F.cosine_similarity(
-        #        query_embedding.unsqueeze(0),
-        #        edge_embeddings_tensor
-        #    )
-        
-        # Create deterministically ordered pairs
+            query_vector = F.normalize(query_embedding.reshape(-1), dim=0)
+            rows, similarity_scores = self._score_edges(query_vector, top_k, exact, relations)
+
+            for relation, boost in sorted((relation_boost or {}).items()):
+                relation_rows = torch.tensor(sorted(self.relation_index.get(relation, ())), dtype=torch.long, device=rows.device)
+                similarity_scores = similarity_scores + boost * torch.isin(rows, relation_rows)
+        rows = rows.tolist()
+        if not rows:
+            return [], -1, None
+
         print(f"DEBUG : Comparing against similarity threshold : {similarity_threshold}")
-        max_score = -1
-        max_score_triple = None
-        for idx, (head, tail) in enumerate(edge_keys):
-            score = similarity_scores[idx]
-            #print(f"score is {score}")
-            relation = self.knowledge_graph[head][tail]['relation']
-            if score > max_score:
-                max_score = score
-                max_score_triple = Triple(head, relation, tail)
-            if score >= similarity_threshold:
-                #relation = self.knowledge_graph[head][tail]['relation']
-                triple = Triple(head, relation, tail)
-                #print(f"triple : {triple}")
-                similarities[triple] = score
+
+        # Best edge among those scored; ties go to the smallest (head, tail) key
+        max_score = similarity_scores.max().item()
+        max_positions = (similarity_scores == max_score).nonzero().flatten().tolist()
+        max_row = min((rows[position] for position in max_positions), key=lambda row: self._edge_keys[row])
+        max_score_triple = self._triple_for_edge(self._edge_keys[max_row])
+
+        above_threshold = similarity_scores >= similarity_threshold
+        candidate_count = int(above_threshold.sum().item())
+        if candidate_count == 0:
+            return [], max_score, max_score_triple
+
+        # Keep every edge tied with the k-th best score so tie-breaking stays deterministic
+        kth_score = torch.topk(similarity_scores, min(top_k, candidate_count)).values[-1]
+        candidate_positions = ((similarity_scores >= kth_score) & above_threshold).nonzero().flatten().tolist()
+        scored_triples = [
+            (self._triple_for_edge(self._edge_keys[rows[position]]), similarity_scores[position].item())
+            for position in candidate_positions
+        ]
         
         # Sort by score and alphabetically for ties
         sorted_triples = sorted(
-            similarities.items(),
+            scored_triples,
             key=lambda x: (-x[1], x[0].head, x[0].relation, x[0].tail)
         )
         
         return [triple for triple, _ in sorted_triples[:top_k]], max_score, max_score_triple
 
+    def _adjacency(self) -> AdjacencySnapshot:
+        """
+        Sorted in/out CSR adjacency of the current graph, cached until the graph changes
+        """
+        if self.graph_backend == 'compact':
+            return self.knowledge_graph.adjacency()
+        if self._adjacency_cache is None:
+            self._adjacency_cache = AdjacencySnapshot.from_edges(self.knowledge_graph.edges(data='relation'))
+        return self._adjacency_cache
+
     def expand_subgraph(
         self,
         triples: List[Triple],
@@ -274,50 +678,29 @@ class KnowledgeGraphRAG:
         """
         Expand retrieved subgraph by following connections in a deterministic manner
         
+        Frontier-based BFS over precomputed, sorted in/out adjacency arrays: each
+        hop only looks at the nodes discovered by the previous hop, follows both
+        outgoing and incoming edges, and caps neighbours per node in one
+        vectorized step.
+        
         Args:
             triples: Initial set of triples to expand from
             hops: Number of hops to expand
-            max_nodes_per_hop: Maximum number of neighbors to explore per hop
+            max_nodes_per_hop: Maximum number of neighbors to explore per node and direction in each hop
                 
         Returns:
-            List of expanded Triple objects in deterministic order
+            Seed triples in input order followed by discovered triples in
+            (hop, node, neighbour, relation) order
         """
-        # Use sets for efficient membership testing
-        expanded_triples: Set[Triple] = set(triples)
-        seen_nodes: Set[str] = {node for triple in triples 
-                            for node in (triple.head, triple.tail)}
-        
-        for _ in range(hops):
-            new_triples: Set[Triple] = set()
-            
-            # Process triples in deterministic order
-            for triple in sorted(expanded_triples, key=lambda x: (x.head, x.relation, x.tail)):
-                # Process nodes in deterministic order
-                for node in sorted([triple.head, triple.tail]):
-                    # Get neighboring nodes in deterministic order
-                    neighbors = sorted(list(self.knowledge_graph.neighbors(node)))
-                    # Apply max_nodes_per_hop limit
-                    neighbors = neighbors[:max_nodes_per_hop]
-                    
-                    # Process neighbors deterministically
-                    for neighbor in neighbors:
-                        if neighbor not in seen_nodes:
-                            # Check outgoing edges
-                            if self.knowledge_graph.has_edge(node, neighbor):
-                                relation = self.knowledge_graph[node][neighbor]['relation']
-                                new_triples.add(Triple(node, relation, neighbor))
-                            
-                            # Check incoming edges
-                            if self.knowledge_graph.has_edge(neighbor, node):
-                                relation = self.knowledge_graph[neighbor][node]['relation']
-                                new_triples.add(Triple(neighbor, relation, node))
-                            
-                            seen_nodes.add(neighbor)
-                
-            expanded_triples.update(new_triples)
-        
-        # Return sorted list for deterministic ordering
-        return sorted(list(expanded_triples), key=lambda x: (x.head, x.relation, x.tail))
+        seeds = list(dict.fromkeys(triples))
+        seed_nodes = [node for triple in seeds for node in (triple.head, triple.tail)]
+
+        adjacency = self._adjacency()
+        edge_ids = adjacency.expand(seed_nodes, hops, max_nodes_per_hop)
+
+        seed_set = set(seeds)
+        discovered = [Triple(*adjacency.edge_triple(edge_id)) for edge_id in edge_ids.tolist()]
+        return seeds + [triple for triple in discovered if triple not in seed_set]
 
     def generate_context(
         self,
@@ -366,31 +749,232 @@ class KnowledgeGraphRAG:
         else:
             raise ValueError(f"Unsupported format type: {format_type}")
 
-def parse_query_with_groq(
-    query: str,
-    groq_api_key: str,
-    seed: int = 42,
-    llama_model: str = "llama-3.2-11b-text-preview"
-) -> Optional[str]:
+class ReadWriteLock:
     """
-    Enhanced query parsing with deterministic settings
+    Many concurrent readers or one writer
+    
+    Waiting writers block new readers, so a steady stream of queries cannot
+    starve a refresh.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    @contextmanager
+    def read(self):
+        with self._condition:
+            while self._writer or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if self._readers == 0:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writer or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writer = False
+                self._condition.notify_all()
+
+class KnowledgeGraphService:
+    """
+    Long-lived KnowledgeGraphRAG bound to a triples file
+    
+    The graph is built once and then kept in sync with the file: refresh()
+    checks the file's mtime and size, confirms a change with a content hash,
+    and applies only the delta (new triples added, removed triples dropped).
+    The service is shared by every session, so readers of `rag` must hold
+    reading() while refresh() mutates the graph under the write lock.
+    """
+
+    def __init__(self, triples_path: str, **rag_kwargs):
+        """
+        Args:
+            triples_path: File parsed with tuples_to_list
+            rag_kwargs: Passed through to KnowledgeGraphRAG
+        """
+        self.triples_path = triples_path
+        self._rag_kwargs = rag_kwargs
+        self.rag = KnowledgeGraphRAG(**rag_kwargs)
+        self.version = 0
+        # The file's triples as interned id rows, diffed against each new version
+        self._triples = TripleIdSet()
+        # Stat and hash of the last file version applied to the graph
+        self._file_stat: Optional[Tuple[int, int]] = None
+        self._content_hash: Optional[str] = None
+        # Set when a delta failed half-way; the graph is then rebuilt from scratch
+        self._needs_rebuild = False
+        self._failed_hash: Optional[str] = None
+        self._lock = threading.Lock()
+        self._rw_lock = ReadWriteLock()
+
+    def reading(self):
+        """
+        Context manager under which `rag` is not modified
+        """
+        return self._rw_lock.read()
+
+    def _changed_version(self) -> Optional[Tuple[Tuple[int, int], str]]:
+        """
+        (stat, content hash) of the file if its content differs from the applied version, else None
+
+        Cheap stat check first, content hash only when the stat moved
+        """
+        stat = os.stat(self.triples_path)
+        file_stat = (stat.st_mtime_ns, stat.st_size)
+        if file_stat == self._file_stat:
+            return None
+
+        with open(self.triples_path, 'rb') as file:
+            content_hash = hashlib.sha256(file.read()).hexdigest()
+        if content_hash == self._content_hash and not self._needs_rebuild:
+            # Touched but unchanged
+            self._file_stat = file_stat
+            return None
+        return file_stat, content_hash
+
+    def _apply(self, rag: 'KnowledgeGraphRAG', triple_set: TripleIdSet, triples: List[Tuple[str, str, str]], lock) -> None:
+        """
+        Add and remove triples on `rag` so it holds exactly `triples`
+
+        Args:
+            rag: Graph to update
+            triple_set: Triples currently in `rag`, updated on success
+            triples: The file's triples
+            lock: Held only while `rag` is mutated
+        """
+        ids = triple_set.encode(triples)
+        added_ids = triple_set.difference(ids, triple_set.ids)
+        removed_ids = triple_set.difference(triple_set.ids, ids)
+        added, removed = triple_set.decode(added_ids), triple_set.decode(removed_ids)
+        # Parsing happens above; only applying the delta blocks retrieval
+        with lock:
+            print(f"Applying triples delta: {len(added)} added, {len(removed)} removed")
+
+            for triple in removed:
+                rag.remove_triple(*triple)
+            if added:
+                rag.add_triples_bulk(added)
+
+            # One relation per (head, tail) pair: the largest triple wins, as in a full sorted rebuild
+            if not rag.multigraph:
+                graph = rag.knowledge_graph
+                for head, relation, tail in triple_set.pair_winners(
+                    ids, np.concatenate([added_ids, removed_ids])
+                ):
+                    if not graph.has_edge(head, tail) or graph[head][tail]['relation'] != relation:
+                        rag.add_triple(head, relation, tail)
+
+            rag.flush_embeddings()
+            triple_set.ids = ids
+
+    def refresh(self) -> bool:
+        """
+        Bring the graph in line with the triples file
+
+        The file's stat and hash are recorded only once its triples are
+        applied. If applying a delta fails, the graph may be half-updated, so
+        the next refresh rebuilds it from scratch into a new KnowledgeGraphRAG
+        that replaces `rag` only when the build succeeds. A rebuild that fails
+        is not retried until the file changes again.
+
+        Returns:
+            True if the graph changed
+
+        Raises:
+            Whatever adding or removing triples raised; the previous graph keeps serving
+        """
+        with self._lock:
+            changed = self._changed_version()
+            if changed is None:
+                return False
+            file_stat, content_hash = changed
+            if self._needs_rebuild and content_hash == self._failed_hash:
+                return False
+
+            triples = [tuple(triple) for triple in tuples_to_list(self.triples_path)]
+            if self._needs_rebuild:
+                rag, triple_set = KnowledgeGraphRAG(**self._rag_kwargs), TripleIdSet()
+                try:
+                    # Nobody reads the new graph yet, so it is built without the write lock
+                    self._apply(rag, triple_set, triples, nullcontext())
+                except Exception:
+                    self._failed_hash = content_hash
+                    raise
+                with self._rw_lock.write():
+                    self.rag, self._triples = rag, triple_set
+                self._needs_rebuild = False
+                self._failed_hash = None
+            else:
+                try:
+                    self._apply(self.rag, self._triples, triples, self._rw_lock.write())
+                except Exception:
+                    self._needs_rebuild = True
+                    raise
+
+            self._file_stat, self._content_hash = file_stat, content_hash
+            self.version += 1
+            return True
+
+
+@st.cache_resource
+def get_graph_service(triples_path: str = 'unique_output.txt') -> KnowledgeGraphService:
+    """
+    Process-wide graph service shared by every Streamlit session
+    """
+    return KnowledgeGraphService(triples_path)
+
+def refresh_graph(graph_service: KnowledgeGraphService) -> None:
+    """
+    Refresh the shared graph, keeping the last good one if the triples file cannot be applied
+    """
+    try:
+        graph_service.refresh()
+    except Exception as e:
+        print(f"Error refreshing graph, serving version {graph_service.version}: {e}")
+
+@st.cache_resource
+def get_query_cache() -> SemanticQueryCache:
+    """
+    Process-wide answer cache, embedding queries with the shared sentence-transformers encoder
+
+    The encoder is only loaded on the first semantic lookup, and query vectors
+    never reach the graph's persistent embedding store.
+    """
+    def embed_query(query: str) -> np.ndarray:
+        encoder = get_sentence_transformer(QUERY_CACHE_MODEL_NAME)
+        return encoder.encode(query, convert_to_numpy=True, show_progress_bar=False)
+    return SemanticQueryCache(embed_fn=embed_query)
+
+def build_groq_payload(query: str, seed: int = 42, llama_model: str = "llama-3.2-11b-text-preview", stream: bool = False) -> Dict:
+    """
+    Deterministic chat-completion payload shared by the blocking and streaming paths
     
     Args:
         query: Input query text
-        groq_api_key: API key for Groq
         seed: Random seed for reproducibility
         llama_model: Model identifier
+        stream: Ask the server for server-sent events
     """
-    url = "https://api.groq.com/openai/v1/chat/completions"
-    
     # Normalize query
     query = ' '.join(query.lower().split())
     
-    headers = {
-        "Authorization": f"Bearer {groq_api_key}",
-        "Content-Type": "application/json"
-    }
-    
     # Enhanced system message for deterministic behavior
     system_message = """You are a deterministic analytical assistant.
     Process all inputs consistently using these rules:
@@ -414,19 +998,87 @@ def parse_query_with_groq(
         "presence_penalty": 0,
         "max_tokens": 500,
         "seed": seed,
-        "stream": False
+        "stream": stream
     }
+    return payload
+
+def parse_query_with_groq(
+    query: str,
+    groq_api_key: str,
+    seed: int = 42,
+    llama_model: str = "llama-3.2-11b-text-preview"
+) -> Optional[str]:
+    """
+    Enhanced query parsing with deterministic settings
+    
+    Args:
+        query: Input query text
+        groq_api_key: API key for Groq
+        seed: Random seed for reproducibility
+        llama_model: Model identifier
+    """
+    # Shared pooled client: keep-alive connections, bounded concurrency and retries on 429/5xx
+    client = get_llm_client("groq", api_key=groq_api_key)
+    payload = build_groq_payload(query, seed, llama_model)
     
     try:
-        response = requests.post(url, headers=headers, json=payload, timeout=30)
-        response.raise_for_status()
-        raw_response =  response.json()['choices'][0]['message']['content']
+        response = client.chat_completion(payload)
+        raw_response = response['choices'][0]['message']['content']
         parsed_response = parse_response(raw_response)
         return parsed_response
     except Exception as e:
         print(f"Error in API request: {e}")
         return None
 
+def stream_query_with_groq(
+    query: str,
+    groq_api_key: str,
+    seed: int = 42,
+    llama_model: str = "llama-3.2-11b-text-preview"
+) -> Iterator[str]:
+    """
+    Streaming variant of parse_query_with_groq
+    
+    Consumes the response as server-sent events and yields the rendered
+    response so far each time a cause-effect sequence completes, so the first
+    sequence can be shown long before max_tokens have been generated. The last
+    value yielded matches what parse_query_with_groq would have returned.
+    
+    Args:
+        query: Input query text
+        groq_api_key: API key for Groq
+        seed: Random seed for reproducibility
+        llama_model: Model identifier
+    """
+    client = get_llm_client("groq", api_key=groq_api_key)
+    payload = build_groq_payload(query, seed, llama_model, stream=True)
+    
+    parser = IncrementalSequenceParser()
+    raw_response = ""
+    parsed_response = ""
+    start_time = time.time()
+    try:
+        for delta in client.stream_chat_completion(payload):
+            raw_response += delta
+            completed = parser.feed(delta)
+            # One delta can complete several sequences; number them from the first
+            for index, sequence in enumerate(completed, start=parser.count - len(completed) + 1):
+                if index == 1:
+                    print(f"Time to first sequence: {time.time() - start_time:.2f} secs")
+                parsed_response += format_sequence(index, sequence)
+                yield parsed_response
+    except Exception as e:
+        print(f"Error in streaming API request: {e}")
+        return
+    
+    print(f"Streamed response in {time.time() - start_time:.2f} secs")
+    if parser.count == 0 and raw_response:
+        # Not a list of sequences: fall back to the blocking parser on the full text
+        try:
+            yield parse_response(raw_response)
+        except Exception as e:
+            print(f"Error parsing streamed response: {e}")
+
 def createQuery(graph: str, question: str) -> str:
     """
     Create a structured query with deterministic formatting
@@ -476,33 +1128,32 @@ def demonstrate_rag(query, seed):
         if torch.cuda.is_available():
             torch.cuda.manual_seed_all(42)
 
-        # Initialize system
-        rag = KnowledgeGraphRAG()
+        # Shared graph, updated in place when unique_output.txt changes
+        graph_service = get_graph_service('unique_output.txt')
+        refresh_graph(graph_service)
         
-        sample_triples = tuples_to_list('unique_output.txt')
-        print(f"length of list of triples is {len(sample_triples)}")
-        print(sample_triples[:-2])
+        # Another session may be applying a delta; read the graph only under the read lock
+        with graph_service.reading():
+            # A rebuild swaps in a new graph, so take it under the lock too
+            rag = graph_service.rag
+            print(f"Graph version {graph_service.version} with {len(rag.edge_embeddings)} edges")
+            
+            # Retrieve and expand relevant triples
+            relevant_triples, max_score, max_score_triple = rag.retrieve_relevant_subgraph(query, top_k=3, similarity_threshold=0.60)
+            print(f"DEBUG : relevant_triples are {relevant_triples}")
+            print(f"DEBUG : max_score {max_score} max_score_triple {max_score_triple}")
+            if len(relevant_triples) > 0:
+                expanded_triples = rag.expand_subgraph(relevant_triples, hops=1)
         
-        #Create a graph
-        for head, relation, tail in sample_triples:
-            rag.add_triple(head, relation, tail)
+                # Sort triples for consistent output
+                expanded_triples.sort(key=lambda x: (x.head, x.relation, x.tail))
         
-        # Retrieve and expand relevant triples
-        relevant_triples, max_score, max_score_triple = rag.retrieve_relevant_subgraph(query, top_k=3, similarity_threshold=0.60)
-        print(f"DEBUG : relevant_triples are {relevant_triples}")
-        print(f"DEBUG : max_score {max_score} max_score_triple {max_score_triple}")
-        if len(relevant_triples) > 0:
-            expanded_triples = rag.expand_subgraph(relevant_triples, hops=1)
-    
-            # Sort triples for consistent output
-            expanded_triples.sort(key=lambda x: (x.head, x.relation, x.tail))
-    
-            # Generate both natural and structured context
-            natural_context = rag.generate_context(expanded_triples, format_type='natural')
-            structured_context = rag.generate_context(expanded_triples, format_type='structured')
-        else:
-            structured_context = ""
-            natural_context = ""
+                # Generate both natural and structured context
+                natural_context = rag.generate_context(expanded_triples, format_type='natural')
+                structured_context = rag.generate_context(expanded_triples, format_type='structured')
+            else:
+                structured_context = ""
+                natural_context = ""
             
         return {
             'natural_context': natural_context,
@@ -521,11 +1172,23 @@ def generate_analysis():
 
     user_query = st.text_input("Enter your query:", placeholder="How does monsoon season affect Reliance's supply chain?")
 
+    stream_response = st.checkbox("Stream response", value=True)
+
     if st.button("Submit"):
         with st.spinner("Processing your query..."):
-            results = demonstrate_rag(user_query, 42)
-            print(f"DEBUG : results : {results}")
-            if results["structured_context"] != "":
+            graph_service = get_graph_service('unique_output.txt')
+            refresh_graph(graph_service)
+            query_cache = get_query_cache()
+
+            # Exact or near-duplicate questions against the same graph reuse the earlier answer
+            output = query_cache.get(user_query, version=graph_service.version)
+            if output is None:
+                results = demonstrate_rag(user_query, 42)
+                print(f"DEBUG : results : {results}")
+                if not results or results["structured_context"] == "":
+                    st.error("An error occurred while processing the query.")
+                    return
+
                 #st.subheader("Natural Language Context:")
                 #st.write(results['natural_context'])
 
@@ -533,14 +1196,28 @@ def generate_analysis():
                 #st.write(results['structured_context'])
 
                 query = createQuery(results['structured_context'], user_query)
+                if stream_response:
+                    # Render each sequence as soon as its closing bracket arrives
+                    st.subheader("Response:")
+                    placeholder = st.empty()
+                    for output in stream_query_with_groq(query, groq_api_key, 42):
+                        placeholder.text(output)
+                    if output:
+                        query_cache.put(user_query, output, version=graph_service.version)
+                    else:
+                        st.error("Unable to generate a response.")
+                    print(f"DEBUG : query cache stats : {query_cache.stats}")
+                    return
                 output = parse_query_with_groq(query, groq_api_key, 42)
                 if output:
-                    st.subheader("Response:")
-                    st.text(output)
-                else:
-                    st.error("Unable to generate a response.")
+                    query_cache.put(user_query, output, version=graph_service.version)
+            print(f"DEBUG : query cache stats : {query_cache.stats}")
+
+            if output:
+                st.subheader("Response:")
+                st.text(output)
             else:
-                st.error("An error occurred while processing the query.")
+                st.error("Unable to generate a response.")
 
 if __name__ == "__main__":
     generate_analysis()
@@ -0,0 +1,111 @@
+"""
+Benchmark NearDuplicateClusterer on a synthetic syndicated-news corpus
+
+Every story is published several times with small edits (a wire prefix, a
+newsletter footer, a few swapped words), the way Google News returns the same
+wire story from several outlets. The benchmark checks that the copies land in
+one cluster, that distinct stories stay apart, and that the time per article
+stays flat as the corpus grows (linear scaling). For the smallest size it also
+times the all-pairs exact Jaccard comparison MinHash/LSH replaces.
+
+Usage (from the repository root):
+    python benchmarks/bench_near_duplicates.py [max_articles] [copies_per_story]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.near_duplicate_service import NearDuplicateClusterer, WORD_PATTERN
+
+PREFIXES = ["", "Reuters -", "PTI:", "(Bloomberg)", "New Delhi:"]
+SUFFIXES = ["", "Subscribe to our newsletter.", "Catch all the business news here.", "Read more on our app."]
+
+
+def synthetic_corpus(num_articles, copies, words_per_story=400, seed=0):
+    """
+    Returns:
+        tuple: ({key: text}, {key: story id})
+    """
+    rng = random.Random(seed)
+    vocabulary = [f"word{i}" for i in range(20000)]
+    texts, truth = {}, {}
+    story = 0
+    while len(texts) < num_articles:
+        words = rng.choices(vocabulary, k=words_per_story)
+        for copy in range(copies):
+            edited = list(words)
+            for _ in range(rng.randint(0, 4)):
+                edited[rng.randrange(len(edited))] = rng.choice(vocabulary)
+            key = f"story{story}-copy{copy}"
+            texts[key] = " ".join([rng.choice(PREFIXES)] + edited + [rng.choice(SUFFIXES)])
+            truth[key] = story
+            if len(texts) == num_articles:
+                break
+        story += 1
+    return texts, truth
+
+
+def score_clusters(clusters, truth):
+    """
+    Returns:
+        tuple: (stories whose copies all share one cluster, clusters mixing different stories)
+    """
+    cluster_of = {}
+    mixed = 0
+    for representative, duplicates in clusters.items():
+        members = [representative] + duplicates
+        for key in members:
+            cluster_of[key] = representative
+        mixed += len({truth[key] for key in members}) > 1
+    stories = {}
+    for key, story in truth.items():
+        stories.setdefault(story, set()).add(cluster_of[key])
+    intact = sum(len(representatives) == 1 for representatives in stories.values())
+    return intact, len(stories), mixed
+
+
+def exact_all_pairs(texts, threshold=0.8, shingle_size=5):
+    # The quadratic baseline: exact Jaccard similarity over every pair of articles
+    shingles = []
+    for text in texts.values():
+        words = WORD_PATTERN.findall(text.lower())
+        shingles.append({" ".join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1)})
+    pairs = 0
+    for i in range(len(shingles)):
+        for j in range(i + 1, len(shingles)):
+            if len(shingles[i] & shingles[j]) / len(shingles[i] | shingles[j]) >= threshold:
+                pairs += 1
+    return pairs
+
+
+def main():
+    max_articles = int(sys.argv[1]) if len(sys.argv) > 1 else 8000
+    copies = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    clusterer = NearDuplicateClusterer()
+
+    sizes = []
+    size = 1000
+    while size <= max_articles:
+        sizes.append(size)
+        size *= 2
+
+    print(f"{'articles':>9} {'clusters':>9} {'intact':>12} {'mixed':>6} {'seconds':>8} {'ms/article':>11}")
+    for size in sizes:
+        texts, truth = synthetic_corpus(size, copies)
+        start = time.perf_counter()
+        clusters = clusterer.cluster(texts)
+        elapsed = time.perf_counter() - start
+        intact, stories, mixed = score_clusters(clusters, truth)
+        print(f"{size:>9} {len(clusters):>9} {intact:>5}/{stories:<6} {mixed:>6} {elapsed:>8.2f} {1000 * elapsed / size:>11.3f}")
+
+    texts, _ = synthetic_corpus(sizes[0], copies)
+    start = time.perf_counter()
+    exact_all_pairs(texts)
+    print(f"Exact all-pairs Jaccard on {sizes[0]} articles: {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
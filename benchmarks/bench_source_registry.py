@@ -0,0 +1,90 @@
+"""
+Benchmark SourceRegistry link filtering against the substring whitelist it replaced
+
+Builds a synthetic Google News result list mixing whitelisted links,
+subdomains, other sites and other sites that mention a whitelisted domain in
+their path or query string, then times the filtering of every link and counts
+the false positives of each approach.
+
+Usage (from the repository root):
+    python benchmarks/bench_source_registry.py [num_links] [repeats]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.news_source_service import SourceRegistry
+
+
+def legacy_is_valid_news(url):
+    # Verbatim copy of the substring check this replaced
+    if "livemint.com" in url or "outlookbusiness.com" in url or "businesstoday.com" in url or "financialexpress.com" in url or "reuters.com" in url or "indiatoday.in" in url or "economictimes.indiatimes.com" in url or "techcrunch.com" in url:
+        return True
+    else:
+        return False
+
+
+def legacy_extract_titles_links(news_list):
+    titles_links = {}
+    for item in news_list:
+        if "stories" in item:
+            for story in item["stories"]:
+                if legacy_is_valid_news(story["link"]):
+                    titles_links.update({story["title"] : story["link"]})
+        else:
+            if legacy_is_valid_news(item["link"]):
+                titles_links.update({item["title"] : item["link"]})
+    return titles_links
+
+
+def synthetic_news(num_links, seed=0):
+    """
+    Returns:
+        tuple: (news_list, set of links that should pass)
+    """
+    rng = random.Random(seed)
+    whitelisted = ["www.livemint.com", "economictimes.indiatimes.com", "m.economictimes.indiatimes.com",
+                   "www.reuters.com", "www.financialexpress.com", "techcrunch.com", "www.indiatoday.in"]
+    others = ["www.moneycontrol.com", "www.thehindu.com", "timesofindia.indiatimes.com", "www.ndtv.com"]
+    news_list, expected = [], set()
+    for i in range(num_links):
+        kind = rng.random()
+        if kind < 0.4:
+            link = f"https://{rng.choice(whitelisted)}/companies/news/story-{i}.html"
+            expected.add(link)
+        elif kind < 0.8:
+            link = f"https://{rng.choice(others)}/business/story-{i}"
+        else:
+            # Another site quoting a whitelisted domain: the substring check lets these through
+            link = f"https://{rng.choice(others)}/redirect?src=livemint.com&id={i}"
+        story = {"title": f"Story {i}", "link": link}
+        if rng.random() < 0.3 and news_list and "stories" in news_list[-1]:
+            news_list[-1]["stories"].append(story)
+        elif rng.random() < 0.2:
+            news_list.append({"title": f"Cluster {i}", "stories": [story]})
+        else:
+            news_list.append(story)
+    return news_list, expected
+
+
+def main():
+    num_links = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    news_list, expected = synthetic_news(num_links)
+    registry = SourceRegistry()
+
+    for name, extract in (("substring", legacy_extract_titles_links), ("registry", registry.filter_links)):
+        start = time.perf_counter()
+        for _ in range(repeats):
+            titles_links = extract(news_list)
+        elapsed = (time.perf_counter() - start) / repeats
+        links = set(titles_links.values())
+        print(f"{name:>9}: {1000 * elapsed:7.2f} ms for {num_links} links, "
+              f"{len(links & expected)}/{len(expected)} kept, {len(links - expected)} false positives")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark utils.tuples_to_list against the previous implementation
+
+Usage (from the repository root):
+    python benchmarks/bench_tuples_to_list.py [triples_file] [repeats]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import iter_triples, tuples_to_list, _triples_cache_path
+
+
+def legacy_tuples_to_list(file_path, N=3):
+    # Verbatim copy of the readlines/split implementation this replaced
+    with open(file_path, 'r') as file:
+        lines = file.readlines()
+        tuple_list = []
+        elements = []
+        temp_ele = ""
+        for line in lines:
+            raw_elements = line.strip().strip('()').split('", "')
+            elements = []
+            temp_ele = ""
+            for i in range(0, len(raw_elements)):
+                if i < 2:
+                    elements.append(raw_elements[i].strip('"').strip("'"))
+                else:
+                    temp_ele += raw_elements[i].strip('"').strip("'")
+                    if i == len(raw_elements) - 1:
+                        elements.append(temp_ele)
+                    else:
+                        temp_ele += " "
+
+            if len(elements) > 0 and elements != ['']:
+                tuple_list.append(tuple(elements))
+
+        return list(set(sorted(tuple_list)))
+
+
+def best_of(repeats, fn):
+    timings = []
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    file_path = sys.argv[1] if len(sys.argv) > 1 else "unique_output.txt"
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    legacy_time, legacy = best_of(repeats, lambda: legacy_tuples_to_list(file_path))
+    stream_time, streamed = best_of(repeats, lambda: list(iter_triples(file_path)))
+
+    if os.path.exists(_triples_cache_path(file_path)):
+        os.remove(_triples_cache_path(file_path))
+    cold_start = time.perf_counter()
+    tuples_to_list(file_path)
+    cold_time = time.perf_counter() - cold_start
+    cached_time, cached = best_of(repeats, lambda: tuples_to_list(file_path))
+
+    well_formed = sum(1 for triple in legacy if len(triple) == 3)
+    print(f"File: {file_path}")
+    print(f"legacy tuples_to_list : {legacy_time * 1000:8.2f} ms  ({len(legacy)} tuples, {well_formed} with 3 elements)")
+    print(f"streaming parse       : {stream_time * 1000:8.2f} ms  ({len(streamed)} triples)")
+    print(f"parse + write cache   : {cold_time * 1000:8.2f} ms")
+    print(f"cached load           : {cached_time * 1000:8.2f} ms  ({len(cached)} triples)")
+    assert cached == streamed, "cache round-trip changed the triples"
+
+
+if __name__ == "__main__":
+    main()
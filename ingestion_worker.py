@@ -0,0 +1,139 @@
+import os, sys
+import time
+from typing import List, Optional
+from utils import extract_texts_concurrently, flatten_term_texts, get_relevance_filter, search_news
+from services.llm_client_service import get_llm_client
+from services.effect_map_service import EffectMapGenerator
+from services.near_duplicate_service import NearDuplicateClusterer
+from services.work_queue_service import SQLiteWorkQueue
+from news_pipeline import (
+    COMPANY_INFO, ZOMATO_INDIRECT_SEARCH_TERMS, connect_news_database,
+    open_article_fetcher, open_article_store, open_impact_cache, open_term_link_store
+)
+
+
+class IngestionWorker:
+    """
+    Scrape, download and score news outside the Streamlit request path
+
+    Every search term is one job in a durable work queue. A job re-scrapes the
+    term's links, extracts the articles into the article store and scores them
+    for every company into the impact cache, so the SectorPulse page only has
+    to read precomputed results. Finished jobs are the checkpoint: a worker
+    restarted after a crash resumes the unfinished run at the next term.
+    """
+
+    def __init__(self, client, term_store, article_store, impact_cache, queue, fetcher=None, company_info=None):
+        """
+        Args:
+            client: LLMClient used for impact scoring
+            term_store: TermLinkStore holding the per-term links
+            article_store: ArticleStore holding the extracted article text
+            impact_cache: Impact cache the verdicts are written to
+            queue: SQLiteWorkQueue (":memory:" for a throwaway local queue)
+            fetcher: Optional AsyncArticleFetcher
+            company_info: {company name: description}, defaults to COMPANY_INFO
+        """
+        self.client = client
+        self.term_store = term_store
+        self.article_store = article_store
+        self.queue = queue
+        self.fetcher = fetcher
+        self.company_info = company_info if company_info is not None else COMPANY_INFO
+        self.generator = EffectMapGenerator(cache=impact_cache, deduplicator=NearDuplicateClusterer())
+
+    def process_term(self, term: str) -> int:
+        """
+        Refresh one term end to end
+
+        Returns:
+            int: Number of non-neutral impacts across all companies
+        """
+        titles_links = self.term_store.get([term], search_news, background=False)
+        if not titles_links:
+            raise RuntimeError(f"No links found for {term!r}")
+        extracted_texts = flatten_term_texts(
+            extract_texts_concurrently(titles_links, fetcher=self.fetcher, store=self.article_store)
+        )
+        impacts = 0
+        for company_name, company_info in self.company_info.items():
+            impacts += len(self.generator.analyze_news_impact(
+                self.client, company_name.capitalize(), company_info, extracted_texts
+            ))
+        return impacts
+
+    def run_once(self, terms: Optional[List[str]] = None) -> dict:
+        """
+        Process one run of terms, resuming an unfinished run if there is one
+
+        Jobs still leased by a worker that died are waited for until their
+        lease runs out and then taken over, so the run always ends finished.
+
+        Returns:
+            dict: Job counts per status for the run
+        """
+        run_id = self.queue.start_run(list(terms or ZOMATO_INDIRECT_SEARCH_TERMS))
+        relevance_before = dict(get_relevance_filter().stats)
+        while True:
+            job = self.queue.claim(run_id)
+            if job is None:
+                lease_until = self.queue.next_lease_expiry(run_id)
+                if lease_until is None:
+                    break
+                wait = max(0.0, lease_until - time.time()) + 0.01
+                print(f"Waiting {wait:.0f}s for a leased job to finish or expire")
+                time.sleep(wait)
+                continue
+            print(f"Processing term: {job['payload']} (attempt {job['attempts']})")
+            try:
+                impacts = self.process_term(job['payload'])
+            except Exception as e:
+                print(f"Error processing {job['payload']}: {e}")
+                self.queue.fail(job['id'], str(e))
+                continue
+            self.queue.complete(job['id'])
+            print(f"Done: {job['payload']} ({impacts} impacts)")
+
+        progress = self.queue.progress(run_id)
+        self.queue.finish_run(run_id)
+        print(f"Run {run_id} finished: {progress}")
+        relevance = get_relevance_filter().stats
+        print(f"Relevance filter dropped {relevance['dropped'] - relevance_before['dropped']} of "
+              f"{relevance['checked'] - relevance_before['checked']} articles, saving ~"
+              f"{relevance['saved_seconds'] - relevance_before['saved_seconds']:.0f}s of LLM scoring")
+        return progress
+
+    def run_forever(self, interval_seconds: float = 4 * 60 * 60, terms: Optional[List[str]] = None) -> None:
+        """
+        Start a run every interval_seconds, counted from the end of the last finished run
+        """
+        while True:
+            last_finished = self.queue.last_finished_at()
+            wait = 0 if last_finished is None else last_finished + interval_seconds - time.time()
+            if wait > 0:
+                print(f"Next run in {wait / 60:.0f} minutes")
+                time.sleep(wait)
+            self.run_once(terms)
+
+
+def create_worker(queue_path: Optional[str] = None) -> IngestionWorker:
+    db = connect_news_database()
+    queue = SQLiteWorkQueue(queue_path or os.getenv('INGESTION_QUEUE_PATH', 'ingestion_queue.sqlite'))
+    return IngestionWorker(
+        get_llm_client("openai", api_key=os.getenv("OPENAI_API_KEY")),
+        open_term_link_store(db),
+        open_article_store(),
+        open_impact_cache(db),
+        queue,
+        fetcher=open_article_fetcher()
+    )
+
+if __name__ == "__main__":
+    # python ingestion_worker.py            -> run every 4 hours (--interval <seconds> to change)
+    # python ingestion_worker.py --once     -> run (or resume) a single pass and exit
+    worker = create_worker()
+    if "--once" in sys.argv:
+        worker.run_once()
+    else:
+        interval = float(sys.argv[sys.argv.index("--interval") + 1]) if "--interval" in sys.argv else 4 * 60 * 60
+        worker.run_forever(interval)
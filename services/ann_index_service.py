@@ -0,0 +1,224 @@
+import json
+import os
+import numpy as np
+from typing import Optional, Tuple
+
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+
+class ExactIndex:
+    """
+    Brute-force inner-product index over L2-normalized vectors
+    Exact reference backend used as the fallback for regression comparison
+    """
+    backend = "exact"
+
+    def __init__(self, dim: int):
+        self.dim = dim
+        self.vectors = np.zeros((0, dim), dtype=np.float32)
+
+    def __len__(self) -> int:
+        return self.vectors.shape[0]
+
+    def build(self, vectors: np.ndarray) -> None:
+        self.vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+
+    def add(self, vectors: np.ndarray) -> None:
+        self.vectors = np.vstack([self.vectors, np.asarray(vectors, dtype=np.float32)])
+
+    def search(self, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return the k best (scores, ids) ordered by descending score
+        """
+        k = min(k, len(self))
+        if k == 0:
+            return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.int64)
+        scores = self.vectors @ np.asarray(query, dtype=np.float32)
+        ids = np.argpartition(-scores, k - 1)[:k]
+        ids = ids[np.lexsort((ids, -scores[ids]))]
+        return scores[ids], ids.astype(np.int64)
+
+    def set_search_params(self, **params) -> None:
+        pass
+
+    def save(self, path: str) -> None:
+        np.save(path + ".npy", self.vectors)
+
+    def load(self, path: str) -> None:
+        self.vectors = np.load(path + ".npy")
+
+
+class HNSWIndex:
+    """
+    HNSW graph index (hnswlib) with cosine scores on L2-normalized vectors
+
+    ef_search is the recall-vs-latency knob: higher values visit more of the
+    graph per query, raising recall at the cost of latency.
+    """
+    backend = "hnsw"
+
+    def __init__(self, dim: int, M: int = 32, ef_construction: int = 200, ef_search: int = 64):
+        if hnswlib is None:
+            raise ImportError("The 'hnsw' backend requires hnswlib (pip install hnswlib)")
+        self.dim = dim
+        self.M = M
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.index = None
+
+    def __len__(self) -> int:
+        return 0 if self.index is None else self.index.get_current_count()
+
+    def _new_index(self, max_elements: int) -> None:
+        self.index = hnswlib.Index(space='ip', dim=self.dim)
+        self.index.init_index(max_elements=max(max_elements, 1), M=self.M, ef_construction=self.ef_construction, random_seed=42)
+        self.index.set_ef(self.ef_search)
+
+    def build(self, vectors: np.ndarray) -> None:
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        self._new_index(vectors.shape[0])
+        self.index.add_items(vectors, np.arange(vectors.shape[0]))
+
+    def add(self, vectors: np.ndarray) -> None:
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if self.index is None:
+            self._new_index(vectors.shape[0])
+        start = len(self)
+        if start + vectors.shape[0] > self.index.get_max_elements():
+            self.index.resize_index(2 * (start + vectors.shape[0]))
+        self.index.add_items(vectors, np.arange(start, start + vectors.shape[0]))
+
+    def search(self, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        k = min(k, len(self))
+        if k == 0:
+            return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.int64)
+        # ef must be at least k for hnswlib to return k results
+        self.index.set_ef(max(self.ef_search, k))
+        ids, distances = self.index.knn_query(np.asarray(query, dtype=np.float32).reshape(1, -1), k=k)
+        # hnswlib 'ip' distance is 1 - inner product
+        return 1.0 - distances[0], ids[0].astype(np.int64)
+
+    def set_search_params(self, ef_search: Optional[int] = None, **params) -> None:
+        if ef_search is not None:
+            self.ef_search = ef_search
+
+    def save(self, path: str) -> None:
+        self.index.save_index(path + ".hnsw")
+
+    def load(self, path: str) -> None:
+        self.index = hnswlib.Index(space='ip', dim=self.dim)
+        self.index.load_index(path + ".hnsw")
+        self.index.set_ef(self.ef_search)
+
+
+class IVFPQIndex:
+    """
+    Inverted-file index with product quantization (faiss)
+
+    Vectors are clustered into `nlist` cells and compressed to `m` bytes each.
+    nprobe is the recall-vs-latency knob: the number of cells scanned per query.
+    """
+    backend = "ivfpq"
+
+    def __init__(self, dim: int, nlist: int = 256, m: int = 48, nbits: int = 8, nprobe: int = 16):
+        if faiss is None:
+            raise ImportError("The 'ivfpq' backend requires faiss (pip install faiss-cpu)")
+        self.dim = dim
+        self.nlist = nlist
+        self.m = m
+        self.nbits = nbits
+        self.nprobe = nprobe
+        self.index = None
+
+    def __len__(self) -> int:
+        return 0 if self.index is None else self.index.ntotal
+
+    def build(self, vectors: np.ndarray) -> None:
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        # faiss needs enough training points per centroid
+        nlist = max(1, min(self.nlist, vectors.shape[0] // 39))
+        quantizer = faiss.IndexFlatIP(self.dim)
+        self.index = faiss.IndexIVFPQ(quantizer, self.dim, nlist, self.m, self.nbits, faiss.METRIC_INNER_PRODUCT)
+        self.index.train(vectors)
+        self.index.add(vectors)
+        self.index.nprobe = self.nprobe
+
+    def add(self, vectors: np.ndarray) -> None:
+        if self.index is None:
+            self.build(vectors)
+        else:
+            self.index.add(np.ascontiguousarray(vectors, dtype=np.float32))
+
+    def search(self, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        k = min(k, len(self))
+        if k == 0:
+            return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.int64)
+        self.index.nprobe = self.nprobe
+        scores, ids = self.index.search(np.asarray(query, dtype=np.float32).reshape(1, -1), k)
+        keep = ids[0] >= 0
+        return scores[0][keep], ids[0][keep].astype(np.int64)
+
+    def set_search_params(self, nprobe: Optional[int] = None, **params) -> None:
+        if nprobe is not None:
+            self.nprobe = nprobe
+
+    def save(self, path: str) -> None:
+        faiss.write_index(self.index, path + ".ivfpq")
+
+    def load(self, path: str) -> None:
+        self.index = faiss.read_index(path + ".ivfpq")
+        self.index.nprobe = self.nprobe
+
+
+ANN_BACKENDS = {
+    ExactIndex.backend: ExactIndex,
+    HNSWIndex.backend: HNSWIndex,
+    IVFPQIndex.backend: IVFPQIndex,
+}
+
+
+def create_ann_index(backend: str, dim: int, **params):
+    """
+    Create an empty index for the given backend name ('exact', 'hnsw' or 'ivfpq')
+    """
+    if backend not in ANN_BACKENDS:
+        raise ValueError(f"Unsupported ANN backend: {backend}")
+    return ANN_BACKENDS[backend](dim, **params)
+
+
+def save_ann_index(index, path: str, metadata: dict) -> None:
+    """
+    Persist an index plus a JSON sidecar describing how to rebuild it
+
+    Args:
+        index: Any backend instance
+        path: Path prefix; backend files get their own extension
+        metadata: Extra JSON-serializable data stored with the index
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    index.save(path)
+    params = {key: value for key, value in vars(index).items() if key not in ("index", "vectors", "dim")}
+    with open(path + ".json", 'w') as file:
+        json.dump({"backend": index.backend, "dim": index.dim, "params": params, "metadata": metadata}, file)
+
+
+def load_ann_index(path: str):
+    """
+    Load an index saved with save_ann_index
+
+    Returns:
+        tuple: (index, metadata)
+    """
+    with open(path + ".json", 'r') as file:
+        info = json.load(file)
+    index = create_ann_index(info["backend"], info["dim"], **info["params"])
+    index.load(path)
+    return index, info["metadata"]
@@ -0,0 +1,133 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only track the click and never change the article
+TRACKING_PARAMS = {"fbclid", "gclid", "ocid", "cmpid", "mc_cid", "mc_eid"}
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Canonical form of an article URL used as the store key
+
+    Lowercases scheme and host, drops the fragment, a leading www., tracking
+    parameters (utm_* and friends) and a trailing slash, and sorts what is
+    left of the query string.
+    """
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    netloc = f"{host}:{parts.port}" if parts.port else host
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), netloc, path, urlencode(query), ""))
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class ArticleStore:
+    """
+    SQLite store of extracted article text keyed by canonical URL
+
+    Each row keeps the text, when it was fetched, the HTTP validators
+    (ETag / Last-Modified) and a content hash. Rows younger than ttl_seconds
+    are served without any network I/O; older rows are revalidated with a
+    conditional GET when validators are available.
+    """
+
+    def __init__(self, path: str = "article_store.sqlite", ttl_seconds: Optional[float] = 24 * 60 * 60):
+        """
+        Args:
+            path: Database file, created on first use
+            ttl_seconds: Freshness lifetime of a row (None keeps rows fresh forever)
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS articles ("
+                "url TEXT PRIMARY KEY, text TEXT NOT NULL, fetched_at REAL NOT NULL, "
+                "etag TEXT, last_modified TEXT, content_hash TEXT NOT NULL)"
+            )
+
+    def get_many(self, urls: Iterable[str]) -> Dict[str, dict]:
+        """
+        Look up several URLs
+
+        Returns:
+            dict: {url as given: row dict} for the URLs present in the store
+        """
+        by_canonical = {}
+        for url in urls:
+            by_canonical.setdefault(canonicalize_url(url), []).append(url)
+        keys = list(by_canonical)
+
+        found = {}
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = self._conn.execute(
+                    "SELECT url, text, fetched_at, etag, last_modified, content_hash FROM articles "
+                    f"WHERE url IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                for url, text, fetched_at, etag, last_modified, digest in rows:
+                    record = {"text": text, "fetched_at": fetched_at, "etag": etag,
+                              "last_modified": last_modified, "content_hash": digest}
+                    for original in by_canonical[url]:
+                        found[original] = record
+        return found
+
+    def is_fresh(self, record: dict, now: Optional[float] = None) -> bool:
+        if self.ttl_seconds is None:
+            return True
+        return (now or time.time()) - record["fetched_at"] <= self.ttl_seconds
+
+    def put_many(self, records: List[dict]) -> None:
+        """
+        Insert or refresh rows
+
+        Args:
+            records: Dicts with url and text, optionally etag and last_modified
+        """
+        if not records:
+            return
+        now = time.time()
+        rows = [
+            (canonicalize_url(record["url"]), record["text"], now, record.get("etag"),
+             record.get("last_modified"), content_hash(record["text"]))
+            for record in records
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO articles VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def purge_expired(self, max_age_seconds: Optional[float] = None) -> int:
+        """
+        Delete rows older than max_age_seconds (defaults to the TTL)
+
+        Returns:
+            int: Number of rows deleted
+        """
+        max_age_seconds = max_age_seconds if max_age_seconds is not None else self.ttl_seconds
+        if max_age_seconds is None:
+            return 0
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM articles WHERE fetched_at < ?", (time.time() - max_age_seconds,))
+        return cursor.rowcount
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
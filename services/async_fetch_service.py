@@ -0,0 +1,201 @@
+import asyncio
+import concurrent.futures
+import multiprocessing
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Optional
+from urllib.parse import urlsplit
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+DEFAULT_USER_AGENT = "Mozilla/5.0 (compatible; LinkLogic/1.0)"
+
+
+@dataclass
+class FetchResult:
+    """
+    Outcome of fetching one article
+
+    status is 'ok', 'not_modified' (304 on a conditional GET), 'too_large'
+    or 'error'. text is only filled for 'ok'.
+    """
+    url: str
+    status: str
+    text: str = ""
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    error: Optional[str] = None
+
+
+def extract_text_from_html(url: str, html: str) -> str:
+    """
+    Extract the article body from already-downloaded HTML with newspaper3k
+
+    Module-level so it can run in a process pool.
+    """
+    from newspaper import Article
+
+    article = Article(url)
+    try:
+        article.download(input_html=html)
+        article.parse()
+    except Exception as e:
+        print(f"Error during parsing {url}: {e}")
+        return ""
+    return article.text
+
+
+class AsyncArticleFetcher:
+    """
+    asyncio/aiohttp article fetcher with per-host politeness limits
+
+    One aiohttp session (and connection pool) is shared by all requests of a
+    fetch_all call. Each host gets its own concurrency limit, bodies are
+    streamed and abandoned once they exceed max_bytes, and known ETag /
+    Last-Modified validators turn repeat fetches into conditional GETs.
+    HTML is handed to a process pool for text extraction so parsing never
+    blocks the event loop. The pool is started on first use and reused by
+    every later call until close(); its workers are spawned rather than
+    forked, since forking a multithreaded process (Streamlit, torch) can
+    deadlock the child.
+    """
+
+    def __init__(
+        self,
+        per_host_limit: int = 2,
+        host_limits: Optional[Dict[str, int]] = None,
+        total_limit: int = 32,
+        max_bytes: int = 5 * 1024 * 1024,
+        timeout: float = 20,
+        parse_workers: Optional[int] = None,
+        parse_fn: Callable[[str, str], str] = extract_text_from_html,
+        user_agent: str = DEFAULT_USER_AGENT
+    ):
+        """
+        Args:
+            per_host_limit: Default concurrent requests per host
+            host_limits: Per-host overrides, e.g. {"reuters.com": 1}
+            total_limit: Connection pool size across all hosts
+            max_bytes: Largest body accepted; bigger responses are dropped
+            timeout: Total timeout per request in seconds
+            parse_workers: Processes used for text extraction (defaults to the CPU count)
+            parse_fn: (url, html) -> text, must be picklable
+            user_agent: User-Agent header sent with every request
+        """
+        if aiohttp is None:
+            raise ImportError("AsyncArticleFetcher requires aiohttp (pip install aiohttp)")
+        self.per_host_limit = per_host_limit
+        self.host_limits = host_limits or {}
+        self.total_limit = total_limit
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.parse_workers = parse_workers
+        self.parse_fn = parse_fn
+        self.user_agent = user_agent
+        self._parse_pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        host = urlsplit(url).hostname or ""
+        return host[4:] if host.startswith("www.") else host
+
+    def _host_limit(self, host: str) -> int:
+        for suffix, limit in self.host_limits.items():
+            if host == suffix or host.endswith("." + suffix):
+                return limit
+        return self.per_host_limit
+
+    async def _download(self, session, semaphore, url: str, validators: Dict[str, str]):
+        """
+        Fetch one URL
+
+        Returns:
+            tuple: (FetchResult, html or None)
+        """
+        headers = {}
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+        async with semaphore:
+            print(f"Processing URL: {url}")
+            try:
+                async with session.get(url, headers=headers) as response:
+                    etag = response.headers.get("ETag")
+                    last_modified = response.headers.get("Last-Modified")
+                    if response.status == 304:
+                        return FetchResult(url, "not_modified", etag=etag or validators.get("etag"),
+                                           last_modified=last_modified or validators.get("last_modified")), None
+                    if response.status >= 400:
+                        return FetchResult(url, "error", error=f"HTTP {response.status}"), None
+                    if (response.content_length or 0) > self.max_bytes:
+                        return FetchResult(url, "too_large", error=f"{response.content_length} bytes"), None
+
+                    chunks, size = [], 0
+                    async for chunk in response.content.iter_chunked(64 * 1024):
+                        size += len(chunk)
+                        if size > self.max_bytes:
+                            return FetchResult(url, "too_large", error=f"more than {self.max_bytes} bytes"), None
+                        chunks.append(chunk)
+                    html = b"".join(chunks).decode(response.get_encoding() if response.charset else "utf-8", errors="replace")
+                    return FetchResult(url, "ok", etag=etag, last_modified=last_modified), html
+            except Exception as e:
+                print(f"Error during download: {e}")
+                return FetchResult(url, "error", error=str(e)), None
+
+    async def _fetch_all(self, urls, validators, parse_pool) -> Dict[str, FetchResult]:
+        loop = asyncio.get_running_loop()
+        semaphores = {}
+        connector = aiohttp.TCPConnector(limit=self.total_limit)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+
+        async def fetch(session, url):
+            host = self.host_of(url)
+            if host not in semaphores:
+                semaphores[host] = asyncio.Semaphore(self._host_limit(host))
+            result, html = await self._download(session, semaphores[host], url, validators.get(url, {}))
+            if html is not None:
+                result.text = await loop.run_in_executor(parse_pool, self.parse_fn, url, html)
+            return result
+
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers={"User-Agent": self.user_agent}) as session:
+            results = await asyncio.gather(*(fetch(session, url) for url in urls))
+        return {result.url: result for result in results}
+
+    def fetch_all(self, urls: Iterable[str], validators: Optional[Dict[str, Dict[str, str]]] = None) -> Dict[str, FetchResult]:
+        """
+        Fetch and extract every URL (duplicates are fetched once)
+
+        Args:
+            urls: Article URLs
+            validators: {url: {"etag": ..., "last_modified": ...}} from earlier fetches
+
+        Returns:
+            dict: {url: FetchResult}
+        """
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            return {}
+        return asyncio.run(self._fetch_all(urls, validators or {}, self._get_parse_pool()))
+
+    def _get_parse_pool(self) -> concurrent.futures.ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._parse_pool is None:
+                self._parse_pool = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=self.parse_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._parse_pool
+
+    def close(self) -> None:
+        """
+        Shut down the parse pool; a later fetch_all starts a new one
+        """
+        with self._pool_lock:
+            parse_pool, self._parse_pool = self._parse_pool, None
+        if parse_pool is not None:
+            parse_pool.shutdown()
@@ -0,0 +1,158 @@
+import json
+import time
+from typing import Dict, List, Optional
+
+from services.effect_map_service import PROMPT_VERSION
+
+# Batch states after which polling stops
+BATCH_TERMINAL_STATES = {"completed", "failed", "expired", "cancelled"}
+
+
+class BatchImpactScorer:
+    """
+    Offline impact scoring through the OpenAI Batch API
+
+    Articles whose verdicts are not cached yet are packed into one JSONL
+    file of chat-completion requests (custom_id = impact cache key), uploaded,
+    submitted as a batch, polled until it finishes, and the verdicts are
+    merged into the impact cache. Interactive runs then find every verdict
+    precomputed.
+    """
+
+    def __init__(self, client, generator, poll_interval: float = 30, max_wait: Optional[float] = 24 * 60 * 60):
+        """
+        Args:
+            client: LLMClient pointed at the OpenAI API
+            generator: EffectMapGenerator whose cache receives the verdicts
+            poll_interval: Seconds between batch status checks
+            max_wait: Give up polling after this many seconds (None waits forever)
+        """
+        if generator.cache is None:
+            raise ValueError("Batch scoring needs an EffectMapGenerator with an impact cache")
+        self.client = client
+        self.generator = generator
+        self.poll_interval = poll_interval
+        self.max_wait = max_wait
+
+    def pending_requests(self, company_name: str, company_info: str, news_items: Dict[str, Dict[str, str]]) -> List[dict]:
+        """
+        Build batch request lines for the articles without a cached verdict
+
+        Args:
+            company_name: Company being analyzed
+            company_info: Short description of the company
+            news_items: {title: {url: text}}
+
+        Returns:
+            list: One Batch API request dict per uncached article, deduplicated by key
+        """
+        requests_by_key = {}
+        for title, url_text in news_items.items():
+            text = list(url_text.values())[0]
+            if text == "":
+                continue
+            key = self.generator.cache_key(company_name, company_info, title, text)
+            requests_by_key[key] = {
+                "custom_id": key,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": self.generator.build_impact_payload(company_name, company_info, title, text),
+            }
+
+        cached = self.generator.cache.get_many(list(requests_by_key))
+        return [request for key, request in requests_by_key.items() if key not in cached]
+
+    def submit(self, batch_requests: List[dict]) -> dict:
+        """
+        Upload the JSONL file and create the batch
+
+        Returns:
+            dict: Batch object as returned by the API
+        """
+        jsonl = "\n".join(json.dumps(request, ensure_ascii=False) for request in batch_requests) + "\n"
+        upload = self.client.request(
+            "POST", "files",
+            files={"file": ("impact_batch.jsonl", jsonl.encode('utf-8'), "application/jsonl")},
+            data={"purpose": "batch"}
+        ).json()
+        batch = self.client.post_json("batches", {
+            "input_file_id": upload["id"],
+            "endpoint": "/v1/chat/completions",
+            "completion_window": "24h",
+            "metadata": {"prompt_version": PROMPT_VERSION},
+        })
+        print(f"Submitted batch {batch['id']} with {len(batch_requests)} requests")
+        return batch
+
+    def wait(self, batch_id: str) -> dict:
+        """
+        Poll a batch until it reaches a terminal state
+        """
+        start_time = time.time()
+        while True:
+            batch = self.client.get_json(f"batches/{batch_id}")
+            print(f"Batch {batch_id}: {batch['status']} {batch.get('request_counts', {})}")
+            if batch["status"] in BATCH_TERMINAL_STATES:
+                return batch
+            if self.max_wait is not None and time.time() - start_time > self.max_wait:
+                raise TimeoutError(f"Batch {batch_id} still {batch['status']} after {self.max_wait} secs")
+            time.sleep(self.poll_interval)
+
+    def _results(self, file_id: Optional[str]) -> List[dict]:
+        """
+        Decoded JSONL lines of a batch output or error file (none if the batch has no such file)
+        """
+        if not file_id:
+            return []
+        content = self.client.request("GET", f"files/{file_id}/content").text
+        return [json.loads(line) for line in content.splitlines() if line.strip()]
+
+    def merge_results(self, batch: dict) -> int:
+        """
+        Download the batch output and write the verdicts into the impact cache
+
+        Requests that failed (listed in the error file of a partially
+        completed batch, or with a non-200 response in the output file) are
+        reported and left uncached, so the next run resubmits them.
+
+        Returns:
+            int: Number of verdicts stored
+        """
+        if not batch.get("output_file_id") and not batch.get("error_file_id"):
+            print(f"Batch {batch['id']} finished as {batch['status']} without output")
+            return 0
+
+        verdicts, failed = {}, []
+        for result in self._results(batch.get("output_file_id")) + self._results(batch.get("error_file_id")):
+            response = result.get("response") or {}
+            if result.get("error") or response.get("status_code") != 200:
+                print(f"Batch request {result.get('custom_id')} failed: {result.get('error') or response.get('status_code')}")
+                failed.append(result.get("custom_id"))
+                continue
+            try:
+                verdict = json.loads(response["body"]["choices"][0]["message"]["content"])
+            except (KeyError, IndexError, json.JSONDecodeError) as e:
+                print(f"Unparseable batch result for {result['custom_id']}: {e}")
+                failed.append(result.get("custom_id"))
+                continue
+            if "emoji" in verdict:
+                verdicts[result["custom_id"]] = verdict
+
+        self.generator.cache.put_many(verdicts)
+        print(f"Merged {len(verdicts)} verdicts from batch {batch['id']} ({len(failed)} failed)")
+        return len(verdicts)
+
+    def run(self, company_name: str, company_info: str, news_items: Dict[str, Dict[str, str]]) -> int:
+        """
+        Score every uncached article through one batch job and merge the results
+
+        Returns:
+            int: Number of verdicts added to the cache
+        """
+        batch_requests = self.pending_requests(company_name, company_info, news_items)
+        if not batch_requests:
+            print(f"All {company_name} articles already scored, nothing to submit")
+            return 0
+        batch = self.submit(batch_requests)
+        batch = self.wait(batch["id"])
+        return self.merge_results(batch)
@@ -0,0 +1,843 @@
+import numpy as np
+import torch
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+def _grow(array: np.ndarray, size: int) -> np.ndarray:
+    """
+    Return `array` with room for at least `size` entries (geometric growth)
+    """
+    if size <= array.shape[0]:
+        return array
+    grown = np.zeros((max(size, 2 * array.shape[0], 1024),) + array.shape[1:], dtype=array.dtype)
+    grown[:array.shape[0]] = array
+    return grown
+
+
+class StringInterner:
+    """
+    Bidirectional string <-> integer id table, each string stored once
+    """
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.strings: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+    def intern(self, text: str) -> int:
+        text_id = self.ids.get(text)
+        if text_id is None:
+            text_id = len(self.strings)
+            self.ids[text] = text_id
+            self.strings.append(text)
+        return text_id
+
+    def get(self, text: str) -> Optional[int]:
+        return self.ids.get(text)
+
+    def lexicographic_ranks(self) -> np.ndarray:
+        """
+        Rank of every id when the strings are sorted, so ids can be ordered without string compares
+        """
+        order = sorted(range(len(self.strings)), key=self.strings.__getitem__)
+        ranks = np.empty(len(order), dtype=np.int64)
+        ranks[order] = np.arange(len(order))
+        return ranks
+
+
+class TripleIdSet:
+    """
+    Set of (head, relation, tail) string triples held as interned id rows
+
+    Used to diff successive versions of a triples file without keeping a
+    Python tuple per triple. Rows are int64 (head id, relation id, tail id);
+    set operations work on packed integer keys and results are decoded in the
+    same order sorted() gives the string tuples.
+    """
+
+    def __init__(self):
+        self.nodes = StringInterner()
+        self.relations = StringInterner()
+        self.ids = np.zeros((0, 3), dtype=np.int64)
+
+    def __len__(self) -> int:
+        return self.ids.shape[0]
+
+    def encode(self, triples: Iterable[Tuple[str, str, str]]) -> np.ndarray:
+        """
+        Unique id rows for the triples, interning new strings
+        """
+        ids = np.array(
+            [(self.nodes.intern(head), self.relations.intern(relation), self.nodes.intern(tail))
+             for head, relation, tail in triples],
+            dtype=np.int64
+        ).reshape(-1, 3)
+        return np.unique(ids, axis=0)
+
+    def _pack(self, ids: np.ndarray) -> np.ndarray:
+        node_count, relation_count = max(len(self.nodes), 1), max(len(self.relations), 1)
+        if node_count * node_count * relation_count >= 2 ** 63:
+            raise OverflowError("Too many distinct strings to pack triple ids into int64")
+        return (ids[:, 0] * relation_count + ids[:, 1]) * node_count + ids[:, 2]
+
+    def difference(self, ids: np.ndarray, other: np.ndarray) -> np.ndarray:
+        """
+        Rows of `ids` that are not in `other`
+        """
+        return ids[~np.isin(self._pack(ids), self._pack(other))]
+
+    def _order(self, ids: np.ndarray, columns: Tuple[int, ...]) -> np.ndarray:
+        node_ranks, relation_ranks = self.nodes.lexicographic_ranks(), self.relations.lexicographic_ranks()
+        ranks = {0: node_ranks[ids[:, 0]], 1: relation_ranks[ids[:, 1]], 2: node_ranks[ids[:, 2]]}
+        # lexsort sorts by the last key first
+        return np.lexsort(tuple(ranks[column] for column in reversed(columns)))
+
+    def decode(self, ids: np.ndarray) -> List[Tuple[str, str, str]]:
+        """
+        String triples for the id rows, in sorted() order
+        """
+        if ids.shape[0] == 0:
+            return []
+        nodes, relations = self.nodes.strings, self.relations.strings
+        return [
+            (nodes[head], relations[relation], nodes[tail])
+            for head, relation, tail in ids[self._order(ids, (0, 1, 2))].tolist()
+        ]
+
+    def pair_winners(self, ids: np.ndarray, touched: np.ndarray) -> List[Tuple[str, str, str]]:
+        """
+        For every (head, tail) pair of `touched` still present in `ids`, the
+        largest triple on that pair, ordered by (head, tail)
+        """
+        if ids.shape[0] == 0 or touched.shape[0] == 0:
+            return []
+        node_count = len(self.nodes)
+        pairs = ids[:, 0] * node_count + ids[:, 2]
+        candidates = ids[np.isin(pairs, touched[:, 0] * node_count + touched[:, 2])]
+        if candidates.shape[0] == 0:
+            return []
+        candidates = candidates[self._order(candidates, (0, 2, 1))]
+        candidate_pairs = candidates[:, 0] * node_count + candidates[:, 2]
+        last_of_pair = np.append(candidate_pairs[1:] != candidate_pairs[:-1], True)
+        nodes, relations = self.nodes.strings, self.relations.strings
+        return [
+            (nodes[head], relations[relation], nodes[tail])
+            for head, relation, tail in candidates[last_of_pair].tolist()
+        ]
+
+
+class _AdjacencyView:
+    """
+    graph[head] view so graph[head][tail] works like networkx
+    """
+
+    def __init__(self, graph: "CompactTripleGraph", head: str):
+        self._graph = graph
+        self._head = head
+
+    def __getitem__(self, tail: str) -> Dict:
+        data = self._graph.get_edge_data(self._head, tail)
+        if data is None:
+            raise KeyError(tail)
+        return data
+
+    def __contains__(self, tail: str) -> bool:
+        return self._graph.has_edge(self._head, tail)
+
+
+class CompactTripleGraph:
+    """
+    Memory-compact directed graph of (head, relation, tail) edges
+
+    Node and relation strings are interned to integer ids and edges live in
+    struct-of-arrays form (head ids, relation ids, tail ids). Sorted CSR
+    adjacency in both directions is built lazily and invalidated on mutation.
+    Implements the subset of the networkx.DiGraph / MultiDiGraph API
+    KnowledgeGraphRAG uses; in multigraph mode the relation is the edge key.
+    """
+
+    def __init__(self, multigraph: bool = False):
+        """
+        Args:
+            multigraph: Allow several relations between the same (head, tail) pair
+        """
+        self.multigraph = multigraph
+        self.nodes = StringInterner()
+        self.relations = StringInterner()
+
+        self.edge_heads = np.zeros(0, dtype=np.int32)
+        self.edge_relations = np.zeros(0, dtype=np.int32)
+        self.edge_tails = np.zeros(0, dtype=np.int32)
+        self.edge_alive = np.zeros(0, dtype=bool)
+        self._edge_count = 0
+        self._live_edges = 0
+
+        self.out_degree = np.zeros(0, dtype=np.int32)
+        self.in_degree = np.zeros(0, dtype=np.int32)
+        self.node_alive = np.zeros(0, dtype=bool)
+
+        # Packed-int edge key -> edge id; the key includes the relation in multigraph mode
+        self._edge_index: Dict[int, int] = {}
+        # Multigraph only: packed (head, tail) -> edge ids on that pair
+        self._pair_edges: Dict[int, List[int]] = {}
+        self._csr = None
+
+    def _edge_key(self, head_id: int, tail_id: int, relation_id: int) -> int:
+        if self.multigraph:
+            return (head_id << 64) | (relation_id << 32) | tail_id
+        return (head_id << 32) | tail_id
+
+    def _pair_edge_ids(self, head_id: Optional[int], tail_id: Optional[int]) -> List[int]:
+        if head_id is None or tail_id is None:
+            return []
+        if self.multigraph:
+            return self._pair_edges.get((head_id << 32) | tail_id, [])
+        edge_id = self._edge_index.get((head_id << 32) | tail_id)
+        return [] if edge_id is None else [edge_id]
+
+    def _find_edge(self, head: str, tail: str, key: Optional[str] = None) -> Optional[int]:
+        head_id, tail_id = self.nodes.get(head), self.nodes.get(tail)
+        if key is None or not self.multigraph:
+            edge_ids = self._pair_edge_ids(head_id, tail_id)
+            return edge_ids[0] if edge_ids else None
+        relation_id = self.relations.get(key)
+        if head_id is None or tail_id is None or relation_id is None:
+            return None
+        return self._edge_index.get(self._edge_key(head_id, tail_id, relation_id))
+
+    def _add_node_id(self, node: str) -> int:
+        node_id = self.nodes.intern(node)
+        if node_id >= self.node_alive.shape[0]:
+            self.node_alive = _grow(self.node_alive, node_id + 1)
+            self.out_degree = _grow(self.out_degree, node_id + 1)
+            self.in_degree = _grow(self.in_degree, node_id + 1)
+        self.node_alive[node_id] = True
+        return node_id
+
+    def add_edge(self, head: str, tail: str, key: Optional[str] = None, relation: Optional[str] = None) -> None:
+        """
+        Add a head -> tail edge
+
+        A simple graph overwrites the relation of an existing pair (DiGraph
+        semantics); a multigraph keeps one edge per (head, relation, tail).
+        """
+        relation = relation if relation is not None else key
+        head_id = self._add_node_id(head)
+        tail_id = self._add_node_id(tail)
+        relation_id = self.relations.intern(relation)
+
+        edge_key = self._edge_key(head_id, tail_id, relation_id)
+        edge_id = self._edge_index.get(edge_key)
+        if edge_id is None:
+            edge_id = self._edge_count
+            size = edge_id + 1
+            self.edge_heads = _grow(self.edge_heads, size)
+            self.edge_relations = _grow(self.edge_relations, size)
+            self.edge_tails = _grow(self.edge_tails, size)
+            self.edge_alive = _grow(self.edge_alive, size)
+            self.edge_heads[edge_id] = head_id
+            self.edge_tails[edge_id] = tail_id
+            self.edge_alive[edge_id] = True
+            self._edge_index[edge_key] = edge_id
+            if self.multigraph:
+                self._pair_edges.setdefault((head_id << 32) | tail_id, []).append(edge_id)
+            self.out_degree[head_id] += 1
+            self.in_degree[tail_id] += 1
+            self._edge_count += 1
+            self._live_edges += 1
+        self.edge_relations[edge_id] = relation_id
+        self._csr = None
+
+    def add_edges_from(self, edges) -> None:
+        """
+        Add (head, tail, attributes) or (head, tail, key, attributes) edges
+        """
+        for edge in edges:
+            if len(edge) == 4:
+                head, tail, key, attributes = edge
+                self.add_edge(head, tail, key=key, relation=attributes.get('relation'))
+            else:
+                head, tail, attributes = edge
+                self.add_edge(head, tail, relation=attributes['relation'])
+
+    def has_edge(self, head: str, tail: str, key: Optional[str] = None) -> bool:
+        return self._find_edge(head, tail, key) is not None
+
+    def edge_id(self, head: str, tail: str, key: Optional[str] = None) -> Optional[int]:
+        """
+        Id of a live edge (stable until the edge is removed), or None
+        """
+        return self._find_edge(head, tail, key)
+
+    @property
+    def edge_capacity(self) -> int:
+        """
+        Number of edge ids handed out so far, removed edges included
+        """
+        return self._edge_count
+
+    def edge_triple(self, edge_id: int) -> Optional[Tuple[str, str, str]]:
+        """
+        (head, relation, tail) of an edge id, or None if the edge was removed
+        """
+        if edge_id >= self._edge_count or not self.edge_alive[edge_id]:
+            return None
+        return (
+            self.nodes.strings[self.edge_heads[edge_id]],
+            self.relations.strings[self.edge_relations[edge_id]],
+            self.nodes.strings[self.edge_tails[edge_id]]
+        )
+
+    def edge_ids_with_relation(self, relation: str) -> np.ndarray:
+        """
+        Ids of the live edges carrying a relation, ascending
+        """
+        relation_id = self.relations.get(relation)
+        if relation_id is None:
+            return np.zeros(0, dtype=np.int64)
+        count = self._edge_count
+        return np.flatnonzero((self.edge_relations[:count] == relation_id) & self.edge_alive[:count])
+
+    def live_relations(self) -> List[str]:
+        count = self._edge_count
+        relation_ids = np.unique(self.edge_relations[:count][self.edge_alive[:count]])
+        return [self.relations.strings[relation_id] for relation_id in relation_ids]
+
+    def get_edge_data(self, head: str, tail: str, default=None):
+        """
+        {'relation': ...} for a simple graph, {relation: {'relation': ...}} for a multigraph
+        """
+        edge_ids = self._pair_edge_ids(self.nodes.get(head), self.nodes.get(tail))
+        if not edge_ids:
+            return default
+        relations = [self.relations.strings[self.edge_relations[edge_id]] for edge_id in edge_ids]
+        if self.multigraph:
+            return {relation: {'relation': relation} for relation in relations}
+        return {'relation': relations[0]}
+
+    def remove_edge(self, head: str, tail: str, key: Optional[str] = None) -> None:
+        edge_id = self._find_edge(head, tail, key)
+        if edge_id is None:
+            raise KeyError(f"Edge {head}-{tail} not in graph")
+        head_id, tail_id = int(self.edge_heads[edge_id]), int(self.edge_tails[edge_id])
+        del self._edge_index[self._edge_key(head_id, tail_id, int(self.edge_relations[edge_id]))]
+        if self.multigraph:
+            pair = (head_id << 32) | tail_id
+            self._pair_edges[pair].remove(edge_id)
+            if not self._pair_edges[pair]:
+                del self._pair_edges[pair]
+        self.edge_alive[edge_id] = False
+        self.out_degree[head_id] -= 1
+        self.in_degree[tail_id] -= 1
+        self._live_edges -= 1
+        self._csr = None
+
+    def remove_node(self, node: str) -> None:
+        node_id = self.nodes.get(node)
+        if node_id is None or not self.node_alive[node_id]:
+            raise KeyError(f"Node {node} not in graph")
+        if self.out_degree[node_id] or self.in_degree[node_id]:
+            raise ValueError(f"Node {node} still has edges")
+        # The interned id is kept so the node can come back with the same id
+        self.node_alive[node_id] = False
+
+    def __contains__(self, node: str) -> bool:
+        node_id = self.nodes.get(node)
+        return node_id is not None and bool(self.node_alive[node_id])
+
+    def __getitem__(self, head: str) -> _AdjacencyView:
+        if head not in self:
+            raise KeyError(head)
+        return _AdjacencyView(self, head)
+
+    def degree(self, node: str) -> int:
+        node_id = self.nodes.get(node)
+        return int(self.out_degree[node_id] + self.in_degree[node_id])
+
+    def number_of_nodes(self) -> int:
+        return int(self.node_alive[:len(self.nodes)].sum())
+
+    def number_of_edges(self) -> int:
+        return self._live_edges
+
+    def adjacency(self) -> "AdjacencySnapshot":
+        """
+        Sorted in/out CSR adjacency over live edges, rebuilt after mutations
+        """
+        if self._csr is None:
+            live = np.flatnonzero(self.edge_alive[:self._edge_count])
+            self._csr = AdjacencySnapshot(
+                self.nodes, self.relations,
+                self.edge_heads[:self._edge_count], self.edge_relations[:self._edge_count],
+                self.edge_tails[:self._edge_count], live
+            )
+        return self._csr
+
+    def neighbors(self, node: str) -> Iterator[str]:
+        """
+        Successors of a node, in string order
+        """
+        node_id = self.nodes.get(node)
+        if node_id is None or not self.node_alive[node_id]:
+            raise KeyError(f"Node {node} not in graph")
+        adjacency = self.adjacency()
+        tail_ids = self.edge_tails[adjacency.out_edges[adjacency.out_offsets[node_id]:adjacency.out_offsets[node_id + 1]]]
+        if self.multigraph and tail_ids.shape[0]:
+            # Parallel edges sit next to each other in CSR order; report each successor once
+            tail_ids = tail_ids[np.r_[True, tail_ids[1:] != tail_ids[:-1]]]
+        return iter([self.nodes.strings[tail_id] for tail_id in tail_ids])
+
+    def edges(self, data=False) -> Iterator:
+        """
+        Iterate live edges as (head, tail), (head, tail, relation) or (head, tail, {'relation': ...})
+        """
+        strings, relations = self.nodes.strings, self.relations.strings
+        for edge_id in np.flatnonzero(self.edge_alive[:self._edge_count]):
+            head, tail = strings[self.edge_heads[edge_id]], strings[self.edge_tails[edge_id]]
+            relation = relations[self.edge_relations[edge_id]]
+            if data is True:
+                yield head, tail, {'relation': relation}
+            elif data == 'relation':
+                yield head, tail, relation
+            else:
+                yield head, tail
+
+
+class AdjacencySnapshot:
+    """
+    Immutable sorted CSR adjacency over a set of (head, relation, tail) edges
+
+    Edge ids leaving node i are out_edges[out_offsets[i]:out_offsets[i + 1]],
+    ordered by (tail string, relation string); in_edges is the mirror image
+    for incoming edges ordered by (head string, relation string). Ordering is
+    done once here with integer ranks, so traversals never compare strings.
+    """
+
+    def __init__(
+        self,
+        nodes: StringInterner,
+        relations: StringInterner,
+        heads: np.ndarray,
+        relation_ids: np.ndarray,
+        tails: np.ndarray,
+        live_edges: np.ndarray
+    ):
+        self.nodes = nodes
+        self.relations = relations
+        self.heads = heads
+        self.relation_ids = relation_ids
+        self.tails = tails
+        self.node_ranks = nodes.lexicographic_ranks()
+        relation_ranks = relations.lexicographic_ranks()
+
+        node_count = len(nodes)
+        live_heads, live_tails = heads[live_edges], tails[live_edges]
+        live_relation_ranks = relation_ranks[relation_ids[live_edges]]
+        self.out_edges = live_edges[np.lexsort((live_relation_ranks, self.node_ranks[live_tails], live_heads))]
+        self.in_edges = live_edges[np.lexsort((live_relation_ranks, self.node_ranks[live_heads], live_tails))]
+        self.out_offsets = np.zeros(node_count + 1, dtype=np.int64)
+        self.in_offsets = np.zeros(node_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(live_heads, minlength=node_count), out=self.out_offsets[1:])
+        np.cumsum(np.bincount(live_tails, minlength=node_count), out=self.in_offsets[1:])
+
+    @classmethod
+    def from_edges(cls, edges: Iterable[Tuple[str, str, str]]) -> "AdjacencySnapshot":
+        """
+        Build a snapshot from (head, tail, relation) tuples, e.g. networkx edges(data='relation')
+        """
+        nodes, relations = StringInterner(), StringInterner()
+        heads, relation_ids, tails = [], [], []
+        for head, tail, relation in edges:
+            heads.append(nodes.intern(head))
+            tails.append(nodes.intern(tail))
+            relation_ids.append(relations.intern(relation))
+        return cls(
+            nodes, relations,
+            np.array(heads, dtype=np.int64), np.array(relation_ids, dtype=np.int64),
+            np.array(tails, dtype=np.int64), np.arange(len(heads))
+        )
+
+    def _segments(self, offsets: np.ndarray, edges: np.ndarray, frontier: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Concatenate the adjacency segments of every frontier node
+
+        Returns:
+            (edge ids, index into frontier of the node each edge belongs to)
+        """
+        starts, ends = offsets[frontier], offsets[frontier + 1]
+        lengths = ends - starts
+        total = int(lengths.sum())
+        owners = np.repeat(np.arange(frontier.shape[0]), lengths)
+        segment_starts = np.cumsum(lengths) - lengths
+        positions = np.repeat(starts - segment_starts, lengths) + np.arange(total)
+        return edges[positions], owners
+
+    @staticmethod
+    def _cap_neighbors(owners: np.ndarray, neighbors: np.ndarray, cap: int) -> np.ndarray:
+        """
+        Mask keeping only each owner's first `cap` distinct neighbours (segments are neighbour-sorted)
+        """
+        if neighbors.shape[0] == 0:
+            return np.zeros(0, dtype=bool)
+        new_owner = np.r_[True, owners[1:] != owners[:-1]]
+        new_neighbor = new_owner | np.r_[True, neighbors[1:] != neighbors[:-1]]
+        distinct = np.cumsum(new_neighbor)
+        # Distinct-neighbour ordinal restarts at every owner boundary
+        ordinal = distinct - np.maximum.accumulate(np.where(new_owner, distinct, 0))
+        return ordinal < cap
+
+    def expand(self, seed_nodes: Iterable[str], hops: int, max_nodes_per_hop: int) -> np.ndarray:
+        """
+        Frontier BFS over both edge directions
+
+        Each hop visits, for every frontier node, its first `max_nodes_per_hop`
+        unseen neighbours (out and in separately, in string order) and collects
+        every edge joining the node to those neighbours. The new neighbours
+        form the next frontier.
+
+        Returns:
+            Edge ids in discovery order (hop, frontier node, neighbour, relation)
+        """
+        seen = np.zeros(len(self.nodes), dtype=bool)
+        seed_ids = [self.nodes.get(node) for node in seed_nodes]
+        frontier = np.unique(np.array([node_id for node_id in seed_ids if node_id is not None], dtype=np.int64))
+        seen[frontier] = True
+        discovered = []
+
+        for _ in range(hops):
+            if frontier.shape[0] == 0:
+                break
+            frontier = frontier[np.argsort(self.node_ranks[frontier], kind='stable')]
+
+            out_edges, out_owners = self._segments(self.out_offsets, self.out_edges, frontier)
+            in_edges, in_owners = self._segments(self.in_offsets, self.in_edges, frontier)
+            out_neighbors, in_neighbors = self.tails[out_edges], self.heads[in_edges]
+
+            out_keep = self._cap_neighbors(out_owners, out_neighbors, max_nodes_per_hop) & ~seen[out_neighbors]
+            in_keep = self._cap_neighbors(in_owners, in_neighbors, max_nodes_per_hop) & ~seen[in_neighbors]
+
+            # Interleave out/in edges per frontier node so output follows frontier order
+            hop_edges = np.concatenate([out_edges[out_keep], in_edges[in_keep]])
+            hop_owners = np.concatenate([out_owners[out_keep], in_owners[in_keep]])
+            discovered.append(hop_edges[np.argsort(hop_owners, kind='stable')])
+
+            frontier = np.unique(np.concatenate([out_neighbors[out_keep], in_neighbors[in_keep]]))
+            seen[frontier] = True
+
+        if not discovered:
+            return np.zeros(0, dtype=np.int64)
+        edges = np.concatenate(discovered)
+        _, first = np.unique(edges, return_index=True)
+        return edges[np.sort(first)]
+
+    def edge_triple(self, edge_id: int) -> Tuple[str, str, str]:
+        return (
+            self.nodes.strings[self.heads[edge_id]],
+            self.relations.strings[self.relation_ids[edge_id]],
+            self.nodes.strings[self.tails[edge_id]]
+        )
+
+
+class EmbeddingTable:
+    """
+    Dict-like text -> [1, dim] embedding table backed by one contiguous matrix
+
+    Rows of removed keys are recycled. Values can be stored at reduced
+    precision (e.g. float16) and are returned as float32 tensors.
+    """
+
+    def __init__(self, dim: Optional[int] = None, dtype: torch.dtype = torch.float16, device: str = 'cpu'):
+        """
+        Args:
+            dim: Embedding width (inferred from the first stored value when None)
+            dtype: Storage dtype of the matrix
+            device: Device the matrix lives on
+        """
+        self.dim = dim
+        self.dtype = dtype
+        self.device = device
+        self.matrix = torch.zeros((0, dim or 0), dtype=dtype, device=device)
+        self.rows: Dict[str, int] = {}
+        self._free_rows: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.rows
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.rows)
+
+    def keys(self):
+        return self.rows.keys()
+
+    def __getitem__(self, key: str) -> torch.Tensor:
+        return self.matrix[self.rows[key]].to(torch.float32).unsqueeze(0)
+
+    def get(self, key: str, default=None):
+        return self[key] if key in self.rows else default
+
+    def __setitem__(self, key: str, embedding: torch.Tensor) -> None:
+        if self.dim is None:
+            self.dim = embedding.numel()
+        row = self.rows.get(key)
+        if row is None:
+            if self._free_rows:
+                row = self._free_rows.pop()
+            else:
+                row = len(self.rows)
+                if row >= self.matrix.shape[0]:
+                    grown = torch.zeros((max(1024, 2 * row), self.dim), dtype=self.dtype, device=self.device)
+                    if row:
+                        grown[:row] = self.matrix[:row]
+                    self.matrix = grown
+            self.rows[key] = row
+        self.matrix[row] = embedding.reshape(-1).to(self.dtype)
+
+    def pop(self, key: str, default=None):
+        if key not in self.rows:
+            return default
+        value = self[key]
+        self._free_rows.append(self.rows.pop(key))
+        return value
+
+
+class StoredEmbeddingView:
+    """
+    Dict-like view serving node embeddings straight from an EmbeddingStore memmap
+
+    Only the key set is held in memory; vectors stay in the OS page cache.
+    """
+
+    def __init__(self, store, device: str = 'cpu'):
+        self.store = store
+        self.device = device
+        self._keys: Dict[str, None] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._keys
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def keys(self):
+        return self._keys.keys()
+
+    def __getitem__(self, key: str) -> torch.Tensor:
+        if key not in self._keys:
+            raise KeyError(key)
+        return torch.from_numpy(self.store.get(key)).unsqueeze(0).to(self.device)
+
+    def get(self, key: str, default=None):
+        return self[key] if key in self._keys else default
+
+    def __setitem__(self, key: str, embedding: torch.Tensor) -> None:
+        # The store already holds the vector (it is written on compute); just track membership
+        if key not in self.store:
+            self.store.put(key, embedding.reshape(-1).cpu().numpy())
+        self._keys[key] = None
+
+    def pop(self, key: str, default=None):
+        if key not in self._keys:
+            return default
+        value = self[key]
+        del self._keys[key]
+        return value
+
+
+class EdgeEmbeddingView:
+    """
+    Read-only (head, tail) -> embedding view over KnowledgeGraphRAG's edge matrix
+
+    Values match the networkx backend's edge_embeddings: the raw vector from
+    the embedding store when there is one, otherwise the normalized matrix
+    row scaled back by its stored norm (exact up to the matrix dtype).
+    """
+
+    def __init__(self, rag):
+        self._rag = rag
+
+    def __len__(self) -> int:
+        return len(self._rag._edge_rows)
+
+    def __bool__(self) -> bool:
+        return bool(self._rag._edge_rows)
+
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        return key in self._rag._edge_rows
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        return iter(self._rag._edge_rows)
+
+    def keys(self):
+        return self._rag._edge_rows.keys()
+
+    def __getitem__(self, key: Tuple[str, str]) -> torch.Tensor:
+        rag = self._rag
+        row = rag._edge_rows[key]
+        if rag.embedding_store is not None:
+            triple = rag._triple_for_edge(key)
+            text = ' '.join(f"{triple.head} {triple.relation} {triple.tail}".lower().split())
+            stored = rag.embedding_store.get(text)
+            if stored is not None:
+                return torch.from_numpy(stored).unsqueeze(0).to(rag.device)
+        return (rag._edge_matrix[row].to(torch.float32) * rag._edge_norms[row]).unsqueeze(0)
+
+    def get(self, key: Tuple[str, str], default=None):
+        return self[key] if key in self._rag._edge_rows else default
+
+
+class EdgeKeyView:
+    """
+    Read-only row -> edge key sequence over CompactTripleGraph edge ids
+
+    Stands in for KnowledgeGraphRAG._edge_keys in compact mode, where edge
+    matrix rows are the graph's edge ids. Removed edges read as None.
+    """
+
+    def __init__(self, graph: CompactTripleGraph):
+        self._graph = graph
+
+    def __len__(self) -> int:
+        return self._graph.edge_capacity
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [self[index] for index in range(*row.indices(len(self)))]
+        triple = self._graph.edge_triple(row)
+        if triple is None:
+            return None
+        head, relation, tail = triple
+        return (head, relation, tail) if self._graph.multigraph else (head, tail)
+
+    def __iter__(self) -> Iterator[Optional[Tuple[str, ...]]]:
+        return (self[row] for row in range(len(self)))
+
+
+class EdgeRowView:
+    """
+    Read-only edge key -> row mapping over CompactTripleGraph edge ids
+
+    Keys are (head, tail), or (head, relation, tail) in multigraph mode.
+    """
+
+    def __init__(self, graph: CompactTripleGraph):
+        self._graph = graph
+
+    def _row(self, key: Tuple[str, ...]) -> Optional[int]:
+        if self._graph.multigraph:
+            head, relation, tail = key
+            return self._graph.edge_id(head, tail, key=relation)
+        head, tail = key
+        return self._graph.edge_id(head, tail)
+
+    def __len__(self) -> int:
+        return self._graph.number_of_edges()
+
+    def __bool__(self) -> bool:
+        return self._graph.number_of_edges() > 0
+
+    def __contains__(self, key: Tuple[str, ...]) -> bool:
+        return self._row(key) is not None
+
+    def __getitem__(self, key: Tuple[str, ...]) -> int:
+        row = self._row(key)
+        if row is None:
+            raise KeyError(key)
+        return row
+
+    def get(self, key: Tuple[str, ...], default=None):
+        row = self._row(key)
+        return default if row is None else row
+
+    def __iter__(self) -> Iterator[Tuple[str, ...]]:
+        keys = EdgeKeyView(self._graph)
+        return (key for key in keys if key is not None)
+
+    def keys(self) -> List[Tuple[str, ...]]:
+        return list(self)
+
+
+class RelationIndexView:
+    """
+    Read-only relation -> edge rows index computed from the graph's relation id column
+    """
+
+    def __init__(self, graph: CompactTripleGraph):
+        self._graph = graph
+
+    def get(self, relation: str, default=None):
+        rows = self._graph.edge_ids_with_relation(relation)
+        return set(rows.tolist()) if rows.shape[0] else default
+
+    def __getitem__(self, relation: str):
+        rows = self.get(relation)
+        if rows is None:
+            raise KeyError(relation)
+        return rows
+
+    def __contains__(self, relation: str) -> bool:
+        return self._graph.edge_ids_with_relation(relation).shape[0] > 0
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._graph.live_relations())
+
+    def __len__(self) -> int:
+        return len(self._graph.live_relations())
+
+    def keys(self) -> List[str]:
+        return self._graph.live_relations()
+
+    def items(self):
+        return [(relation, self[relation]) for relation in self._graph.live_relations()]
+
+
+class TripleEdgeView:
+    """
+    Read-only Triple -> edge key mapping over the triples currently in a CompactTripleGraph
+
+    A triple is present when its edge is live and, in a simple graph, still
+    carries its relation.
+    """
+
+    def __init__(self, graph: CompactTripleGraph, triple_type):
+        self._graph = graph
+        self._triple_type = triple_type
+
+    def _edge_key(self, triple) -> Optional[Tuple[str, ...]]:
+        if self._graph.multigraph:
+            if self._graph.edge_id(triple.head, triple.tail, key=triple.relation) is None:
+                return None
+            return (triple.head, triple.relation, triple.tail)
+        edge_id = self._graph.edge_id(triple.head, triple.tail)
+        if edge_id is None or self._graph.edge_triple(edge_id)[1] != triple.relation:
+            return None
+        return (triple.head, triple.tail)
+
+    def __contains__(self, triple) -> bool:
+        return self._edge_key(triple) is not None
+
+    def __getitem__(self, triple) -> Tuple[str, ...]:
+        edge_key = self._edge_key(triple)
+        if edge_key is None:
+            raise KeyError(triple)
+        return edge_key
+
+    def get(self, triple, default=None):
+        edge_key = self._edge_key(triple)
+        return default if edge_key is None else edge_key
+
+    def __len__(self) -> int:
+        return self._graph.number_of_edges()
+
+    def __iter__(self):
+        for edge_id in range(self._graph.edge_capacity):
+            triple = self._graph.edge_triple(edge_id)
+            if triple is not None:
+                yield self._triple_type(*triple)
@@ -0,0 +1,211 @@
+import concurrent.futures
+import json
+from typing import Optional
+
+from services.impact_cache_service import impact_cache_key
+
+# Bump whenever the impact prompt or schema changes so cached verdicts are not reused
+PROMPT_VERSION = "impact-v1"
+IMPACT_MODEL = "gpt-4o-mini"
+
+
+class EffectMapGenerator:
+    def __init__(self, cache=None, model: str = IMPACT_MODEL, deduplicator=None):
+        """
+        Args:
+            cache: Optional impact cache (see services.impact_cache_service)
+            model: Chat model used to score articles
+            deduplicator: Optional NearDuplicateClusterer; near-duplicate articles share one verdict
+        """
+        self.cache = cache
+        self.model = model
+        self.deduplicator = deduplicator
+
+    def build_impact_payload(self, company_name, company_info, title, text):
+        """
+        Chat-completion body asking for the impact of one article on the company
+        """
+        return dict(
+                model=self.model,
+                messages=[
+                    {
+                        "role": "system",
+                        "content": "You analyze news events and return JSON data with impact analysis."
+                    },
+                    {
+                        "role": "user",
+                        "content": f"Analyze the following news event and provide the impact on company {company_name} :\n1. Whether the impact is positive, negative, or neutral (use 😊, 😔, or 😐).\n2. Short and crisp answer for How this event impacts the company.\n3. Short and crisp answer for Why this event impacts the company.\nLeave 'how' and 'why' blank if sentiment is neutral.\nEvent Title: {title}\nEvent Summary: {text}. Few lines about the {company_name} - {company_info}"
+                    }
+                ],
+                response_format={
+                    "type": "json_schema",
+                    "json_schema": {
+                        "name": "impact_analysis",
+                        "schema": {
+                            "type": "object",
+                            "properties": {
+                                "emoji": {
+                                    "description": "Whether the impact is positive or negative",
+                                    "type": "string"
+                                },
+                                "how": {
+                                    "description": "Short and crisp answer for how the event impacts the company",
+                                    "type": "string"
+                                },
+                                "why": {
+                                    "description": "Short and crisp answer for why the event impacts the company",
+                                    "type": "string"
+                                }
+                            },
+                            "additionalProperties": False
+                        }
+                    }
+                }
+            )
+
+    def cache_key(self, company_name, company_info, title, text):
+        return impact_cache_key(company_name, company_info, title, text, self.model, PROMPT_VERSION)
+
+    def analyze_article(self, client, company_name, company_info, title, text, timeout=None) -> Optional[dict]:
+        """
+        Ask the model for the impact of one article on the company
+
+        Returns:
+            dict: Raw verdict with emoji/how/why, or None on error
+        """
+        payload = self.build_impact_payload(company_name, company_info, title, text)
+        try:
+            response = client.chat_completion(payload, timeout=timeout)
+            raw_response = json.loads(response["choices"][0]["message"]["content"])
+        except Exception as e:
+            raw_response = {"Error" : e}
+
+        print(f"raw_response : {raw_response}")
+
+        if "Error" in raw_response or "emoji" not in raw_response:
+            return None
+        return raw_response
+
+    @staticmethod
+    def impact_from_verdict(title, verdict) -> Optional[dict]:
+        """
+        Turn a verdict into a displayable impact, or None if it is neutral
+        """
+        if verdict is None or verdict["emoji"] == "😐":
+            return None
+        return {
+            "event": title,
+            "emoji": verdict["emoji"],
+            "how": verdict.get("how", ""),
+            "why": verdict.get("why", "")
+        }
+
+    def analyze_news_impact(self, client, company_name, company_info, news_items, max_workers=8, timeout=60, on_impact=None, cache_only=False):
+        """
+        Analyze news items and generate impact assessments
+        Note: This is a simplified version. In real-world,
+        you'd want more sophisticated NLP/ML for impact analysis
+
+        Verdicts already in the cache are served without an API call; the rest
+        are scored concurrently and written back. With a deduplicator only one
+        article per near-duplicate cluster is scored and its verdict is shared
+        with the other copies in the results; only the scored article's verdict
+        is cached, since cluster membership changes from run to run. Results
+        come back in news_items order regardless of completion order.
+
+        Args:
+            client: LLMClient used for the chat calls
+            company_name: Company being analyzed
+            company_info: Short description of the company
+            news_items: {title: {url: text}}
+            max_workers: Maximum number of concurrent model calls (1 runs serially)
+            timeout: Per-request timeout in seconds
+            on_impact: Called with each non-neutral impact as soon as it is ready
+            cache_only: Only serve precomputed verdicts (e.g. from the nightly batch), never call the API
+        """
+        articles = []
+        for title, url_text in news_items.items():
+            text = list(url_text.values())[0]
+            if text == "":
+                continue
+            articles.append((title, text))
+
+        keys = [self.cache_key(company_name, company_info, title, text) for title, text in articles]
+        cached = {}
+        if self.cache is not None:
+            try:
+                cached = self.cache.get_many(keys)
+            except Exception as e:
+                print(f"Error reading impact cache: {e}")
+        print(f"Impact cache: {len(cached)} of {len(articles)} articles already scored")
+
+        # Syndicated copies of one story form a cluster; its first article is the one scored
+        clusters = [[position] for position in range(len(articles))]
+        if self.deduplicator is not None and len(articles) > 1:
+            grouped = self.deduplicator.cluster({position: text for position, (title, text) in enumerate(articles)})
+            clusters = [[representative] + duplicates for representative, duplicates in grouped.items()]
+            print(f"Near-duplicates: {len(articles)} articles in {len(clusters)} clusters")
+
+        results = [None] * len(articles)
+        new_verdicts = {}
+
+        def assign(cluster, verdict, scored=None):
+            if scored is not None:
+                new_verdicts[keys[scored]] = verdict
+            for position in cluster:
+                results[position] = self.impact_from_verdict(articles[position][0], verdict)
+                if results[position] is not None and on_impact is not None:
+                    on_impact(results[position])
+
+        pending = []
+        for cluster in clusters:
+            verdict = next((cached[keys[position]] for position in cluster if keys[position] in cached), None)
+            if verdict is not None:
+                assign(cluster, verdict)
+            else:
+                pending.append(cluster)
+
+        if pending and cache_only:
+            print(f"Skipping {sum(len(cluster) for cluster in pending)} unscored articles (cache-only mode)")
+        elif pending:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+                futures = {
+                    executor.submit(self.analyze_article, client, company_name, company_info, *articles[cluster[0]], timeout): cluster
+                    for cluster in pending
+                }
+
+                # Callbacks run on this thread, so on_impact may safely write to Streamlit
+                for future in concurrent.futures.as_completed(futures):
+                    cluster = futures[future]
+                    try:
+                        verdict = future.result()
+                    except Exception as e:
+                        print(f"Error analyzing {articles[cluster[0]][0]}: {e}")
+                        continue
+                    if verdict is None:
+                        continue
+                    assign(cluster, verdict, scored=cluster[0])
+
+        if self.cache is not None and new_verdicts:
+            try:
+                self.cache.put_many(new_verdicts)
+            except Exception as e:
+                print(f"Error writing impact cache: {e}")
+
+        impacts = [impact for impact in results if impact is not None]
+        return impacts
+
+    def create_impact_summary(self, impacts):
+            import plotly.express as px
+            import streamlit as st
+
+            # Count number of positive, negative, and neutral impacts
+            sentiment_counts = {
+                "Positive": sum(1 for impact in impacts if impact['emoji'] == '😊'),
+                "Negative": sum(1 for impact in impacts if impact['emoji'] == '😔'),
+            }
+
+            # Plot the sentiment distribution
+            fig = px.pie(names=list(sentiment_counts.keys()), values=list(sentiment_counts.values()),
+                         title="Sentiment Distribution of News Events")
+            st.plotly_chart(fig)
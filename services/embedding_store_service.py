@@ -0,0 +1,166 @@
+import json
+import os
+import re
+import threading
+import numpy as np
+from typing import Dict, List, Optional
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize text the same way KnowledgeGraphRAG does before embedding
+    Lowercases and collapses all whitespace runs into single spaces
+    """
+    return ' '.join(text.lower().split())
+
+
+class EmbeddingStore:
+    """
+    Persistent on-disk embedding store keyed by normalized text and model name
+
+    Vectors live in a memory-mapped float32 matrix (<model>.f32) and a JSON
+    text-to-row index (<model>.index.json) sits next to it. Rows beyond the
+    last flushed index are ignored on load, so a crash mid-write never
+    produces a text that points at a half-written vector.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        model_name: str,
+        dim: int = 768,
+        initial_capacity: int = 1024,
+        autoflush_every: int = 1024
+    ):
+        """
+        Open (or create) the store for a given model
+
+        Args:
+            cache_dir: Directory holding the matrix and index files
+            model_name: Embedding model the vectors were produced with
+            dim: Embedding dimensionality
+            initial_capacity: Number of rows to preallocate for a new store
+            autoflush_every: Persist the index after this many new rows
+        """
+        self.cache_dir = cache_dir
+        self.model_name = model_name
+        self.dim = dim
+        self.autoflush_every = autoflush_every
+
+        os.makedirs(cache_dir, exist_ok=True)
+        slug = re.sub(r'[^A-Za-z0-9_.-]+', '_', model_name)
+        self.matrix_path = os.path.join(cache_dir, f"{slug}.f32")
+        self.index_path = os.path.join(cache_dir, f"{slug}.index.json")
+
+        self._lock = threading.Lock()
+        self._index: Dict[str, int] = self._load_index()
+        self._pending = 0
+
+        capacity = max(initial_capacity, len(self._index))
+        if os.path.exists(self.matrix_path):
+            capacity = max(capacity, os.path.getsize(self.matrix_path) // (4 * dim))
+        self._open_matrix(capacity)
+
+    def _load_index(self) -> Dict[str, int]:
+        """
+        Load the text-to-row index, discarding it if it belongs to another model
+
+        Returns:
+            dict: Normalized text -> row number
+        """
+        try:
+            with open(self.index_path, 'r') as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return {}
+        except json.JSONDecodeError:
+            print(f"Error: Invalid embedding index at {self.index_path}, starting empty.")
+            return {}
+
+        if data.get("model_name") != self.model_name or data.get("dim") != self.dim:
+            print(f"Embedding index at {self.index_path} was built for another model, starting empty.")
+            return {}
+        return data["rows"]
+
+    def _open_matrix(self, capacity: int) -> None:
+        """
+        Memory-map the matrix file, growing it to `capacity` rows if needed
+        """
+        mode = 'r+' if os.path.exists(self.matrix_path) else 'w+'
+        if mode == 'r+' and os.path.getsize(self.matrix_path) < capacity * self.dim * 4:
+            with open(self.matrix_path, 'r+b') as file:
+                file.truncate(capacity * self.dim * 4)
+        self._matrix = np.memmap(self.matrix_path, dtype=np.float32, mode=mode, shape=(capacity, self.dim))
+        self._capacity = capacity
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, text: str) -> bool:
+        return normalize_text(text) in self._index
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        """
+        Look up the vector for a text
+
+        Returns:
+            np.ndarray of shape (dim,) or None if the text was never stored
+        """
+        row = self._index.get(normalize_text(text))
+        if row is None:
+            return None
+        return np.array(self._matrix[row])
+
+    def get_many(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """
+        Look up several texts at once, preserving order
+        """
+        return [self.get(text) for text in texts]
+
+    def put(self, text: str, vector: np.ndarray) -> None:
+        """
+        Store one vector (no-op if the text is already present)
+        """
+        self.put_many([text], np.asarray(vector, dtype=np.float32).reshape(1, self.dim))
+
+    def put_many(self, texts: List[str], vectors: np.ndarray) -> None:
+        """
+        Store vectors for several texts
+
+        Args:
+            texts: Raw texts, normalized before being used as keys
+            vectors: Array of shape (len(texts), dim)
+        """
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(texts), self.dim)
+        with self._lock:
+            for text, vector in zip(texts, vectors):
+                key = normalize_text(text)
+                if key in self._index:
+                    continue
+                row = len(self._index)
+                if row >= self._capacity:
+                    self._matrix.flush()
+                    self._open_matrix(self._capacity * 2)
+                self._matrix[row] = vector
+                self._index[key] = row
+                self._pending += 1
+
+            if self._pending >= self.autoflush_every:
+                self._flush_locked()
+
+    def flush(self) -> None:
+        """
+        Persist the matrix and then the index
+        """
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if self._pending == 0:
+            return
+        self._matrix.flush()
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, 'w') as file:
+            json.dump({"model_name": self.model_name, "dim": self.dim, "rows": self._index}, file)
+        os.replace(tmp_path, self.index_path)
+        self._pending = 0
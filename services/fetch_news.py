@@ -3,6 +3,7 @@ import json, os
 from serpapi import GoogleSearch
 from dotenv import load_dotenv
 from newspaper import Article
+from services.news_source_service import get_source_registry
 
 load_dotenv()
 
@@ -44,22 +45,11 @@ def extract_texts_concurrently(titles_links: Dict[str, str]) -> Dict[str, str]:
     return results
 
 def isValidNews(url):
-    if "livemint.com" in url or "outlookbusiness.com" in url or "businesstoday.com" in url or "financialexpress.com" in url or "reuters.com" in url or "indiatoday.in" in url or "economictimes.indiatimes.com" in url or "techcrunch.com" in url:
-        return True
-    else:
-        return False 
-    
+    # Whitelisted sources live in services/news_source_service.py (or NEWS_SOURCES_PATH)
+    return get_source_registry().is_valid(url)
+
 def extract_titles_links(news_list):
-    titles_links = {}
-    for item in news_list:
-        if "stories" in item:
-            for story in item["stories"]:
-                if isValidNews(story["link"]):
-                    titles_links.update({story["title"] : story["link"]})
-        else:
-            if isValidNews(item["link"]):
-                titles_links.update({item["title"] : item["link"]})
-    return titles_links
+    return get_source_registry().filter_links(news_list)
 
 def search_news(company_name):
 
@@ -0,0 +1,118 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+
+def impact_cache_key(company_name: str, company_info: str, title: str, text: str, model: str, prompt_version: str) -> str:
+    """
+    Content address of one impact verdict
+
+    Any change to the company description, the article, the model or the
+    prompt produces a new key, so stale verdicts are never served.
+
+    Returns:
+        str: sha256 hex digest
+    """
+    fields = [company_name, company_info, title, text, model, prompt_version]
+    return hashlib.sha256(json.dumps(fields, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+class MongoImpactCache:
+    """
+    Impact verdicts stored in a MongoDB collection, one document per key
+    """
+    backend = "mongo"
+
+    def __init__(self, collection):
+        """
+        Args:
+            collection: pymongo collection, e.g. db['impact_cache']
+        """
+        self.collection = collection
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, dict]:
+        keys = list(keys)
+        if not keys:
+            return {}
+        return {document["_id"]: document["verdict"] for document in self.collection.find({"_id": {"$in": keys}})}
+
+    def put_many(self, verdicts: Dict[str, dict]) -> None:
+        if not verdicts:
+            return
+        from pymongo import ReplaceOne
+        now = time.time()
+        self.collection.bulk_write([
+            ReplaceOne({"_id": key}, {"_id": key, "verdict": verdict, "time": now}, upsert=True)
+            for key, verdict in verdicts.items()
+        ], ordered=False)
+
+    def __len__(self) -> int:
+        return self.collection.estimated_document_count()
+
+
+class SQLiteImpactCache:
+    """
+    Impact verdicts stored in a local SQLite file (offline runs and tests)
+    """
+    backend = "sqlite"
+
+    def __init__(self, path: str = "impact_cache.sqlite"):
+        """
+        Args:
+            path: Database file, created on first use
+        """
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS impacts (key TEXT PRIMARY KEY, verdict TEXT NOT NULL, time REAL NOT NULL)")
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, dict]:
+        keys = list(keys)
+        found = {}
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, verdict FROM impacts WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                found.update({key: json.loads(verdict) for key, verdict in rows})
+        return found
+
+    def put_many(self, verdicts: Dict[str, dict]) -> None:
+        if not verdicts:
+            return
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO impacts (key, verdict, time) VALUES (?, ?, ?)",
+                [(key, json.dumps(verdict, ensure_ascii=False), now) for key, verdict in verdicts.items()]
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM impacts").fetchone()[0]
+
+
+def create_impact_cache(backend: str, collection=None, path: Optional[str] = None):
+    """
+    Create an impact cache for the given backend name ('mongo' or 'sqlite')
+
+    Args:
+        backend: Backend name
+        collection: pymongo collection for the 'mongo' backend
+        path: Database file for the 'sqlite' backend
+    """
+    if backend == MongoImpactCache.backend:
+        if collection is None:
+            raise ValueError("The 'mongo' impact cache needs a collection")
+        return MongoImpactCache(collection)
+    if backend == SQLiteImpactCache.backend:
+        return SQLiteImpactCache(path or "impact_cache.sqlite")
+    raise ValueError(f"Unsupported impact cache backend: {backend}")
@@ -0,0 +1,282 @@
+import json
+import os
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from services.rate_limit_service import TokenBucket
+
+# Status codes worth retrying: rate limiting and transient server errors
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+# A 429 means the request was turned away unprocessed, so it is safe to resend even when not idempotent
+REJECTED_STATUS_CODES = {429}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+# Provider name -> (base URL, environment variable holding the API key)
+LLM_PROVIDERS = {
+    "groq": ("https://api.groq.com/openai/v1", "GROQ_API_KEY"),
+    "openai": ("https://api.openai.com/v1", "OPENAI_API_KEY"),
+}
+
+
+class LLMRequestError(Exception):
+    """
+    Raised when an LLM request fails for good (non-retryable status or retries exhausted)
+    """
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class LLMClient:
+    """
+    Shared HTTP client for OpenAI-compatible chat APIs (Groq, OpenAI)
+
+    Keeps one pooled requests.Session so TLS connections are reused across
+    calls, caps the number of in-flight requests with a semaphore, optionally
+    rate-limits with a token bucket, and retries 429/5xx responses and
+    connection errors with capped, fully-jittered exponential backoff
+    (honouring Retry-After when the server sends it). Requests that are not
+    idempotent (POSTs that create files, batches or runs) are only retried
+    when the server cannot have acted on them: a 429 or a connect timeout.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        default_headers: Optional[Dict[str, str]] = None,
+        timeout: float = 30,
+        pool_size: int = 10,
+        max_concurrency: int = 8,
+        requests_per_second: Optional[float] = None,
+        burst: Optional[float] = None,
+        max_retries: int = 4,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0
+    ):
+        """
+        Args:
+            base_url: API root, e.g. https://api.groq.com/openai/v1
+            api_key: Bearer token
+            default_headers: Extra headers sent with every request
+            timeout: Per-attempt timeout in seconds
+            pool_size: Keep-alive connections kept per host
+            max_concurrency: Maximum number of requests in flight
+            requests_per_second: Token-bucket rate (None disables rate limiting)
+            burst: Token-bucket capacity
+            max_retries: Retries after the first attempt
+            backoff_base: First backoff ceiling in seconds, doubled per attempt
+            backoff_max: Upper bound on a single backoff
+        """
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        # Content-Type is left to requests so JSON and multipart uploads both work
+        self.session.headers.update({"Authorization": f"Bearer {api_key}"})
+        if default_headers:
+            self.session.headers.update(default_headers)
+
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._bucket = TokenBucket(requests_per_second, burst) if requests_per_second else None
+
+    def _backoff(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        """
+        Seconds to wait before retry number `attempt` (0-based)
+        """
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        if response is not None:
+            try:
+                delay = max(delay, float(response.headers.get("Retry-After", 0)))
+            except ValueError:
+                pass
+        return delay
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        payload: Optional[Dict[str, Any]] = None,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        stream: bool = False,
+        timeout: Optional[float] = None,
+        files: Optional[Dict[str, Any]] = None,
+        data: Optional[Dict[str, Any]] = None,
+        idempotent: Optional[bool] = None
+    ) -> requests.Response:
+        """
+        Send one request with rate limiting, bounded concurrency and retries
+
+        Args:
+            method: HTTP method
+            path: Path relative to base_url
+            payload: JSON body
+            params: Query string parameters
+            headers: Per-request extra headers
+            stream: Return as soon as headers arrive; the caller must hold a
+                concurrency slot until the body is consumed (see stream_events)
+            timeout: Per-attempt timeout overriding the client default
+            files: Multipart files (see requests), sent instead of a JSON body
+            data: Multipart form fields sent alongside `files`
+            idempotent: Whether resending after a 5xx or a dropped connection is safe;
+                defaults to True for GET/HEAD/OPTIONS/PUT/DELETE and False otherwise
+
+        Returns:
+            requests.Response: A successful (2xx) response
+        """
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        timeout = timeout or self.timeout
+        body = {"files": files, "data": data} if files is not None else {"json": payload}
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        retry_errors = (requests.ConnectionError, requests.Timeout) if idempotent else (requests.ConnectTimeout,)
+        retry_codes = RETRY_STATUS_CODES if idempotent else REJECTED_STATUS_CODES
+        for attempt in range(self.max_retries + 1):
+            if self._bucket is not None:
+                self._bucket.acquire()
+
+            response = None
+            try:
+                if stream:
+                    response = self.session.request(method, url, params=params, headers=headers, timeout=timeout, stream=True, **body)
+                else:
+                    with self._semaphore:
+                        response = self.session.request(method, url, params=params, headers=headers, timeout=timeout, **body)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if not isinstance(e, retry_errors):
+                    raise LLMRequestError(f"{method} {url} failed and is not safe to resend: {e}") from e
+                if attempt == self.max_retries:
+                    raise LLMRequestError(f"{method} {url} failed after {attempt + 1} attempts: {e}") from e
+                print(f"LLM request error ({e}), retrying (attempt {attempt + 1}/{self.max_retries})")
+                time.sleep(self._backoff(attempt))
+                continue
+
+            if response.ok:
+                return response
+            # A streamed response keeps its pooled connection until closed
+            if response.status_code not in retry_codes or attempt == self.max_retries:
+                message = f"{method} {url} returned {response.status_code}: {response.text[:500]}"
+                response.close()
+                raise LLMRequestError(message, status_code=response.status_code)
+            response.close()
+            print(f"LLM request returned {response.status_code}, retrying (attempt {attempt + 1}/{self.max_retries})")
+            time.sleep(self._backoff(attempt, response))
+
+    def post_json(
+        self,
+        path: str,
+        payload: Dict[str, Any],
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        idempotent: bool = False
+    ) -> Dict[str, Any]:
+        """
+        POST a JSON body and return the decoded JSON response
+
+        Pass idempotent=True for calls without side effects (e.g. completions)
+        so they are also retried on 5xx and dropped connections.
+        """
+        return self.request("POST", path, payload=payload, headers=headers, timeout=timeout, idempotent=idempotent).json()
+
+    def get_json(self, path: str, params: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """
+        GET a resource and return the decoded JSON response
+        """
+        return self.request("GET", path, params=params, headers=headers).json()
+
+    def chat_completion(self, payload: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Call /chat/completions and return the raw response dict
+        """
+        return self.post_json("chat/completions", payload, timeout=timeout, idempotent=True)
+
+    def stream_events(
+        self,
+        path: str,
+        payload: Dict[str, Any],
+        headers: Optional[Dict[str, str]] = None,
+        idempotent: bool = False
+    ) -> Iterator[Tuple[Optional[str], str]]:
+        """
+        POST a JSON body and iterate over the server-sent events of the response
+
+        Retries apply until the response starts; a stream that breaks midway
+        raises instead of being replayed. The concurrency slot is held until
+        the stream is exhausted or the generator is closed. `idempotent` works
+        as in post_json.
+
+        Yields:
+            tuple: (event name or None, data string) per event, stopping at [DONE]
+        """
+        with self._semaphore:
+            response = self.request("POST", path, payload=payload, headers=headers, stream=True, idempotent=idempotent)
+            try:
+                event, data = None, []
+                for line in response.iter_lines(decode_unicode=True):
+                    if line:
+                        field, _, value = line.partition(':')
+                        value = value[1:] if value.startswith(' ') else value
+                        if field == "event":
+                            event = value
+                        elif field == "data":
+                            data.append(value)
+                        continue
+                    if data:
+                        if data == ["[DONE]"]:
+                            return
+                        yield event, '\n'.join(data)
+                    event, data = None, []
+                if data and data != ["[DONE]"]:
+                    yield event, '\n'.join(data)
+            finally:
+                response.close()
+
+    def stream_chat_completion(self, payload: Dict[str, Any]) -> Iterator[str]:
+        """
+        Call /chat/completions with stream=True and yield content deltas as they arrive
+        """
+        for _, data in self.stream_events("chat/completions", dict(payload, stream=True), idempotent=True):
+            choices = json.loads(data).get("choices") or [{}]
+            content = choices[0].get("delta", {}).get("content")
+            if content:
+                yield content
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_CLIENTS: Dict[tuple, LLMClient] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def get_llm_client(provider: str, api_key: Optional[str] = None, **client_kwargs) -> LLMClient:
+    """
+    Return the process-wide client for a provider, creating it on first use
+
+    Args:
+        provider: Key of LLM_PROVIDERS ('groq' or 'openai')
+        api_key: API key; read from the provider's environment variable if omitted
+        client_kwargs: LLMClient options, only applied when the client is created
+    """
+    if provider not in LLM_PROVIDERS:
+        raise ValueError(f"Unsupported LLM provider: {provider}")
+    base_url, env_var = LLM_PROVIDERS[provider]
+    api_key = api_key or os.getenv(env_var)
+
+    key = (provider, api_key)
+    with _CLIENTS_LOCK:
+        if key not in _CLIENTS:
+            _CLIENTS[key] = LLMClient(base_url, api_key, **client_kwargs)
+        return _CLIENTS[key]
@@ -0,0 +1,108 @@
+import re
+import zlib
+import numpy as np
+from typing import Dict, List, Optional
+
+# Largest Mersenne prime below 2**64, used as the modulus of the MinHash permutations
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+WORD_PATTERN = re.compile(r"\w+")
+
+
+class NearDuplicateClusterer:
+    """
+    MinHash/LSH clustering of near-duplicate articles
+
+    Each article is reduced to a MinHash signature over its word shingles and
+    the signature is split into bands. Articles sharing a band bucket are
+    candidates; a candidate joins the bucket's first article when their
+    estimated Jaccard similarity reaches `threshold`. Every article is compared
+    only with the first member of the buckets it lands in, so the work grows
+    linearly with the number of articles. Syndicated copies of the same wire
+    story end up in one cluster. Texts shorter than one shingle carry too
+    little evidence and are never clustered.
+    """
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128, bands: int = 32, shingle_size: int = 5, seed: int = 1):
+        """
+        Args:
+            threshold: Minimum estimated Jaccard similarity for two articles to be duplicates
+            num_perm: Number of MinHash permutations (signature length)
+            bands: LSH bands; num_perm must be divisible by it
+            shingle_size: Words per shingle
+            seed: Seed for the permutation coefficients
+        """
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands})")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        generator = np.random.RandomState(seed)
+        self._a = generator.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = generator.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> np.ndarray:
+        """
+        32-bit hashes of the article's word shingles (empty for texts shorter than one shingle)
+        """
+        words = WORD_PATTERN.findall(text.lower())
+        return np.fromiter(
+            {zlib.crc32(" ".join(words[i:i + self.shingle_size]).encode("utf-8"))
+             for i in range(len(words) - self.shingle_size + 1)},
+            dtype=np.uint64
+        )
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """
+        MinHash signature of shape [num_perm], or None if the text has no shingles
+        """
+        hashes = self.shingles(text)
+        if hashes.shape[0] == 0:
+            return None
+        permuted = (np.outer(hashes, self._a) + self._b) % MERSENNE_PRIME & MAX_HASH
+        return permuted.min(axis=0)
+
+    def cluster(self, texts: Dict[str, str]) -> Dict[str, List[str]]:
+        """
+        Group near-duplicate texts
+
+        Args:
+            texts: {key: text}, e.g. {title: article text}
+
+        Returns:
+            dict: {representative key: [duplicate keys]} covering every key once; the
+            representative is the first key of its cluster in input order
+        """
+        keys = list(texts)
+        signatures = [self.signature(texts[key]) for key in keys]
+        parent = list(range(len(keys)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for band in range(self.bands):
+            buckets = {}
+            start = band * self.rows
+            for i, signature in enumerate(signatures):
+                if signature is None:
+                    continue
+                first = buckets.setdefault(signature[start:start + self.rows].tobytes(), i)
+                if first == i or find(first) == find(i):
+                    continue
+                if np.mean(signatures[first] == signature) >= self.threshold:
+                    # The earliest article of a cluster stays its representative
+                    low, high = sorted((find(first), find(i)))
+                    parent[high] = low
+
+        clusters = {}
+        for i, key in enumerate(keys):
+            root = keys[find(i)]
+            duplicates = clusters.setdefault(root, [])
+            if root != key:
+                duplicates.append(key)
+        return clusters
@@ -0,0 +1,148 @@
+import json
+import os
+import re
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, List, Optional
+
+
+@dataclass
+class NewsSource:
+    """
+    A whitelisted news site and how to treat it
+
+    domain matches the host and all of its subdomains. parser is a hint for
+    the text extractor, max_concurrency caps simultaneous downloads from the
+    host and priority decides which link wins when several sources carry a
+    story under the same title (higher wins).
+    """
+    domain: str
+    name: str = ""
+    priority: int = 0
+    parser: str = "newspaper3k"
+    max_concurrency: int = 2
+
+
+# Optional scheme (or a scheme-relative //) and credentials, then the host up to the port, path, query or fragment
+HOST_PATTERN = re.compile(r"(?:(?:[A-Za-z][A-Za-z0-9+.-]*:)?//)?(?:[^@/?#]*@)?([^:/?#\[\]]*)")
+
+DEFAULT_SOURCES = [
+    NewsSource("livemint.com", "Mint", priority=2),
+    NewsSource("economictimes.indiatimes.com", "The Economic Times", priority=2),
+    NewsSource("financialexpress.com", "Financial Express", priority=1),
+    NewsSource("businesstoday.com", "Business Today", priority=1),
+    NewsSource("outlookbusiness.com", "Outlook Business", priority=1),
+    NewsSource("reuters.com", "Reuters", priority=3, max_concurrency=1),
+    NewsSource("indiatoday.in", "India Today"),
+    NewsSource("techcrunch.com", "TechCrunch"),
+]
+
+
+class SourceRegistry:
+    """
+    Whitelist of news sources matched on the URL host
+
+    The host is sliced out of each URL once and looked up suffix by suffix
+    (news.livemint.com, then livemint.com, then com) in the registered
+    domains, so a whitelisted domain in the path or query string of another
+    site never matches. Hosts repeat heavily in search results, so the
+    outcome per host is memoized and most links cost a single dict lookup.
+    """
+
+    def __init__(self, sources: Iterable[NewsSource] = DEFAULT_SOURCES):
+        self._sources: Dict[str, NewsSource] = {}
+        self._by_host: Dict[str, Optional[NewsSource]] = {}
+        for source in sources:
+            self.register(source)
+
+    @classmethod
+    def from_file(cls, path: str) -> "SourceRegistry":
+        """
+        Load sources from a JSON list of NewsSource fields, e.g.
+        [{"domain": "livemint.com", "name": "Mint", "priority": 2}]
+        """
+        with open(path, 'r', encoding='utf-8') as file:
+            return cls(NewsSource(**entry) for entry in json.load(file))
+
+    def register(self, source: NewsSource) -> None:
+        source.domain = source.domain.lower().strip(".")
+        if source.domain.startswith("www."):
+            source.domain = source.domain[4:]
+        self._sources[source.domain] = source
+        self._by_host.clear()
+
+    @property
+    def sources(self) -> List[NewsSource]:
+        return list(self._sources.values())
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        """
+        Lowercased host of a URL, without scheme, credentials, port or trailing dot
+        """
+        return HOST_PATTERN.match(url).group(1).rstrip(".").lower()
+
+    def _match_host(self, host: str) -> Optional[NewsSource]:
+        while host:
+            source = self._sources.get(host)
+            if source is not None:
+                return source
+            dot = host.find(".")
+            host = host[dot + 1:] if dot >= 0 else ""
+        return None
+
+    def match(self, url: str) -> Optional[NewsSource]:
+        """
+        The registered source serving this URL, or None
+        """
+        host = self.host_of(url)
+        try:
+            return self._by_host[host]
+        except KeyError:
+            source = self._by_host[host] = self._match_host(host)
+            return source
+
+    def is_valid(self, url: str) -> bool:
+        return self.match(url) is not None
+
+    def filter_links(self, news_list: List[dict]) -> Dict[str, str]:
+        """
+        Whitelisted {title: link} from raw Google News results in one pass
+
+        Stories nested in "stories" clusters are flattened in place. When two
+        sources carry the same title the higher-priority one is kept; between
+        equal priorities the later link wins, as it did before priorities.
+        """
+        titles_links, priorities = {}, {}
+        for item in news_list:
+            for story in (item["stories"] if "stories" in item else [item]):
+                link = story.get("link")
+                source = self.match(link) if link else None
+                if source is None:
+                    continue
+                title = story.get("title")
+                if title not in priorities or source.priority >= priorities[title]:
+                    titles_links[title] = link
+                    priorities[title] = source.priority
+        return titles_links
+
+    def host_limits(self) -> Dict[str, int]:
+        """
+        Per-domain download concurrency, in the form AsyncArticleFetcher takes
+        """
+        return {domain: source.max_concurrency for domain, source in self._sources.items()}
+
+    def to_json(self) -> str:
+        return json.dumps([asdict(source) for source in self._sources.values()], indent=2)
+
+
+_default_registry = None
+
+def get_source_registry() -> SourceRegistry:
+    """
+    Shared registry, read from NEWS_SOURCES_PATH when it is set and the defaults otherwise
+    """
+    global _default_registry
+    if _default_registry is None:
+        path = os.getenv('NEWS_SOURCES_PATH')
+        _default_registry = SourceRegistry.from_file(path) if path else SourceRegistry()
+    return _default_registry
@@ -0,0 +1,141 @@
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class TermLinkStore:
+    """
+    Per-term news link cache in MongoDB
+
+    Each search term has its own document {_id: term, links: [{title, link}],
+    time}, so terms go stale independently and only stale terms are
+    re-scraped. A refresh merges the new links into a term's earlier ones in
+    one bulk write, deduplicated by link and capped at the `max_links` most
+    recent, and stale terms can be refreshed on a background thread while
+    callers serve the fresh subset.
+    """
+
+    def __init__(self, collection, ttl_seconds: float = 4 * 60 * 60, max_links: int = 200):
+        """
+        Args:
+            collection: pymongo collection, e.g. db['term_links']
+            ttl_seconds: Age after which a term is considered stale
+            max_links: Most links kept per term; the oldest are dropped first
+        """
+        self.collection = collection
+        self.ttl_seconds = ttl_seconds
+        self.max_links = max_links
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def load(self, terms: List[str]) -> Tuple[Dict[str, Dict[str, str]], List[str]]:
+        """
+        Read the cached links for some terms
+
+        Returns:
+            tuple: ({term: {title: link}} for every cached term, stale or missing terms in input order)
+        """
+        now = time.time()
+        titles_links, fresh = {}, set()
+        for document in self.collection.find({"_id": {"$in": list(terms)}}):
+            titles_links[document["_id"]] = {item["title"]: item["link"] for item in document.get("links", [])}
+            if now - document.get("time", 0) <= self.ttl_seconds:
+                fresh.add(document["_id"])
+        stale = [term for term in dict.fromkeys(terms) if term not in fresh]
+        return titles_links, stale
+
+    def upsert_many(self, titles_links: Dict[str, Dict[str, str]], fetched_at: Optional[float] = None) -> None:
+        """
+        Merge newly scraped links into the per-term documents and mark them fresh
+
+        A link that is already stored is moved to the newest end instead of
+        being duplicated, and each document keeps only its `max_links` newest
+        links. Terms that came back without links are left alone, so a failed
+        scrape keeps serving the previous links and is retried once they go
+        stale.
+        """
+        titles_links = {term: links for term, links in titles_links.items() if links}
+        if not titles_links:
+            return
+        from pymongo import UpdateOne
+        fetched_at = fetched_at or time.time()
+        operations = []
+        for term, links in titles_links.items():
+            # One entry per link, the last title seen for it wins
+            items = list({link: {"title": title, "link": link} for title, link in links.items()}.values())
+            operations.append(UpdateOne({"_id": term}, {"$pull": {"links": {"link": {"$in": [item["link"] for item in items]}}}}))
+            operations.append(UpdateOne(
+                {"_id": term},
+                {"$push": {"links": {"$each": items, "$slice": -self.max_links}}, "$set": {"time": fetched_at}},
+                upsert=True
+            ))
+        # Ordered, so each term's $pull runs before its $push
+        self.collection.bulk_write(operations, ordered=True)
+
+    def refresh(self, terms: List[str], search_fn: Callable[[List[str]], Dict[str, Dict[str, str]]]) -> Dict[str, Dict[str, str]]:
+        """
+        Re-scrape the given terms and store the results
+
+        Returns:
+            dict: {term: {title: link}}, the stored (merged) links of the terms the scrape found links for
+        """
+        if not terms:
+            return {}
+        titles_links = {term: links for term, links in search_fn(list(terms)).items() if links}
+        self.upsert_many(titles_links)
+        print(f"Refreshed links for {len(titles_links)}/{len(terms)} terms")
+        if not titles_links:
+            return {}
+        merged, _ = self.load(list(titles_links))
+        return merged
+
+    def refresh_in_background(self, terms: List[str], search_fn: Callable[[List[str]], Dict[str, Dict[str, str]]]) -> Optional[threading.Thread]:
+        """
+        Refresh terms on a daemon thread, skipping terms already being refreshed
+
+        Returns:
+            threading.Thread or None if there was nothing new to refresh
+        """
+        with self._lock:
+            terms = [term for term in terms if term not in self._refreshing]
+            self._refreshing.update(terms)
+        if not terms:
+            return None
+
+        def run():
+            try:
+                self.refresh(terms, search_fn)
+            except Exception as e:
+                print(f"Background refresh failed: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.difference_update(terms)
+
+        thread = threading.Thread(target=run, name="term-links-refresh", daemon=True)
+        thread.start()
+        return thread
+
+    def get(self, terms: List[str], search_fn: Callable[[List[str]], Dict[str, Dict[str, str]]], background: bool = True) -> Dict[str, Dict[str, str]]:
+        """
+        Links for the requested terms, re-scraping only what is stale
+
+        With background=True the fresh subset is returned immediately and the
+        stale terms are refreshed on a background thread; if no requested term
+        is fresh the refresh runs inline so there is something to show.
+
+        Returns:
+            dict: {term: {title: link}} in the order of `terms`
+        """
+        cached, stale = self.load(terms)
+        fresh = {term: cached[term] for term in terms if term in cached and term not in stale}
+        print(f"Term links: {len(fresh)} fresh, {len(stale)} stale")
+
+        if stale and (not background or not fresh):
+            fresh.update(self.refresh(stale, search_fn))
+            # Terms whose scrape failed fall back to their older links
+            for term in stale:
+                if term not in fresh and term in cached:
+                    fresh[term] = cached[term]
+        elif stale:
+            self.refresh_in_background(stale, search_fn)
+        return {term: fresh[term] for term in terms if term in fresh}
@@ -0,0 +1,137 @@
+import threading
+import time
+import numpy as np
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+# Sentence-level encoder the default threshold is calibrated for (see tests/test_query_cache_service.py).
+# Raw mean-pooled BERT vectors are anisotropic: unrelated queries already score ~0.9 there.
+QUERY_CACHE_MODEL_NAME = 'all-MiniLM-L6-v2'
+QUERY_CACHE_THRESHOLD = 0.92
+
+
+def normalize_query(query: str) -> str:
+    """
+    Canonical form used as the exact-hit key
+    Lowercases, collapses whitespace and drops trailing question marks
+    """
+    return " ".join(query.lower().split()).rstrip("?").strip()
+
+
+class SemanticQueryCache:
+    """
+    Two-level answer cache for the KG-RAG front end
+
+    Level 1 is an exact-hit map keyed on the normalized query. Level 2 reuses
+    the answer of a previous query whose embedding has cosine similarity of at
+    least `similarity_threshold` with the new one; the default assumes a
+    sentence-transformers encoder (QUERY_CACHE_MODEL_NAME). Entries are evicted LRU
+    once `max_entries` is reached and expire after `ttl_seconds`. Everything
+    is dropped when the graph version changes.
+    """
+
+    def __init__(
+        self,
+        embed_fn: Callable[[str], Any],
+        max_entries: int = 256,
+        ttl_seconds: Optional[float] = 6 * 60 * 60,
+        similarity_threshold: float = QUERY_CACHE_THRESHOLD
+    ):
+        """
+        Args:
+            embed_fn: Maps a query to a sentence embedding (tensor or array); query vectors
+                live only in the cache, so it should not write to a persistent store
+            max_entries: Maximum number of cached answers
+            ttl_seconds: Lifetime of an entry (None disables expiry)
+            similarity_threshold: Minimum cosine similarity for a semantic hit
+        """
+        self.embed_fn = embed_fn
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.version = None
+        self.stats = {"exact_hits": 0, "semantic_hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def _embed(self, query: str) -> np.ndarray:
+        vector = np.asarray(self.embed_fn(query), dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def _check_version(self, version) -> None:
+        if version != self.version:
+            if self._entries:
+                self.stats["invalidations"] += 1
+            self._entries.clear()
+            self.version = version
+
+    def _expire(self, now: float) -> None:
+        if self.ttl_seconds is None:
+            return
+        expired = [key for key, entry in self._entries.items() if now - entry["created_at"] > self.ttl_seconds]
+        for key in expired:
+            del self._entries[key]
+            self.stats["evictions"] += 1
+
+    def get(self, query: str, version=None) -> Optional[Any]:
+        """
+        Return a cached answer for the query, or None on a miss
+
+        Args:
+            query: Raw user query
+            version: Graph version the answer must have been computed against
+        """
+        key = normalize_query(query)
+        with self._lock:
+            self._check_version(version)
+            self._expire(time.time())
+
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats["exact_hits"] += 1
+                return entry["value"]
+            if not self._entries:
+                self.stats["misses"] += 1
+                return None
+
+        # Embed outside the lock; the encoder can take a while on a cold store
+        vector = self._embed(key)
+        with self._lock:
+            if version != self.version or not self._entries:
+                self.stats["misses"] += 1
+                return None
+            keys = list(self._entries.keys())
+            matrix = np.stack([self._entries[k]["vector"] for k in keys])
+            scores = matrix @ vector
+            best = int(np.argmax(scores))
+            if scores[best] >= self.similarity_threshold:
+                self._entries.move_to_end(keys[best])
+                self.stats["semantic_hits"] += 1
+                print(f"Semantic cache hit: '{key}' ~ '{keys[best]}' ({scores[best]:.3f})")
+                return self._entries[keys[best]]["value"]
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, query: str, value: Any, version=None) -> None:
+        """
+        Cache an answer for the query against a graph version
+        """
+        key = normalize_query(query)
+        vector = self._embed(key)
+        with self._lock:
+            self._check_version(version)
+            self._entries[key] = {"value": value, "vector": vector, "created_at": time.time()}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,109 @@
+import threading
+import time
+import numpy as np
+from typing import Callable, Dict, List, Sequence, Tuple
+
+
+class RelevanceFilter:
+    """
+    Embedding-based relevance check between search terms and articles
+
+    Articles are split into word chunks (the title is prepended to the first
+    one) and every chunk of every article is embedded in one batched call.
+    An article is relevant when its best chunk has cosine similarity of at
+    least `threshold` with the term. Term embeddings are cached for the life
+    of the filter. `stats` keeps the running totals: articles checked and
+    dropped, seconds spent filtering and the estimated LLM time saved.
+    """
+
+    def __init__(
+        self,
+        encode_fn: Callable[[List[str]], np.ndarray],
+        threshold: float = 0.25,
+        chunk_words: int = 128,
+        max_chunks: int = 4,
+        llm_seconds_per_article: float = 3.0
+    ):
+        """
+        Args:
+            encode_fn: Maps a list of texts to an array of shape [len(texts), dim]
+            threshold: Minimum cosine similarity between the term and the best chunk
+            chunk_words: Words per chunk, keep it within the encoder's sequence length
+            max_chunks: Chunks embedded per article; the lede carries most of the signal
+            llm_seconds_per_article: Average impact-scoring latency, used to estimate the time saved
+        """
+        self.encode_fn = encode_fn
+        self.threshold = threshold
+        self.chunk_words = chunk_words
+        self.max_chunks = max_chunks
+        self.llm_seconds_per_article = llm_seconds_per_article
+        self._term_embeddings: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+        self.stats = {"checked": 0, "dropped": 0, "filter_seconds": 0.0, "saved_seconds": 0.0}
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        vectors = np.asarray(self.encode_fn(texts), dtype=np.float32).reshape(len(texts), -1)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms > 0, norms, 1)
+
+    def term_embeddings(self, terms: Sequence[str]) -> Dict[str, np.ndarray]:
+        """
+        Normalized embeddings for the terms, encoding only those not seen before
+        """
+        with self._lock:
+            missing = [term for term in dict.fromkeys(terms) if term not in self._term_embeddings]
+        if missing:
+            encoded = self._encode(missing)
+            with self._lock:
+                self._term_embeddings.update(zip(missing, encoded))
+        with self._lock:
+            return {term: self._term_embeddings[term] for term in terms}
+
+    def chunks(self, title: str, text: str) -> List[str]:
+        words = text.split()
+        chunks = [
+            " ".join(words[start:start + self.chunk_words])
+            for start in range(0, min(len(words), self.chunk_words * self.max_chunks), self.chunk_words)
+        ] or [""]
+        chunks[0] = f"{title}. {chunks[0]}" if title else chunks[0]
+        return chunks
+
+    def scores(self, items: List[Tuple[str, str, str]]) -> List[float]:
+        """
+        Best-chunk cosine similarity for each (term, title, text)
+        """
+        if not items:
+            return []
+        terms = self.term_embeddings([term for term, _, _ in items])
+        owners, chunks = [], []
+        for position, (_, title, text) in enumerate(items):
+            for chunk in self.chunks(title, text):
+                owners.append(position)
+                chunks.append(chunk)
+
+        similarities = np.einsum(
+            "ij,ij->i", self._encode(chunks), np.stack([terms[items[owner][0]] for owner in owners])
+        )
+        best = np.full(len(items), -1.0, dtype=np.float32)
+        np.maximum.at(best, np.asarray(owners), similarities)
+        return best.tolist()
+
+    def relevant(self, items: List[Tuple[str, str, str]]) -> List[bool]:
+        """
+        Keep/drop decision for each (term, title, text), updating `stats`
+        """
+        start = time.perf_counter()
+        keep = [score >= self.threshold for score in self.scores(items)]
+        elapsed = time.perf_counter() - start
+
+        dropped = keep.count(False)
+        avoided = dropped * self.llm_seconds_per_article
+        with self._lock:
+            self.stats["checked"] += len(keep)
+            self.stats["dropped"] += dropped
+            self.stats["filter_seconds"] += elapsed
+            # Net of the filter's own cost
+            self.stats["saved_seconds"] += avoided - elapsed
+        print(f"Relevance filter: dropped {dropped} of {len(keep)} articles in {elapsed:.2f}s, "
+              f"avoiding ~{avoided:.0f}s of LLM scoring")
+        return keep
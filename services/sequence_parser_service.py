@@ -0,0 +1,123 @@
+import json
+import re
+from typing import List
+
+# File-search citation markers the Assistants API inserts, e.g. 【4:0†source】
+CITATION_PATTERN = re.compile(r"【[^】]*】")
+
+
+def format_sequence(index: int, sequence: List[str]) -> str:
+    """
+    Render one entity sequence the way parse_response does
+
+    Args:
+        index: 1-based sequence number
+        sequence: Ordered entities, e.g. ["Monsoon", "Flooding", "Logistics Delays"]
+
+    Returns:
+        str: "\\nSequence <index> : a leads to b -> b leads to c"
+    """
+    steps = [f"{cause} leads to {effect}" for cause, effect in zip(sequence, sequence[1:])]
+    return f"\nSequence {index} : " + " -> ".join(steps)
+
+
+class IncrementalSequenceParser:
+    """
+    Incremental parser for streamed list-of-lists LLM output
+
+    Text chunks of a response shaped like [["a", "b", "c"], ["d", "e"]] are
+    fed in as they arrive. Each inner list is returned as soon as its closing
+    bracket has been seen, so callers can render it before the rest of the
+    response exists. Brackets inside JSON strings are ignored. Text outside
+    the outer list (preambles, code fences) is skipped.
+    """
+
+    def __init__(self):
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.count = 0
+        self._current: List[str] = []
+
+    def feed(self, chunk: str) -> List[List[str]]:
+        """
+        Consume a chunk of text
+
+        Args:
+            chunk: Next piece of the streamed response
+
+        Returns:
+            list: Inner lists completed by this chunk, in order
+        """
+        completed = []
+        for char in chunk:
+            if self.depth >= 2:
+                self._current.append(char)
+
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == '\\':
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+                continue
+
+            if char == '"' and self.depth >= 1:
+                self.in_string = True
+            elif char == '[':
+                self.depth += 1
+                if self.depth == 2:
+                    self._current = ['[']
+            elif char == ']' and self.depth > 0:
+                self.depth -= 1
+                if self.depth == 1:
+                    sequence = self._decode(''.join(self._current))
+                    if sequence is not None:
+                        self.count += 1
+                        completed.append(sequence)
+                    self._current = []
+        return completed
+
+    @staticmethod
+    def _decode(text: str):
+        try:
+            sequence = json.loads(text)
+        except json.JSONDecodeError:
+            print(f"Skipping malformed sequence: {text}")
+            return None
+        return [str(entity) for entity in sequence]
+
+
+class CitationStripper:
+    """
+    Removes citation markers from streamed text
+
+    A marker can be split across deltas, so text from the first 【 that has
+    no closing 】 yet is held back until it is closed. The concatenated
+    output equals CITATION_PATTERN.sub("", the whole text).
+    """
+
+    def __init__(self):
+        self._pending = ""
+
+    def feed(self, chunk: str) -> str:
+        """
+        Consume a chunk of text
+
+        Returns:
+            str: Text that can no longer be part of a marker, with markers removed
+        """
+        self._pending += chunk
+        cut = self._pending.find("【", self._pending.rfind("】") + 1)
+        if cut < 0:
+            cut = len(self._pending)
+        text, self._pending = self._pending[:cut], self._pending[cut:]
+        return CITATION_PATTERN.sub("", text)
+
+    def flush(self) -> str:
+        """
+        Text held back at the end of the stream (an unclosed 【 is kept as is)
+        """
+        text, self._pending = self._pending, ""
+        return CITATION_PATTERN.sub("", text)
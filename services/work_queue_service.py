@@ -0,0 +1,167 @@
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+
+
+class SQLiteWorkQueue:
+    """
+    Durable per-run work queue backed by SQLite
+
+    A run is a set of jobs (one per search term). Workers claim a job with a
+    lease, and mark it done or failed when finished. Job status is the
+    checkpoint: after a crash, jobs whose lease ran out go back to pending
+    and start_run() resumes the unfinished run instead of starting over.
+    Pass ":memory:" as the path for a throwaway local queue.
+    """
+
+    def __init__(self, path: str = "ingestion_queue.sqlite", lease_seconds: float = 15 * 60, max_attempts: int = 3):
+        """
+        Args:
+            path: Database file, created on first use
+            lease_seconds: How long a claimed job may run before it is considered abandoned
+            max_attempts: Attempts before a job is marked failed for good
+        """
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS runs ("
+                "run_id TEXT PRIMARY KEY, started_at REAL NOT NULL, finished_at REAL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, run_id TEXT NOT NULL, payload TEXT NOT NULL, "
+                "status TEXT NOT NULL DEFAULT 'pending', attempts INTEGER NOT NULL DEFAULT 0, "
+                "lease_until REAL, error TEXT, updated_at REAL NOT NULL, UNIQUE (run_id, payload))"
+            )
+
+    def start_run(self, payloads: List[str]) -> str:
+        """
+        Resume the latest unfinished run, or enqueue a new one
+
+        Payloads the unfinished run does not have yet (the term list changed
+        since it started) are added to it; jobs already in it are kept as they are.
+
+        Args:
+            payloads: Job payloads (search terms) for the run
+
+        Returns:
+            str: run_id
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT run_id FROM runs WHERE finished_at IS NULL ORDER BY started_at DESC LIMIT 1"
+            ).fetchone()
+            if row is not None:
+                added = self._conn.executemany(
+                    "INSERT OR IGNORE INTO jobs (run_id, payload, updated_at) VALUES (?, ?, ?)",
+                    [(row[0], payload, now) for payload in payloads]
+                ).rowcount
+                print(f"Resuming unfinished run {row[0]}" + (f", added {added} new jobs" if added > 0 else ""))
+                return row[0]
+
+            run_id = uuid.uuid4().hex
+            self._conn.execute("INSERT INTO runs (run_id, started_at) VALUES (?, ?)", (run_id, now))
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO jobs (run_id, payload, updated_at) VALUES (?, ?, ?)",
+                [(run_id, payload, now) for payload in payloads]
+            )
+            print(f"Started run {run_id} with {len(payloads)} jobs")
+            return run_id
+
+    def claim(self, run_id: str) -> Optional[Dict]:
+        """
+        Lease the next pending (or abandoned) job of a run
+
+        An abandoned job that already used up max_attempts is marked failed
+        instead, so a job that keeps crashing its worker is not retried forever.
+
+        Returns:
+            dict with id, payload and attempts, or None when nothing is claimable
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'failed', lease_until = NULL, error = 'lease expired', updated_at = ? "
+                "WHERE run_id = ? AND status = 'running' AND lease_until < ? AND attempts >= ?",
+                (now, run_id, now, self.max_attempts)
+            )
+            row = self._conn.execute(
+                "SELECT id, payload, attempts FROM jobs WHERE run_id = ? AND "
+                "(status = 'pending' OR (status = 'running' AND lease_until < ?)) ORDER BY id LIMIT 1",
+                (run_id, now)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, lease_until = ?, updated_at = ? WHERE id = ?",
+                (now + self.lease_seconds, now, row[0])
+            )
+        return {"id": row[0], "payload": row[1], "attempts": row[2] + 1}
+
+    def complete(self, job_id: int) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'done', lease_until = NULL, error = NULL, updated_at = ? WHERE id = ?",
+                (time.time(), job_id)
+            )
+
+    def fail(self, job_id: int, error: str) -> None:
+        """
+        Record a failed attempt; the job is retried until max_attempts is reached
+        """
+        with self._lock, self._conn:
+            attempts = self._conn.execute("SELECT attempts FROM jobs WHERE id = ?", (job_id,)).fetchone()[0]
+            status = 'failed' if attempts >= self.max_attempts else 'pending'
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, lease_until = NULL, error = ?, updated_at = ? WHERE id = ?",
+                (status, error, time.time(), job_id)
+            )
+
+    def progress(self, run_id: str) -> Dict[str, int]:
+        """
+        Job counts per status for a run
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM jobs WHERE run_id = ? GROUP BY status", (run_id,)
+            ).fetchall()
+        return dict(rows)
+
+    def next_lease_expiry(self, run_id: str) -> Optional[float]:
+        """
+        Earliest lease_until among the run's running jobs, or None if none is running
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(lease_until) FROM jobs WHERE run_id = ? AND status = 'running'", (run_id,)
+            ).fetchone()
+        return row[0]
+
+    def finish_run(self, run_id: str) -> bool:
+        """
+        Close the run if no job is pending or running
+
+        Returns:
+            bool: True if the run is now finished
+        """
+        progress = self.progress(run_id)
+        if progress.get('pending', 0) or progress.get('running', 0):
+            return False
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE runs SET finished_at = ? WHERE run_id = ?", (time.time(), run_id))
+        return True
+
+    def last_finished_at(self) -> Optional[float]:
+        with self._lock:
+            row = self._conn.execute("SELECT MAX(finished_at) FROM runs").fetchone()
+        return row[0]
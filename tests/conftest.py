@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The repo is a set of scripts run from its root; make `utils` and `services` importable
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
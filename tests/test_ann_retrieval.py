@@ -0,0 +1,87 @@
+import zlib
+
+import numpy as np
+import pytest
+import torch
+
+import app_using_llama
+from app_using_llama import KnowledgeGraphRAG
+
+DIM = 16
+
+
+def fake_embedding(text):
+    # Deterministic per text, so a rebuilt graph gets the same vectors
+    rng = np.random.RandomState(zlib.crc32(' '.join(text.lower().split()).encode('utf-8')))
+    return torch.from_numpy(rng.standard_normal(DIM).astype(np.float32))
+
+
+@pytest.fixture(autouse=True)
+def fake_encoder(monkeypatch):
+    monkeypatch.setattr(app_using_llama, "generate_embeddings", lambda text, *args, **kwargs: fake_embedding(text).unsqueeze(0))
+    monkeypatch.setattr(app_using_llama, "generate_embeddings_batch",
+                        lambda texts, *args, **kwargs: torch.stack([fake_embedding(text) for text in texts]))
+
+
+TRIPLES = [(f"company {i % 40}", f"relation {i % 7}", f"entity {i}") for i in range(300)]
+QUERIES = ["company 3 relation 3 entity 3", "entity 150", "monsoon supply chain", "relation 5"]
+
+
+def make_rag(backend="hnsw"):
+    params = {"ef_search": 300} if backend == "hnsw" else {}
+    rag = KnowledgeGraphRAG(device="cpu", embedding_cache_dir=None, ann_backend=backend,
+                            ann_params=params, ann_candidate_pool=50)
+    rag.add_triples_bulk(TRIPLES)
+    return rag
+
+
+def keys(result):
+    triples, max_score, max_score_triple = result
+    return [repr(triple) for triple in triples], round(max_score, 5), repr(max_score_triple)
+
+
+@pytest.mark.parametrize("backend", ["exact", "hnsw"])
+def test_ann_and_exact_results_agree(backend):
+    if backend == "hnsw":
+        pytest.importorskip("hnswlib")
+    rag = make_rag(backend)
+    rag.build_ann_index()
+    # Edges added after the build are scored too
+    rag.add_triple("company 1", "relation 9", "late entity")
+
+    for query in QUERIES + ["company 1 relation 9 late entity"]:
+        exact = rag.retrieve_relevant_subgraph(query, top_k=5, similarity_threshold=-1, exact=True)
+        assert keys(rag.retrieve_relevant_subgraph(query, top_k=5, similarity_threshold=-1)) == keys(exact)
+
+
+def test_save_load_round_trip(tmp_path):
+    path = str(tmp_path / "index" / "edges")
+    rag = make_rag("exact")
+    rag.build_ann_index()
+    rag.save_ann_index(path)
+
+    restored = make_rag("exact")
+    restored.load_ann_index(path)
+    assert restored._ann_size == len(TRIPLES)
+    for query in QUERIES:
+        assert keys(restored.retrieve_relevant_subgraph(query, top_k=5, similarity_threshold=-1)) == \
+            keys(rag.retrieve_relevant_subgraph(query, top_k=5, similarity_threshold=-1))
+
+
+def test_index_of_a_changed_graph_is_rejected(tmp_path):
+    path = str(tmp_path / "edges")
+    rag = make_rag("exact")
+    rag.build_ann_index()
+    rag.save_ann_index(path)
+
+    other = KnowledgeGraphRAG(device="cpu", embedding_cache_dir=None, ann_backend="exact")
+    other.add_triples_bulk(TRIPLES[:-1] + [("someone", "else", "entirely")])
+    with pytest.raises(ValueError, match="does not match"):
+        other.load_ann_index(path)
+
+    # Same (head, tail) key, new relation: the row is overwritten in place and only its vector changes
+    head, _, tail = TRIPLES[10]
+    rag.add_triple(head, "renamed relation", tail)
+    assert len(rag._edge_keys) == len(TRIPLES)
+    with pytest.raises(ValueError, match="does not match"):
+        rag.load_ann_index(path)
@@ -0,0 +1,69 @@
+import time
+
+import pytest
+
+from services.article_store_service import ArticleStore, canonicalize_url
+from services.async_fetch_service import FetchResult
+from utils import extract_texts_concurrently
+
+
+@pytest.mark.parametrize("url, canonical", [
+    ("HTTPS://WWW.Example.com/News/Story/", "https://example.com/News/Story"),
+    ("https://example.com/story?utm_source=x&b=2&fbclid=y&a=1#comments", "https://example.com/story?a=1&b=2"),
+    ("https://example.com:8443/story?gclid=1", "https://example.com:8443/story"),
+    ("  https://example.com  ", "https://example.com/"),
+    ("https://example.com/story?empty=", "https://example.com/story?empty="),
+])
+def test_canonicalize_url(url, canonical):
+    assert canonicalize_url(url) == canonical
+
+
+def test_decorated_links_hit_the_canonical_row(tmp_path):
+    store = ArticleStore(str(tmp_path / "articles.sqlite"))
+    store.put_many([{"url": "https://www.example.com/story/?utm_medium=rss", "text": "Body", "etag": '"v1"'}])
+
+    urls = ["https://example.com/story", "https://EXAMPLE.com/story#top", "https://example.com/other"]
+    found = store.get_many(urls)
+    assert list(found) == urls[:2]
+    assert found[urls[0]]["text"] == "Body" and found[urls[0]]["etag"] == '"v1"'
+    assert len(store) == 1
+
+
+def test_ttl_and_purge(tmp_path):
+    store = ArticleStore(str(tmp_path / "articles.sqlite"), ttl_seconds=60)
+    store.put_many([{"url": "https://example.com/a", "text": "A"}, {"url": "https://example.com/b", "text": "B"}])
+    record = store.get_many(["https://example.com/a"])["https://example.com/a"]
+    assert store.is_fresh(record)
+    assert not store.is_fresh(record, now=record["fetched_at"] + 61)
+    assert ArticleStore(str(tmp_path / "forever.sqlite"), ttl_seconds=None).is_fresh({"fetched_at": 0})
+
+    with store._conn:
+        store._conn.execute("UPDATE articles SET fetched_at = ? WHERE url = ?", (time.time() - 120, "https://example.com/a"))
+    assert store.purge_expired() == 1
+    assert list(store.get_many(["https://example.com/a", "https://example.com/b"])) == ["https://example.com/b"]
+    assert store.purge_expired(max_age_seconds=0) == 1 and len(store) == 0
+
+
+class FakeFetcher:
+    def __init__(self, texts):
+        self.texts = texts
+        self.fetched = []
+
+    def fetch_all(self, urls, validators=None):
+        self.fetched.extend(urls)
+        return {url: FetchResult(url, "ok", self.texts[url]) for url in urls}
+
+
+def test_empty_extractions_are_not_stored(tmp_path):
+    store = ArticleStore(str(tmp_path / "articles.sqlite"))
+    links = {"fuel": {"Full": "https://example.com/full", "Empty": "https://example.com/empty"}}
+    fetcher = FakeFetcher({"https://example.com/full": "Diesel prices rose.", "https://example.com/empty": ""})
+
+    results = extract_texts_concurrently(links, fetcher=fetcher, store=store, relevance_threshold=None)
+    assert results == {"fuel": {"Full": {"https://example.com/full": "Diesel prices rose."},
+                                "Empty": {"https://example.com/empty": ""}}}
+    assert list(store.get_many(["https://example.com/full", "https://example.com/empty"])) == ["https://example.com/full"]
+
+    # The empty article is fetched again next time; the stored one is not
+    extract_texts_concurrently(links, fetcher=fetcher, store=store, relevance_threshold=None)
+    assert fetcher.fetched == ["https://example.com/full", "https://example.com/empty", "https://example.com/empty"]
@@ -0,0 +1,189 @@
+import asyncio
+import os
+import threading
+
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")
+from aiohttp import web
+
+from services.async_fetch_service import AsyncArticleFetcher
+
+ARTICLE_HTML = """<html><head><title>Monsoon lifts rural demand</title></head><body>
+<article><h1>Monsoon lifts rural demand</h1>
+<p>Heavy rains across the country have lifted rural demand for consumer goods, distributors said on Monday.</p>
+<p>Food delivery platforms reported longer delivery times in flooded cities while grocery orders rose sharply.</p>
+<p>Analysts expect the trend to continue into the festive season as farm incomes improve with a strong harvest.</p>
+</article></body></html>"""
+ETAG = '"v1"'
+LAST_MODIFIED = "Mon, 12 Oct 2026 08:00:00 GMT"
+
+
+def pid_and_length(url, html):
+    # Module level so the process pool can pickle it
+    return f"{os.getpid()}:{len(html)}"
+
+
+class PageServer:
+    """
+    aiohttp server on its own event loop thread, serving fixture pages
+    """
+
+    def __init__(self):
+        self.in_flight = {}
+        self.max_in_flight = {}
+        self.conditional_headers = []
+        self._loop = asyncio.new_event_loop()
+        self._started = threading.Event()
+        threading.Thread(target=self._serve, daemon=True).start()
+        self._started.wait(5)
+
+    async def slow(self, request):
+        host = request.host.split(":")[0]
+        self.in_flight[host] = self.in_flight.get(host, 0) + 1
+        self.max_in_flight[host] = max(self.max_in_flight.get(host, 0), self.in_flight[host])
+        await asyncio.sleep(0.05)
+        self.in_flight[host] -= 1
+        return web.Response(text=ARTICLE_HTML, content_type="text/html")
+
+    async def cached(self, request):
+        self.conditional_headers.append(
+            (request.headers.get("If-None-Match"), request.headers.get("If-Modified-Since"))
+        )
+        if request.headers.get("If-None-Match") == ETAG:
+            return web.Response(status=304, headers={"ETag": ETAG})
+        return web.Response(text=ARTICLE_HTML, content_type="text/html",
+                            headers={"ETag": ETAG, "Last-Modified": LAST_MODIFIED})
+
+    async def big(self, request):
+        return web.Response(body=b"x" * 4096, content_type="text/html")
+
+    async def chunked(self, request):
+        # No Content-Length, so the size is only known while streaming
+        response = web.StreamResponse(headers={"Content-Type": "text/html"})
+        response.enable_chunked_encoding()
+        await response.prepare(request)
+        for _ in range(64):
+            await response.write(b"y" * 1024)
+        await response.write_eof()
+        return response
+
+    async def missing(self, request):
+        return web.Response(status=404)
+
+    def _serve(self):
+        asyncio.set_event_loop(self._loop)
+        app = web.Application()
+        app.router.add_get("/slow/{name}", self.slow)
+        app.router.add_get("/cached", self.cached)
+        app.router.add_get("/big", self.big)
+        app.router.add_get("/chunked", self.chunked)
+        app.router.add_get("/missing", self.missing)
+        self._runner = web.AppRunner(app)
+        self._loop.run_until_complete(self._runner.setup())
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        self._loop.run_until_complete(site.start())
+        self.port = self._runner.addresses[0][1]
+        self._started.set()
+        self._loop.run_forever()
+
+    def url(self, path, host="127.0.0.1"):
+        return f"http://{host}:{self.port}{path}"
+
+    def close(self):
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result(5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+@pytest.fixture
+def pages():
+    server = PageServer()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def make_fetcher():
+    fetchers = []
+
+    def make(**kwargs):
+        fetchers.append(AsyncArticleFetcher(**kwargs))
+        return fetchers[-1]
+
+    yield make
+    for fetcher in fetchers:
+        fetcher.close()
+
+
+def test_per_host_limits(pages, make_fetcher):
+    fetcher = make_fetcher(per_host_limit=3, host_limits={"localhost": 1}, parse_workers=1, parse_fn=pid_and_length)
+    urls = [pages.url(f"/slow/{index}") for index in range(8)]
+    urls += [pages.url(f"/slow/{index}", host="localhost") for index in range(4)]
+
+    results = fetcher.fetch_all(urls)
+    assert {result.status for result in results.values()} == {"ok"}
+    assert pages.max_in_flight == {"127.0.0.1": 3, "localhost": 1}
+
+
+def test_conditional_get_returns_not_modified(pages, make_fetcher):
+    fetcher = make_fetcher(parse_workers=1, parse_fn=pid_and_length)
+    url = pages.url("/cached")
+
+    first = fetcher.fetch_all([url])[url]
+    assert first.status == "ok" and first.etag == ETAG and first.last_modified == LAST_MODIFIED
+
+    second = fetcher.fetch_all([url], {url: {"etag": first.etag, "last_modified": first.last_modified}})[url]
+    assert second.status == "not_modified" and second.text == ""
+    # The stored Last-Modified survives a 304 that only echoes the ETag
+    assert second.etag == ETAG and second.last_modified == LAST_MODIFIED
+    assert pages.conditional_headers == [(None, None), (ETAG, LAST_MODIFIED)]
+
+
+def test_max_bytes(pages, make_fetcher):
+    fetcher = make_fetcher(max_bytes=2048, parse_workers=1, parse_fn=pid_and_length)
+    big, chunked, small, missing = (pages.url(path) for path in ("/big", "/chunked", "/slow/a", "/missing"))
+
+    results = fetcher.fetch_all([big, chunked, small, missing])
+    # Declared length over the limit: dropped before reading the body
+    assert results[big].status == "too_large" and results[big].error == "4096 bytes"
+    # Streamed without a length: aborted once the limit is crossed
+    assert results[chunked].status == "too_large" and "more than 2048" in results[chunked].error
+    assert results[small].status == "ok"
+    assert results[missing].status == "error" and results[missing].error == "HTTP 404"
+
+
+def test_parsing_runs_in_process_pool(pages, make_fetcher):
+    fetcher = make_fetcher(parse_workers=2, parse_fn=pid_and_length)
+    urls = [pages.url(f"/slow/{index}") for index in range(4)]
+
+    results = fetcher.fetch_all(urls)
+    pids = {int(result.text.split(":")[0]) for result in results.values()}
+    assert os.getpid() not in pids
+    assert {int(result.text.split(":")[1]) for result in results.values()} == {len(ARTICLE_HTML)}
+
+
+def test_parse_pool_is_started_once_and_closed(pages):
+    fetcher = AsyncArticleFetcher(parse_workers=1, parse_fn=pid_and_length)
+    assert fetcher.fetch_all([]) == {} and fetcher._parse_pool is None
+
+    urls = [pages.url("/slow/a"), pages.url("/slow/b")]
+    first = {result.text for result in fetcher.fetch_all(urls).values()}
+    pool = fetcher._parse_pool
+    second = {result.text for result in fetcher.fetch_all(urls).values()}
+    # Both calls parsed in the same (single) worker process
+    assert len(first) == 1 and first == second and fetcher._parse_pool is pool
+    assert pool._mp_context.get_start_method() == "spawn"
+
+    fetcher.close()
+    assert fetcher._parse_pool is None
+    assert fetcher.fetch_all(urls)[urls[0]].text != next(iter(first))
+    fetcher.close()
+
+
+def test_default_parser_extracts_article_text(pages, make_fetcher):
+    pytest.importorskip("newspaper")
+    fetcher = make_fetcher(parse_workers=1)
+    url = pages.url("/cached")
+
+    text = fetcher.fetch_all([url])[url].text
+    assert "Heavy rains across the country" in text
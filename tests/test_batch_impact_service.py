@@ -0,0 +1,163 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from services.batch_impact_service import BatchImpactScorer
+from services.effect_map_service import EffectMapGenerator
+from services.impact_cache_service import SQLiteImpactCache
+from services.llm_client_service import LLMClient
+
+VERDICT = {"emoji": "😊", "how": "More orders", "why": "Demand rises"}
+
+
+class BatchAPIStub:
+    """
+    Local stand-in for the OpenAI files and batches endpoints
+
+    `outcome(custom_id)` decides what the batch did with each uploaded request:
+    "ok", "error" (listed in the error file), "http_500" or "garbled".
+    """
+
+    def __init__(self, outcome, final_status="completed", polls_before_done=1):
+        self.outcome = outcome
+        self.final_status = final_status
+        self.polls_before_done = polls_before_done
+        self.uploaded = []
+        self.batch_bodies = []
+        self.polls = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _send(self, payload, raw=False):
+                body = payload.encode() if raw else json.dumps(payload).encode()
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                if self.path == "/v1/files":
+                    # Multipart upload: pick the JSONL request lines out of the form body
+                    stub.uploaded = [json.loads(line) for line in body.splitlines() if line.startswith(b'{"custom_id"')]
+                    self._send({"id": "file-in", "purpose": "batch"})
+                else:
+                    stub.batch_bodies.append(json.loads(body))
+                    self._send({"id": "batch-1", "status": "validating"})
+
+            def do_GET(self):
+                if self.path == "/v1/batches/batch-1":
+                    stub.polls += 1
+                    self._send(stub.batch() if stub.polls > stub.polls_before_done else {"id": "batch-1", "status": "in_progress"})
+                elif self.path == "/v1/files/file-out/content":
+                    self._send(stub.file_lines({"ok", "http_500", "garbled"}), raw=True)
+                elif self.path == "/v1/files/file-err/content":
+                    self._send(stub.file_lines({"error"}), raw=True)
+                else:
+                    self.send_error(404)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/v1"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def batch(self):
+        outcomes = {self.outcome(request["custom_id"]) for request in self.uploaded}
+        batch = {"id": "batch-1", "status": self.final_status}
+        if self.final_status == "completed":
+            if outcomes & {"ok", "http_500", "garbled"}:
+                batch["output_file_id"] = "file-out"
+            if "error" in outcomes:
+                batch["error_file_id"] = "file-err"
+        return batch
+
+    def file_lines(self, outcomes):
+        lines = []
+        for request in self.uploaded:
+            outcome = self.outcome(request["custom_id"])
+            if outcome not in outcomes:
+                continue
+            line = {"custom_id": request["custom_id"], "response": None, "error": None}
+            if outcome == "error":
+                line["error"] = {"code": "server_error", "message": "failed"}
+            else:
+                content = json.dumps(VERDICT) if outcome == "ok" else "not json"
+                line["response"] = {
+                    "status_code": 500 if outcome == "http_500" else 200,
+                    "body": {"choices": [{"message": {"content": content}}]},
+                }
+            lines.append(json.dumps(line, ensure_ascii=False))
+        return "\n".join(lines) + "\n"
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+NEWS = {
+    "Monsoon lifts demand": {"https://a.example/1": "Rains lift rural demand for delivery."},
+    "Fuel prices climb": {"https://a.example/2": "Diesel costs rise for fleets."},
+    "Strike at ports": {"https://a.example/3": "Dock workers walk out."},
+    "Rate cut": {"https://a.example/4": "The central bank cuts rates."},
+    "Empty story": {"https://a.example/5": ""},
+}
+
+
+@pytest.fixture
+def scorer_for():
+    stubs = []
+
+    def make(outcome, **stub_kwargs):
+        stub = BatchAPIStub(outcome, **stub_kwargs)
+        stubs.append(stub)
+        generator = EffectMapGenerator(cache=SQLiteImpactCache(":memory:"))
+        scorer = BatchImpactScorer(LLMClient(stub.url, "key"), generator, poll_interval=0, max_wait=10)
+        return stub, scorer
+
+    yield make
+    for stub in stubs:
+        stub.close()
+
+
+def test_uploads_polls_and_caches_every_verdict(scorer_for):
+    stub, scorer = scorer_for(lambda custom_id: "ok")
+
+    assert scorer.run("Zomato", "Food delivery", NEWS) == 4
+    assert len(stub.uploaded) == 4 and stub.polls == 2
+    assert stub.batch_bodies[0]["input_file_id"] == "file-in"
+    assert {request["body"]["model"] for request in stub.uploaded} == {scorer.generator.model}
+
+    keys = [request["custom_id"] for request in stub.uploaded]
+    assert scorer.generator.cache.get_many(keys) == {key: VERDICT for key in keys}
+    # Everything is cached now, so a second run submits nothing
+    assert scorer.run("Zomato", "Food delivery", NEWS) == 0
+    assert len(stub.batch_bodies) == 1
+
+
+def test_partial_batch_caches_only_successes(scorer_for):
+    outcomes = {}
+    stub, scorer = scorer_for(lambda custom_id: outcomes[custom_id])
+    for key, outcome in zip(
+        [request["custom_id"] for request in scorer.pending_requests("Zomato", "Food delivery", NEWS)],
+        ["ok", "error", "http_500", "garbled"]
+    ):
+        outcomes[key] = outcome
+
+    assert scorer.run("Zomato", "Food delivery", NEWS) == 1
+    ok_key = next(key for key, outcome in outcomes.items() if outcome == "ok")
+    assert scorer.generator.cache.get_many(outcomes) == {ok_key: VERDICT}
+    # The failures stay uncached and are resubmitted by the next run
+    retry = {request["custom_id"] for request in scorer.pending_requests("Zomato", "Food delivery", NEWS)}
+    assert retry == set(outcomes) - {ok_key}
+
+
+def test_failed_batch_writes_nothing(scorer_for):
+    stub, scorer = scorer_for(lambda custom_id: "ok", final_status="failed")
+
+    assert scorer.run("Zomato", "Food delivery", NEWS) == 0
+    assert len(scorer.generator.cache) == 0
+    assert len(scorer.pending_requests("Zomato", "Food delivery", NEWS)) == 4
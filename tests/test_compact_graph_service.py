@@ -0,0 +1,45 @@
+import random
+
+import numpy as np
+
+from services.compact_graph_service import (
+    CompactTripleGraph, EdgeKeyView, EdgeRowView, RelationIndexView, TripleIdSet
+)
+
+
+def test_edge_views_follow_graph_edge_ids():
+    graph = CompactTripleGraph()
+    graph.add_edge("a", "b", relation="owns")
+    graph.add_edge("b", "c", relation="funds")
+    graph.add_edge("a", "b", relation="sues")  # simple graph: overwrites the relation in place
+    graph.remove_edge("b", "c")
+
+    keys, rows, relations = EdgeKeyView(graph), EdgeRowView(graph), RelationIndexView(graph)
+    assert len(keys) == 2 and keys[:] == [("a", "b"), None]
+    assert rows[("a", "b")] == 0 and ("b", "c") not in rows and list(rows) == [("a", "b")]
+    assert relations.get("sues") == {0}
+    assert relations.get("owns") is None and relations.get("funds") is None
+
+
+def test_triple_id_set_matches_python_sets():
+    rng = random.Random(0)
+    make = lambda count: {
+        (f"n{rng.randint(0, 20)}", f"r{rng.randint(0, 3)}", f"n{rng.randint(0, 20)}") for _ in range(count)
+    }
+    old, new = make(120), make(120)
+
+    table = TripleIdSet()
+    table.ids = table.encode(old)
+    new_ids = table.encode(new)
+    added_ids = table.difference(new_ids, table.ids)
+    removed_ids = table.difference(table.ids, new_ids)
+    added, removed = table.decode(added_ids), table.decode(removed_ids)
+    assert added == sorted(new - old)
+    assert removed == sorted(old - new)
+
+    touched = sorted({(head, tail) for head, _, tail in added + removed})
+    expected = [
+        max(triple for triple in new if (triple[0], triple[2]) == pair)
+        for pair in touched if any((triple[0], triple[2]) == pair for triple in new)
+    ]
+    assert table.pair_winners(new_ids, np.concatenate([added_ids, removed_ids])) == expected
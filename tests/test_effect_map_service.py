@@ -0,0 +1,103 @@
+import json
+import threading
+import time
+
+from services.effect_map_service import EffectMapGenerator
+from services.impact_cache_service import SQLiteImpactCache
+
+NEWS = {
+    "Fuel prices rise": {"https://a.example/1": "Diesel prices rose sharply."},
+    "Monsoon arrives early": {"https://a.example/2": "Rains reached the coast a week early."},
+    "Rates unchanged": {"https://a.example/3": "The central bank held rates."},
+    "Empty article": {"https://a.example/4": ""},
+}
+VERDICTS = {
+    "Fuel prices rise": {"emoji": "😔", "how": "Costs rise", "why": "Fuel is a large cost"},
+    "Monsoon arrives early": {"emoji": "😊", "how": "Demand rises", "why": "Rural incomes improve"},
+    "Rates unchanged": {"emoji": "😐", "how": "", "why": ""},
+}
+
+
+class FakeClient:
+    """
+    Answers from VERDICTS; earlier titles are slowed down so they finish last
+    """
+
+    def __init__(self, delays=None, errors=()):
+        self.delays = delays or {}
+        self.errors = set(errors)
+        self.titles = []
+        self.timeouts = []
+        self._lock = threading.Lock()
+
+    def chat_completion(self, payload, timeout=None):
+        content = payload["messages"][1]["content"]
+        title = next(title for title in VERDICTS if f"Event Title: {title}\n" in content)
+        with self._lock:
+            self.titles.append(title)
+            self.timeouts.append(timeout)
+        time.sleep(self.delays.get(title, 0))
+        if title in self.errors:
+            raise TimeoutError("Read timed out")
+        return {"choices": [{"message": {"content": json.dumps(VERDICTS[title])}}]}
+
+
+def test_results_follow_news_order_despite_completion_order():
+    client = FakeClient(delays={"Fuel prices rise": 0.2, "Monsoon arrives early": 0.1})
+    streamed = []
+
+    impacts = EffectMapGenerator().analyze_news_impact(client, "Zomato", "Food delivery", NEWS, max_workers=3, on_impact=streamed.append)
+    assert [impact["event"] for impact in impacts] == ["Fuel prices rise", "Monsoon arrives early"]
+    # on_impact fires in completion order; the empty article is never sent
+    assert [impact["event"] for impact in streamed] == ["Monsoon arrives early", "Fuel prices rise"]
+    assert sorted(client.titles) == sorted(VERDICTS)
+
+
+def test_cache_hits_skip_the_api():
+    cache = SQLiteImpactCache(":memory:")
+    generator = EffectMapGenerator(cache=cache)
+    first = generator.analyze_news_impact(FakeClient(), "Zomato", "Food delivery", NEWS)
+    assert len(cache) == 3
+
+    client = FakeClient()
+    assert generator.analyze_news_impact(client, "Zomato", "Food delivery", NEWS) == first
+    assert client.titles == []
+
+    # A different company is a different key
+    generator.analyze_news_impact(client, "Swiggy", "Food delivery", NEWS)
+    assert len(client.titles) == 3
+
+
+def test_cache_only_serves_precomputed_verdicts():
+    cache = SQLiteImpactCache(":memory:")
+    generator = EffectMapGenerator(cache=cache)
+    key = generator.cache_key("Zomato", "Food delivery", "Monsoon arrives early", "Rains reached the coast a week early.")
+    cache.put_many({key: VERDICTS["Monsoon arrives early"]})
+    client = FakeClient()
+
+    impacts = generator.analyze_news_impact(client, "Zomato", "Food delivery", NEWS, cache_only=True)
+    assert [impact["event"] for impact in impacts] == ["Monsoon arrives early"]
+    assert client.titles == [] and len(cache) == 1
+
+
+def test_timeouts_and_errors_drop_only_their_article():
+    cache = SQLiteImpactCache(":memory:")
+    client = FakeClient(errors={"Fuel prices rise"})
+
+    impacts = EffectMapGenerator(cache=cache).analyze_news_impact(client, "Zomato", "Food delivery", NEWS, timeout=5)
+    assert [impact["event"] for impact in impacts] == ["Monsoon arrives early"]
+    assert set(client.timeouts) == {5}
+    # Failed articles are not cached, so they are retried next time
+    assert len(cache) == 2
+
+
+class BrokenGenerator(EffectMapGenerator):
+    def analyze_article(self, client, company_name, company_info, title, text, timeout=None):
+        if title == "Monsoon arrives early":
+            raise RuntimeError("worker crashed")
+        return super().analyze_article(client, company_name, company_info, title, text, timeout)
+
+
+def test_a_failing_future_does_not_stop_the_others():
+    impacts = BrokenGenerator().analyze_news_impact(FakeClient(), "Zomato", "Food delivery", NEWS, max_workers=1)
+    assert [impact["event"] for impact in impacts] == ["Fuel prices rise"]
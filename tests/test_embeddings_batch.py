@@ -0,0 +1,87 @@
+import zlib
+from types import SimpleNamespace
+
+import pytest
+import torch
+
+import utils
+
+HIDDEN = 8
+
+
+class StubTokenizer:
+    """
+    Word-level tokenizer with [CLS]/[SEP] ids and right padding, like BertTokenizer
+    """
+
+    def _ids(self, text):
+        return [101] + [1000 + zlib.crc32(word.encode("utf-8")) % 500 for word in text.lower().split()] + [102]
+
+    def __call__(self, text, return_tensors=None, truncation=False, max_length=None):
+        if isinstance(text, str):
+            ids = torch.tensor([self._ids(text)])
+            return {"input_ids": ids, "attention_mask": torch.ones_like(ids)}
+        ids = [self._ids(item)[:max_length] for item in text]
+        return {"input_ids": ids, "attention_mask": [[1] * len(row) for row in ids]}
+
+    def pad(self, features, return_tensors=None):
+        width = max(len(feature["input_ids"]) for feature in features)
+        pad = lambda row: row + [0] * (width - len(row))
+        return {
+            "input_ids": torch.tensor([pad(feature["input_ids"]) for feature in features]),
+            "attention_mask": torch.tensor([pad(feature["attention_mask"]) for feature in features]),
+        }
+
+
+class StubModel:
+    """
+    Token embeddings plus a running sum over real tokens, so padding would change the mean if it were not masked
+    """
+
+    config = SimpleNamespace(hidden_size=HIDDEN)
+
+    def __init__(self):
+        generator = torch.Generator().manual_seed(0)
+        self.table = torch.randn(1600, HIDDEN, generator=generator)
+
+    def __call__(self, input_ids, attention_mask):
+        hidden = self.table[input_ids] * attention_mask.unsqueeze(-1)
+        return SimpleNamespace(last_hidden_state=hidden + 0.1 * hidden.cumsum(dim=1) + self.table[0])
+
+
+@pytest.fixture
+def stub_bert(monkeypatch):
+    stub = (StubTokenizer(), StubModel())
+    monkeypatch.setattr(utils, "get_bert_model", lambda model_name=utils.EMBEDDING_MODEL_NAME: stub)
+    return stub
+
+
+def test_batched_rows_match_single_embeddings(stub_bert, monkeypatch):
+    texts = [
+        "Monsoon delays", "Reliance Jio raises tariffs across all prepaid plans", "a",
+        "Fuel prices rise", "monsoon   DELAYS", "Rates held steady for the sixth straight meeting",
+    ]
+    thread_changes = []
+    monkeypatch.setattr(torch, "set_num_threads", thread_changes.append)
+
+    batched = utils.generate_embeddings_batch(texts, batch_size=4)
+    assert batched.shape == (len(texts), HIDDEN)
+    for row, text in zip(batched, texts):
+        torch.testing.assert_close(row, utils.generate_embeddings(text)[0], rtol=1e-5, atol=1e-6)
+    # Thread count is process-wide; it is never touched per call
+    assert thread_changes == []
+    assert utils.generate_embeddings_batch([]).shape == (0, HIDDEN)
+
+
+def test_encoder_threads_are_set_once_at_model_load(monkeypatch):
+    transformers = pytest.importorskip("transformers")
+    monkeypatch.setattr(transformers.BertTokenizer, "from_pretrained", lambda name: StubTokenizer())
+    monkeypatch.setattr(transformers.BertModel, "from_pretrained", lambda name: SimpleNamespace(eval=lambda: None))
+    monkeypatch.setattr(utils, "_MODEL_REGISTRY", {})
+    monkeypatch.setattr(utils, "ENCODER_THREADS", 3)
+    thread_changes = []
+    monkeypatch.setattr(torch, "set_num_threads", thread_changes.append)
+
+    first = utils.get_bert_model("stub-bert")
+    assert utils.get_bert_model("stub-bert") is first
+    assert thread_changes == [3]
@@ -0,0 +1,48 @@
+import threading
+import time
+
+from app_using_llama import ReadWriteLock
+
+
+def test_readers_share_the_lock():
+    lock = ReadWriteLock()
+    with lock.read():
+        acquired = threading.Event()
+
+        def reader():
+            with lock.read():
+                acquired.set()
+
+        thread = threading.Thread(target=reader)
+        thread.start()
+        assert acquired.wait(1)
+        thread.join()
+
+
+def test_writer_excludes_readers_and_waits_for_them():
+    lock = ReadWriteLock()
+    events = []
+
+    def writer():
+        with lock.write():
+            events.append("write start")
+            time.sleep(0.05)
+            events.append("write end")
+
+    def reader():
+        with lock.read():
+            events.append("read")
+
+    with lock.read():
+        writer_thread = threading.Thread(target=writer)
+        writer_thread.start()
+        time.sleep(0.05)
+        # A waiting writer blocks new readers
+        reader_thread = threading.Thread(target=reader)
+        reader_thread.start()
+        time.sleep(0.05)
+        assert events == []
+
+    writer_thread.join(1)
+    reader_thread.join(1)
+    assert events == ["write start", "write end", "read"]
@@ -0,0 +1,108 @@
+import pytest
+
+import app_using_llama
+from app_using_llama import KnowledgeGraphService
+
+
+class FakeRAG:
+    """
+    Records the triples it holds; `fail_on` makes adding that head raise like add_triples_bulk does
+    """
+
+    fail_on = None
+
+    def __init__(self, **kwargs):
+        self.multigraph = True
+        self.triples = set()
+
+    def add_triples_bulk(self, triples):
+        for triple in triples:
+            if triple[0] == FakeRAG.fail_on:
+                raise ValueError(f"Failed to add triples: {triple}")
+            self.triples.add(triple)
+
+    def remove_triple(self, head, relation, tail):
+        self.triples.discard((head, relation, tail))
+        return True
+
+    def flush_embeddings(self):
+        pass
+
+
+@pytest.fixture
+def service(monkeypatch, tmp_path):
+    monkeypatch.setattr(app_using_llama, "KnowledgeGraphRAG", FakeRAG)
+    monkeypatch.setattr(FakeRAG, "fail_on", None)
+    path = tmp_path / "triples.txt"
+    path.write_text("(a; r; b)\n(b; r; c)\n")
+    return KnowledgeGraphService(str(path)), path
+
+
+def write(path, text):
+    path.write_text(text)
+    # Make sure the stat moves even on coarse mtime clocks
+    stat = path.stat()
+    app_using_llama.os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_refresh_applies_only_changes(service):
+    graph_service, path = service
+    assert graph_service.refresh() is True
+    assert graph_service.refresh() is False
+    rag = graph_service.rag
+
+    write(path, "(a; r; b)\n(c; r; d)\n")
+    assert graph_service.refresh() is True
+    assert graph_service.rag is rag
+    assert rag.triples == {("a", "r", "b"), ("c", "r", "d")}
+    assert graph_service.version == 2
+
+
+def test_failed_delta_is_retried_with_a_full_rebuild(service):
+    graph_service, path = service
+    graph_service.refresh()
+    good_rag = graph_service.rag
+
+    FakeRAG.fail_on = "x"
+    write(path, "(a; r; b)\n(x; r; y)\n")
+    with pytest.raises(ValueError):
+        graph_service.refresh()
+    assert graph_service.version == 1
+
+    # The same bad file is not rebuilt on every request
+    with pytest.raises(ValueError):
+        graph_service.refresh()
+    assert graph_service.refresh() is False
+    assert graph_service.rag is good_rag
+
+    FakeRAG.fail_on = None
+    write(path, "(a; r; b)\n(x; r; z)\n")
+    assert graph_service.refresh() is True
+    assert graph_service.rag is not good_rag
+    assert graph_service.rag.triples == {("a", "r", "b"), ("x", "r", "z")}
+    assert graph_service.refresh() is False
+
+
+def test_reverting_the_file_still_rebuilds_a_half_applied_graph(service):
+    graph_service, path = service
+    graph_service.refresh()
+
+    FakeRAG.fail_on = "x"
+    write(path, "(a; r; b)\n(w; r; v)\n(x; r; y)\n")
+    with pytest.raises(ValueError):
+        graph_service.refresh()
+    FakeRAG.fail_on = None
+
+    write(path, "(a; r; b)\n(b; r; c)\n")
+    assert graph_service.refresh() is True
+    assert graph_service.rag.triples == {("a", "r", "b"), ("b", "r", "c")}
+
+
+def test_refresh_graph_keeps_serving_on_error(service, capsys):
+    graph_service, path = service
+    graph_service.refresh()
+    FakeRAG.fail_on = "x"
+    write(path, "(x; r; y)\n")
+
+    app_using_llama.refresh_graph(graph_service)
+    assert "serving version 1" in capsys.readouterr().out
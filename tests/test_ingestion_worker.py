@@ -0,0 +1,107 @@
+import json
+import time
+
+import pytest
+
+import ingestion_worker
+import utils
+from ingestion_worker import IngestionWorker
+from services.impact_cache_service import SQLiteImpactCache
+from services.work_queue_service import SQLiteWorkQueue
+
+LINKS = {
+    "fuel prices": {"Diesel costs climb": "https://news.example/fuel"},
+    "monsoon": {"Rains flood cities": "https://news.example/rain"},
+}
+TEXTS = {
+    "https://news.example/fuel": "Diesel prices rose again, lifting delivery costs for fleets.",
+    "https://news.example/rain": "Heavy rains flooded several cities and slowed deliveries.",
+}
+
+
+class FakeTermStore:
+    def __init__(self, broken=()):
+        self.broken = set(broken)
+        self.calls = []
+
+    def get(self, terms, search_fn, background=True):
+        self.calls.extend(terms)
+        return {term: LINKS[term] for term in terms if term not in self.broken and term in LINKS}
+
+
+class FakeArticleStore:
+    # Every article is fresh, so extraction never touches the network
+    def get_many(self, urls):
+        return {url: {"text": TEXTS[url], "etag": None, "last_modified": None} for url in urls if url in TEXTS}
+
+    def is_fresh(self, record):
+        return True
+
+    def put_many(self, records):
+        pass
+
+
+class FakeClient:
+    def __init__(self):
+        self.calls = 0
+
+    def chat_completion(self, payload, timeout=None):
+        self.calls += 1
+        verdict = {"emoji": "😔", "how": "Costs rise", "why": "Margins shrink"}
+        return {"choices": [{"message": {"content": json.dumps(verdict)}}]}
+
+
+class KeepAllFilter:
+    stats = {"checked": 0, "dropped": 0, "filter_seconds": 0.0, "saved_seconds": 0.0}
+
+    def relevant(self, items):
+        return [True] * len(items)
+
+
+@pytest.fixture(autouse=True)
+def no_relevance_model(monkeypatch):
+    monkeypatch.setattr(utils, "get_relevance_filter", lambda *args, **kwargs: KeepAllFilter())
+    monkeypatch.setattr(ingestion_worker, "get_relevance_filter", lambda *args, **kwargs: KeepAllFilter())
+
+
+def make_worker(queue, term_store=None):
+    cache = SQLiteImpactCache(":memory:")
+    worker = IngestionWorker(
+        FakeClient(), term_store or FakeTermStore(), FakeArticleStore(), cache, queue,
+        company_info={"zomato": "Food delivery platform"}
+    )
+    return worker, cache
+
+
+def test_run_once_scores_every_term_and_finishes():
+    queue = SQLiteWorkQueue(":memory:")
+    worker, cache = make_worker(queue)
+
+    assert worker.run_once(list(LINKS)) == {"done": 2}
+    assert len(cache) == 2 and worker.client.calls == 2
+    assert queue.last_finished_at() is not None
+
+
+def test_failing_term_is_retried_up_to_max_attempts():
+    queue = SQLiteWorkQueue(":memory:", max_attempts=3)
+    term_store = FakeTermStore(broken={"monsoon"})
+    worker, cache = make_worker(queue, term_store)
+
+    assert worker.run_once(list(LINKS)) == {"done": 1, "failed": 1}
+    assert term_store.calls.count("monsoon") == 3
+    assert len(cache) == 1
+
+
+def test_resumes_after_crash_and_takes_over_expired_lease():
+    queue = SQLiteWorkQueue(":memory:", lease_seconds=0.2)
+    run_id = queue.start_run(list(LINKS))
+    # A previous worker finished one term and died while holding the other
+    queue.complete(queue.claim(run_id)["id"])
+    queue.claim(run_id)
+
+    worker, cache = make_worker(queue)
+    start = time.time()
+    assert worker.run_once(list(LINKS)) == {"done": 2}
+    assert time.time() - start >= 0.15
+    assert worker.term_store.calls == ["monsoon"] and len(cache) == 1
+    assert queue.finish_run(run_id) and queue.last_finished_at() is not None
@@ -0,0 +1,168 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from services import llm_client_service
+from services.llm_client_service import LLMClient, LLMRequestError
+
+
+class ScriptedServer:
+    """
+    Local HTTP server answering each request with the next (status, headers) of a script
+    """
+
+    def __init__(self, script, delay=0.0):
+        self.script = list(script)
+        self.delay = delay
+        self.paths = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _respond(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                self.rfile.read(length)
+                with server._lock:
+                    server.paths.append(self.path)
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                    status, headers = server.script.pop(0) if server.script else (200, {})
+                if server.delay:
+                    time.sleep(server.delay)
+                with server._lock:
+                    server.in_flight -= 1
+                body = json.dumps({"status": status}).encode()
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = _respond
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/v1"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def scripted_server():
+    servers = []
+
+    def start(script=(), delay=0.0):
+        servers.append(ScriptedServer(script, delay))
+        return servers[-1]
+
+    yield start
+    for server in servers:
+        server.close()
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    # Record backoff waits instead of sleeping through them
+    recorded = []
+    monkeypatch.setattr(llm_client_service.time, "sleep", recorded.append)
+    return recorded
+
+
+def test_retries_429_then_5xx_then_succeeds(scripted_server, sleeps):
+    server = scripted_server([(429, {"Retry-After": "3"}), (503, {}), (200, {})])
+    client = LLMClient(server.url, "key", backoff_base=0.5, backoff_max=8.0)
+
+    assert client.chat_completion({"model": "m"}) == {"status": 200}
+    assert server.paths == ["/v1/chat/completions"] * 3
+    # Retry-After wins over the jittered backoff, the 5xx retry stays within its ceiling
+    assert sleeps[0] >= 3
+    assert 0 <= sleeps[1] <= 0.5 * 2
+
+
+def test_gives_up_after_max_retries(scripted_server, sleeps):
+    server = scripted_server([(502, {})] * 5)
+    client = LLMClient(server.url, "key", max_retries=2)
+
+    with pytest.raises(LLMRequestError) as error:
+        client.get_json("batches/b1")
+    assert error.value.status_code == 502
+    assert len(server.paths) == 3 and len(sleeps) == 2
+
+
+def test_backoff_is_bounded():
+    client = LLMClient("http://127.0.0.1", "key", backoff_base=0.5, backoff_max=2.0)
+    delays = [client._backoff(attempt) for attempt in range(12) for _ in range(50)]
+    assert max(delays) <= 2.0 and min(delays) >= 0
+
+
+def test_non_idempotent_post_is_not_resent_on_5xx(scripted_server, sleeps):
+    server = scripted_server([(500, {}), (200, {})])
+    client = LLMClient(server.url, "key")
+
+    with pytest.raises(LLMRequestError) as error:
+        client.post_json("batches", {"input_file_id": "f1"})
+    assert error.value.status_code == 500
+    assert server.paths == ["/v1/batches"] and sleeps == []
+
+
+def test_non_idempotent_post_is_resent_on_429(scripted_server, sleeps):
+    server = scripted_server([(429, {"Retry-After": "1"}), (200, {})])
+    client = LLMClient(server.url, "key")
+
+    assert client.post_json("batches", {"input_file_id": "f1"}) == {"status": 200}
+    assert server.paths == ["/v1/batches"] * 2 and sleeps[0] >= 1
+
+
+def test_concurrency_cap(scripted_server):
+    server = scripted_server(delay=0.05)
+    client = LLMClient(server.url, "key", max_concurrency=3, pool_size=10)
+
+    threads = [threading.Thread(target=client.get_json, args=(f"files/{index}",)) for index in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(server.paths) == 12
+    assert 2 <= server.max_in_flight <= 3
+
+
+@pytest.mark.parametrize("script, raises", [([(503, {}), (429, {}), (200, {})], False), ([(503, {})] * 3, True)])
+def test_streamed_error_responses_are_closed(scripted_server, sleeps, script, raises):
+    server = scripted_server(script)
+    client = LLMClient(server.url, "key", max_retries=2)
+    responses = []
+    send = client.session.request
+
+    def recording_request(*args, **kwargs):
+        response = send(*args, **kwargs)
+        close = response.close
+        response.closed_by_client = False
+
+        def spy():
+            response.closed_by_client = True
+            close()
+        response.close = spy
+        responses.append(response)
+        return response
+
+    client.session.request = recording_request
+    if raises:
+        with pytest.raises(LLMRequestError):
+            list(client.stream_events("chat/completions", {"stream": True}, idempotent=True))
+    else:
+        assert list(client.stream_events("chat/completions", {"stream": True}, idempotent=True)) == []
+    # Every response, including the retried ones, gave its connection back
+    assert len(responses) == 3 and all(response.closed_by_client for response in responses)
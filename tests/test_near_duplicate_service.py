@@ -0,0 +1,58 @@
+import json
+
+from services.effect_map_service import EffectMapGenerator
+from services.impact_cache_service import SQLiteImpactCache
+from services.near_duplicate_service import NearDuplicateClusterer
+
+WIRE_STORY = (
+    "Food delivery platforms raised their platform fee by two rupees per order on Monday, citing higher "
+    "fuel costs and rising rider incentives during the monsoon season, according to people familiar with the matter. "
+    "Analysts said the move could lift margins in the coming quarters without denting order volumes in large cities."
+)
+OTHER_STORY = (
+    "The central bank left its policy rate unchanged for the sixth straight meeting and kept its inflation "
+    "forecast steady, while warning that food prices remain volatile because of uneven rainfall across states."
+)
+
+
+def test_syndicated_copies_cluster_together_and_distinct_stories_stay_apart():
+    texts = {
+        "wire": WIRE_STORY,
+        "other": OTHER_STORY,
+        "copy": "Mumbai: " + WIRE_STORY + " (With inputs from agencies)",
+        "exact copy": WIRE_STORY,
+    }
+    assert NearDuplicateClusterer().cluster(texts) == {"wire": ["copy", "exact copy"], "other": []}
+
+
+def test_empty_and_short_texts_never_merge():
+    texts = {"empty": "", "also empty": "   ", "short": "Markets rise", "same short": "Markets rise", "tiny": "Rain"}
+    assert NearDuplicateClusterer().cluster(texts) == {key: [] for key in texts}
+
+
+class FakeClient:
+    def __init__(self):
+        self.scored = []
+
+    def chat_completion(self, payload, timeout=None):
+        self.scored.append(payload["messages"][1]["content"])
+        verdict = {"emoji": "😊", "how": "Higher fees", "why": "Better margins"}
+        return {"choices": [{"message": {"content": json.dumps(verdict)}}]}
+
+
+def test_cluster_verdict_is_shared_in_results_but_cached_once():
+    cache = SQLiteImpactCache(":memory:")
+    generator = EffectMapGenerator(cache=cache, deduplicator=NearDuplicateClusterer())
+    news = {
+        "Platform fee raised": {"https://a.example/1": WIRE_STORY},
+        "Delivery apps lift fees": {"https://b.example/2": "Mumbai: " + WIRE_STORY},
+    }
+    client = FakeClient()
+
+    impacts = generator.analyze_news_impact(client, "Zomato", "Food delivery", news)
+    assert [impact["event"] for impact in impacts] == list(news)
+    assert len(client.scored) == 1
+
+    keys = [generator.cache_key("Zomato", "Food delivery", title, list(url_text.values())[0])
+            for title, url_text in news.items()]
+    assert list(cache.get_many(keys)) == [keys[0]]
@@ -0,0 +1,103 @@
+import time
+
+from services.news_term_store_service import TermLinkStore
+
+
+class FakeCollection:
+    """
+    In-memory stand-in for the few pymongo operations TermLinkStore issues
+    """
+
+    def __init__(self):
+        self.documents = {}
+
+    def find(self, query):
+        ids = query["_id"]["$in"]
+        return [dict(self.documents[_id]) for _id in ids if _id in self.documents]
+
+    def bulk_write(self, operations, ordered=True):
+        for operation in operations:
+            _id, update = operation._filter["_id"], operation._doc
+            if _id not in self.documents:
+                if not operation._upsert:
+                    continue
+                self.documents[_id] = {"_id": _id}
+            document = self.documents[_id]
+            for field, condition in update.get("$pull", {}).items():
+                links = condition["link"]["$in"]
+                document[field] = [item for item in document.get(field, []) if item["link"] not in links]
+            for field, push in update.get("$push", {}).items():
+                document[field] = (document.get(field, []) + push["$each"])[push["$slice"]:]
+            document.update(update.get("$set", {}))
+
+
+class FakeSearch:
+    def __init__(self, results):
+        self.results = results
+        self.calls = []
+
+    def __call__(self, terms):
+        self.calls.append(list(terms))
+        return {term: self.results.get(term, {}) for term in terms}
+
+
+def test_refresh_merges_links_deduplicated_and_bounded():
+    store = TermLinkStore(FakeCollection(), max_links=3)
+    store.upsert_many({"fuel": {"Old": "https://a/1", "Older": "https://a/2"}}, fetched_at=1)
+    store.upsert_many({"fuel": {"Renamed": "https://a/1", "New": "https://a/3", "Newer": "https://a/4"}}, fetched_at=2)
+
+    document = store.collection.documents["fuel"]
+    assert [item["link"] for item in document["links"]] == ["https://a/1", "https://a/3", "https://a/4"]
+    assert document["links"][0]["title"] == "Renamed" and document["time"] == 2
+
+
+def test_get_scrapes_only_stale_and_missing_terms():
+    store = TermLinkStore(FakeCollection(), ttl_seconds=60)
+    store.upsert_many({"fresh": {"F": "https://f"}})
+    store.upsert_many({"stale": {"S": "https://s"}}, fetched_at=time.time() - 120)
+    search = FakeSearch({"stale": {"S2": "https://s2"}, "missing": {"M": "https://m"}})
+
+    assert store.load(["missing", "fresh", "stale"])[1] == ["missing", "stale"]
+    result = store.get(["missing", "fresh", "stale"], search, background=False)
+    assert search.calls == [["missing", "stale"]]
+    assert list(result) == ["missing", "fresh", "stale"]
+    assert result["stale"] == {"S": "https://s", "S2": "https://s2"}
+
+    store.get(["missing", "fresh", "stale"], search, background=False)
+    assert len(search.calls) == 1
+
+
+def test_failed_scrape_falls_back_to_cached_links():
+    store = TermLinkStore(FakeCollection(), ttl_seconds=60)
+    store.upsert_many({"stale": {"S": "https://s"}}, fetched_at=time.time() - 120)
+    search = FakeSearch({})
+
+    assert store.get(["stale", "unknown"], search, background=False) == {"stale": {"S": "https://s"}}
+    # Nothing was stored, so the term is still stale and is retried next time
+    assert store.load(["stale"])[1] == ["stale"]
+
+
+def test_background_refresh_serves_fresh_terms_first():
+    store = TermLinkStore(FakeCollection(), ttl_seconds=60)
+    store.upsert_many({"fresh": {"F": "https://f"}})
+    search = FakeSearch({"new": {"N": "https://n"}})
+
+    assert store.get(["fresh", "new"], search) == {"fresh": {"F": "https://f"}}
+    for _ in range(100):
+        if not store._refreshing:
+            break
+        time.sleep(0.01)
+    assert search.calls == [["new"]]
+    assert store.get(["fresh", "new"], search) == {"fresh": {"F": "https://f"}, "new": {"N": "https://n"}}
+    assert len(search.calls) == 1
+
+
+def test_background_refresh_skips_terms_already_refreshing():
+    store = TermLinkStore(FakeCollection())
+    store._refreshing.add("busy")
+    assert store.refresh_in_background(["busy"], FakeSearch({})) is None
+
+    thread = store.refresh_in_background(["busy", "idle"], FakeSearch({"idle": {"I": "https://i"}}))
+    thread.join(1)
+    assert store.load(["idle"])[0] == {"idle": {"I": "https://i"}}
+    assert store._refreshing == {"busy"}
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from services.query_cache_service import QUERY_CACHE_MODEL_NAME, QUERY_CACHE_THRESHOLD, SemanticQueryCache
+
+PARAPHRASES = [
+    ("How does monsoon season affect Reliance's supply chain?",
+     "How does the monsoon season affect the supply chain of Reliance?"),
+    ("What is the impact of rising crude prices on Indian airlines?",
+     "What's the impact of rising crude oil prices on Indian airlines"),
+    ("How will the RBI rate hike affect HDFC Bank?", "How would the rate hike by RBI affect HDFC Bank?"),
+]
+NON_PARAPHRASES = [
+    ("How does monsoon season affect Reliance's supply chain?",
+     "How does monsoon season affect Zomato's delivery times?"),
+    ("What is the impact of rising crude prices on Indian airlines?",
+     "What is the impact of falling steel prices on Indian carmakers?"),
+    ("How will the RBI rate hike affect HDFC Bank?", "Who is the chief executive of HDFC Bank?"),
+]
+
+
+def fake_embed(query):
+    # Queries whose first words differ in length are orthogonal; a trailing "please" costs cosine ~0.96
+    vector = np.zeros(4, dtype=np.float32)
+    vector[len(query.split()[0]) % 3] = 1.0
+    vector[3] = 0.3 if query.endswith("please") else 0.0
+    return vector
+
+
+def test_exact_semantic_and_version_behaviour():
+    calls = []
+    cache = SemanticQueryCache(embed_fn=lambda query: calls.append(query) or fake_embed(query))
+    cache.put("Reliance supply chain?", "answer", version=1)
+
+    assert cache.get("  reliance SUPPLY chain ", version=1) == "answer"
+    assert cache.stats["exact_hits"] == 1 and calls == ["reliance supply chain"]
+
+    assert cache.get("reliance supply chain please", version=1) == "answer"
+    assert cache.stats["semantic_hits"] == 1
+
+    assert cache.get("reliance supply chain", version=2) is None
+    assert len(cache) == 0 and cache.stats["invalidations"] == 1
+
+
+def test_threshold_separates_paraphrases():
+    """
+    Calibration check for QUERY_CACHE_THRESHOLD on the encoder the app uses
+    """
+    pytest.importorskip("sentence_transformers")
+    huggingface_hub = pytest.importorskip("huggingface_hub")
+    # Only run against a locally cached model; a download attempt would make the suite slow and flaky
+    if not isinstance(huggingface_hub.try_to_load_from_cache(
+        f"sentence-transformers/{QUERY_CACHE_MODEL_NAME}", "config.json"
+    ), str):
+        pytest.skip(f"{QUERY_CACHE_MODEL_NAME} is not in the local model cache")
+    from utils import get_sentence_transformer
+    encoder = get_sentence_transformer(QUERY_CACHE_MODEL_NAME)
+
+    def similarity(first, second):
+        vectors = encoder.encode([first, second], convert_to_numpy=True, normalize_embeddings=True)
+        return float(vectors[0] @ vectors[1])
+
+    for first, second in PARAPHRASES:
+        assert similarity(first, second) >= QUERY_CACHE_THRESHOLD, (first, second)
+    for first, second in NON_PARAPHRASES:
+        assert similarity(first, second) < QUERY_CACHE_THRESHOLD, (first, second)
@@ -0,0 +1,16 @@
+import time
+
+from services.rate_limit_service import TokenBucket
+
+
+def test_burst_then_steady_rate():
+    bucket = TokenBucket(rate=20, capacity=5)
+    start = time.monotonic()
+    for _ in range(5):
+        bucket.acquire()
+    assert time.monotonic() - start < 0.05
+
+    for _ in range(4):
+        bucket.acquire()
+    # Four more tokens at 20 per second
+    assert time.monotonic() - start >= 0.18
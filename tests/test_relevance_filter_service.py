@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from services.relevance_filter_service import RelevanceFilter
+
+VOCABULARY = ["fuel", "diesel", "delivery", "rain", "cricket", "election"]
+
+
+class BagOfWordsEncoder:
+    """
+    Keyword-count vectors, so similarities are easy to reason about
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return np.array([[text.lower().count(word) for word in VOCABULARY] for text in texts], dtype=np.float32)
+
+
+def test_chunks_prepend_title_and_cap_length():
+    relevance = RelevanceFilter(BagOfWordsEncoder(), chunk_words=3, max_chunks=2)
+    text = "one two three four five six seven eight"
+
+    assert relevance.chunks("Title", text) == ["Title. one two three", "four five six"]
+    assert relevance.chunks("", "") == [""]
+    assert relevance.chunks("Only title", "") == ["Only title. "]
+
+
+def test_scores_take_the_best_chunk_and_encode_once():
+    encoder = BagOfWordsEncoder()
+    relevance = RelevanceFilter(encoder, chunk_words=4, max_chunks=4)
+    items = [
+        ("fuel", "Markets", "cricket cricket cricket cricket fuel fuel fuel fuel"),
+        ("fuel", "Sports", "cricket match tonight in the city"),
+        ("rain", "Weather", "rain halts delivery across the city"),
+    ]
+
+    scores = relevance.scores(items)
+    # Second chunk of the first article is all about fuel
+    assert scores[0] == pytest.approx(1.0)
+    assert scores[1] == pytest.approx(0.0)
+    assert 0.5 < scores[2] < 1.0
+    # One call for the distinct terms, one batched call for every chunk (two per article)
+    assert [len(call) for call in encoder.calls] == [2, 6]
+
+    relevance.scores(items)
+    assert len(encoder.calls) == 3, "term embeddings are cached"
+    assert relevance.scores([]) == []
+
+
+def test_relevant_updates_stats():
+    relevance = RelevanceFilter(BagOfWordsEncoder(), threshold=0.5, llm_seconds_per_article=2.0)
+    items = [
+        ("diesel", "Diesel up", "diesel prices rise again"),
+        ("diesel", "Election", "election results tonight"),
+        ("diesel", "Cricket", "cricket final"),
+    ]
+
+    assert relevance.relevant(items) == [True, False, False]
+    stats = relevance.stats
+    assert (stats["checked"], stats["dropped"]) == (3, 2)
+    assert stats["filter_seconds"] >= 0
+    assert stats["saved_seconds"] == pytest.approx(2 * 2.0 - stats["filter_seconds"])
@@ -0,0 +1,60 @@
+import threading
+import time
+
+import utils
+
+RESULTS = {
+    "fuel prices": [{"title": "Diesel up", "link": "https://www.livemint.com/fuel"}],
+    "monsoon": [{"title": "Rains arrive", "link": "https://www.reuters.com/rain"},
+                {"title": "Off-list", "link": "https://blog.example/rain"}],
+    "rates": [{"stories": [{"title": "Rates held", "link": "https://www.financialexpress.com/rates"}]}],
+}
+
+
+class FakeSearch:
+    """
+    Earlier terms answer last, so completion order is the reverse of input order
+    """
+
+    def __init__(self, broken=()):
+        self.broken = set(broken)
+        self.completed = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, term, timeout=30):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(0.05 * (len(RESULTS) - list(RESULTS).index(term)))
+        with self._lock:
+            self.in_flight -= 1
+            self.completed.append(term)
+        if term in self.broken:
+            raise ValueError("Invalid API key")
+        return RESULTS[term]
+
+
+def test_results_come_back_in_input_order(monkeypatch):
+    search = FakeSearch()
+    monkeypatch.setattr(utils, "search_term_news", search)
+
+    titles_links = utils.search_news(list(RESULTS), max_workers=3, requests_per_second=None)
+    assert search.completed == list(reversed(RESULTS)) and search.max_in_flight == 3
+    assert list(titles_links) == list(RESULTS)
+    assert titles_links == {
+        "fuel prices": {"Diesel up": "https://www.livemint.com/fuel"},
+        "monsoon": {"Rains arrive": "https://www.reuters.com/rain"},
+        "rates": {"Rates held": "https://www.financialexpress.com/rates"},
+    }
+
+
+def test_failed_query_is_reported_without_dropping_the_others(monkeypatch):
+    monkeypatch.setattr(utils, "search_term_news", FakeSearch(broken={"monsoon"}))
+    failures = {}
+
+    titles_links = utils.search_news(["rates", "monsoon", "fuel prices", "rates"], max_workers=2,
+                                     requests_per_second=None, failures=failures)
+    assert list(titles_links) == ["rates", "fuel prices"]
+    assert failures == {"monsoon": "Invalid API key"}
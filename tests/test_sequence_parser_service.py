@@ -0,0 +1,106 @@
+import importlib
+import json
+import random
+from unittest import mock
+
+import pytest
+
+from app_using_llama import parse_response
+from services.sequence_parser_service import CITATION_PATTERN, CitationStripper, IncrementalSequenceParser, format_sequence
+
+SEQUENCES = [
+    ["Monsoon [delayed]", "Crop \"yield\" falls", "Rural demand \\ slows"],
+    ["Fuel]] prices", "[Freight] costs"],
+    ["Rates", "Loans", "Housing", "Cement", "Steel"],
+]
+RESPONSES = [
+    json.dumps(SEQUENCES),
+    "Here is the list you asked for:\n```json\n" + json.dumps(SEQUENCES, indent=2) + "\n```\nHope it helps [1].",
+]
+
+
+def splits(text, seed=0):
+    """
+    The text cut into single characters, fixed-size and random pieces
+    """
+    generator = random.Random(seed)
+    yield list(text)
+    for size in (2, 3, 7):
+        yield [text[i:i + size] for i in range(0, len(text), size)]
+    for _ in range(20):
+        cuts = sorted(generator.sample(range(1, len(text)), 8))
+        yield [text[start:end] for start, end in zip([0] + cuts, cuts + [len(text)])]
+
+
+def render(deltas):
+    parser, rendered = IncrementalSequenceParser(), ""
+    for delta in deltas:
+        completed = parser.feed(delta)
+        for index, sequence in enumerate(completed, start=parser.count - len(completed) + 1):
+            rendered += format_sequence(index, sequence)
+    return rendered
+
+
+@pytest.mark.parametrize("response", RESPONSES)
+def test_split_deltas_render_like_parse_response(response):
+    expected = parse_response(json.dumps(SEQUENCES))
+    for deltas in splits(response):
+        assert render(deltas) == expected
+
+
+def test_sequences_are_returned_as_soon_as_they_close():
+    parser = IncrementalSequenceParser()
+    assert parser.feed('[["a", "b"], ["c", "d') == [["a", "b"]]
+    assert parser.feed('"]') == [["c", "d"]]
+    assert parser.feed("]") == [] and parser.count == 2
+
+
+@pytest.mark.parametrize("text", [
+    "Rates rise【4:0†source】 and【4:1†source】 loans slow",
+    "[[\"a【1†x】\", \"b\"]]【2†y】",
+    "unclosed 【marker at the end",
+    "【a【b】 nested and stray 】 brackets",
+])
+def test_citations_split_across_deltas_are_removed(text):
+    for deltas in splits(text):
+        stripper = CitationStripper()
+        stripped = "".join(stripper.feed(delta) for delta in deltas) + stripper.flush()
+        assert stripped == CITATION_PATTERN.sub("", text)
+
+
+def test_open_marker_is_held_back_until_closed():
+    stripper = CitationStripper()
+    assert stripper.feed("Rates rise【4:") == "Rates rise"
+    assert stripper.feed("0†source") == ""
+    assert stripper.feed("】 today") == " today"
+
+
+class FakeStreamingClient:
+    def __init__(self, deltas):
+        self.deltas = deltas
+
+    def stream_events(self, path, payload, headers=None):
+        yield "thread.run.created", "{}"
+        for delta in self.deltas:
+            yield "thread.message.delta", json.dumps({"delta": {"content": [{"type": "text", "text": {"value": delta}}]}})
+        yield "thread.run.completed", "{}"
+
+
+@pytest.fixture
+def app_triples_openai(monkeypatch):
+    # The module creates its assistant at import time; keep that off the network
+    import openai
+    monkeypatch.setattr(openai, "OpenAI", mock.MagicMock())
+    return importlib.import_module("app_triples_openai")
+
+
+def test_streamed_company_information_matches_parse_response(app_triples_openai, monkeypatch):
+    response = "Sure:【3:0†kg.txt】\n```json\n" + json.dumps(SEQUENCES)[:40] + "【3:1†kg.txt】" + json.dumps(SEQUENCES)[40:] + "\n```"
+    expected = app_triples_openai.parse_response(json.dumps(SEQUENCES))
+    assert expected.endswith("\n")
+
+    for deltas in splits(response, seed=1):
+        monkeypatch.setattr(app_triples_openai, "get_llm_client", lambda *args, **kwargs: FakeStreamingClient(deltas))
+        outputs = list(app_triples_openai.stream_company_information("Reliance", "asst_1", "healthcare"))
+        assert len(outputs) == len(SEQUENCES)
+        assert outputs[-1] == expected
@@ -0,0 +1,17 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_importing_utils_does_not_load_model_libraries():
+    # Heavy libraries must only be imported when a model is first requested (see get_shared_model)
+    code = (
+        "import sys, utils\n"
+        "loaded = [name for name in ('torch', 'transformers', 'sentence_transformers') if name in sys.modules]\n"
+        "assert not loaded, loaded\n"
+        "assert not utils._MODEL_REGISTRY\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,68 @@
+import time
+
+from services.work_queue_service import SQLiteWorkQueue
+
+
+def test_claim_complete_and_finish():
+    queue = SQLiteWorkQueue(":memory:")
+    run_id = queue.start_run(["a", "b", "a"])
+
+    first, second = queue.claim(run_id), queue.claim(run_id)
+    assert (first["payload"], first["attempts"]) == ("a", 1)
+    assert second["payload"] == "b"
+    assert queue.claim(run_id) is None
+    assert queue.finish_run(run_id) is False
+
+    queue.complete(first["id"])
+    queue.complete(second["id"])
+    assert queue.progress(run_id) == {"done": 2}
+    assert queue.finish_run(run_id) is True and queue.last_finished_at() is not None
+    # A finished run is not resumed
+    assert queue.start_run(["a"]) != run_id
+
+
+def test_fail_retries_until_max_attempts():
+    queue = SQLiteWorkQueue(":memory:", max_attempts=3)
+    run_id = queue.start_run(["flaky"])
+
+    for attempt in (1, 2, 3):
+        job = queue.claim(run_id)
+        assert job["attempts"] == attempt
+        queue.fail(job["id"], f"error {attempt}")
+    assert queue.claim(run_id) is None
+    assert queue.progress(run_id) == {"failed": 1}
+    assert queue.finish_run(run_id) is True
+
+
+def test_expired_lease_is_reclaimed():
+    queue = SQLiteWorkQueue(":memory:", lease_seconds=0.05, max_attempts=2)
+    run_id = queue.start_run(["a"])
+
+    job = queue.claim(run_id)
+    assert queue.claim(run_id) is None
+    assert job["id"] and queue.next_lease_expiry(run_id) > time.time()
+
+    time.sleep(0.06)
+    retry = queue.claim(run_id)
+    assert (retry["id"], retry["attempts"]) == (job["id"], 2)
+
+    # Abandoned again with no attempts left: failed rather than leased a third time
+    time.sleep(0.06)
+    assert queue.claim(run_id) is None
+    assert queue.progress(run_id) == {"failed": 1} and queue.next_lease_expiry(run_id) is None
+
+
+def test_resume_after_crash_keeps_finished_jobs_and_adds_new_terms(tmp_path):
+    path = str(tmp_path / "queue.sqlite")
+    queue = SQLiteWorkQueue(path, lease_seconds=0.05)
+    run_id = queue.start_run(["a", "b"])
+    queue.complete(queue.claim(run_id)["id"])
+    queue.claim(run_id)  # "b" is leased when the worker dies
+    del queue
+
+    restarted = SQLiteWorkQueue(path, lease_seconds=0.05)
+    assert restarted.start_run(["a", "b", "c"]) == run_id
+    assert restarted.progress(run_id) == {"done": 1, "running": 1, "pending": 1}
+
+    time.sleep(0.06)
+    assert [restarted.claim(run_id)["payload"] for _ in range(2)] == ["b", "c"]
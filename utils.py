@@ -1,53 +1,196 @@
-from transformers import BertTokenizer, BertModel
-import torch
 import requests
 import json, os
+import threading
+import numpy as np
 from serpapi import GoogleSearch
 from dotenv import load_dotenv
 from newspaper import Article
+from services.article_store_service import canonicalize_url
+from services.news_source_service import get_source_registry
+from services.rate_limit_service import TokenBucket
+from services.relevance_filter_service import RelevanceFilter
 
 load_dotenv()
 
 #from bs4 import BeautifulSoup
 import concurrent.futures
-from typing import Dict, List
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 
-tokenizer = BertTokenizer.from_pretrained('bert-base-uncased')
-model = BertModel.from_pretrained("bert-base-uncased")
+EMBEDDING_MODEL_NAME = 'bert-base-uncased'
+# Intra-op torch threads, set once when the first BERT model loads (0 keeps torch's default)
+ENCODER_THREADS = int(os.getenv('ENCODER_THREADS', 0))
+RELEVANCE_MODEL_NAME = 'all-MiniLM-L6-v2'
+# Minimum term/article cosine similarity; RELEVANCE_THRESHOLD=-1 keeps every article
+RELEVANCE_THRESHOLD = float(os.getenv('RELEVANCE_THRESHOLD', 0.25))
 
-def tuples_to_list(file_path, N=3):  
+# Process-wide model registry. Models are loaded on first use, once per name,
+# and survive Streamlit reruns because imported modules are not re-executed.
+# The lock is re-entrant so a loader may itself fetch another shared model.
+_MODEL_REGISTRY = {}
+_MODEL_REGISTRY_LOCK = threading.RLock()
+
+def get_shared_model(key: str, loader: Callable):
+    """
+    Return the model registered under `key`, calling `loader` only the first time
+    """
+    model = _MODEL_REGISTRY.get(key)
+    if model is None:
+        with _MODEL_REGISTRY_LOCK:
+            model = _MODEL_REGISTRY.get(key)
+            if model is None:
+                print(f"Loading model {key}")
+                model = loader()
+                _MODEL_REGISTRY[key] = model
+    return model
+
+def get_bert_model(model_name: str = EMBEDDING_MODEL_NAME):
+    """
+    Shared (tokenizer, model) pair for a BERT checkpoint, loaded lazily
+    """
+    def load():
+        import torch
+        from transformers import BertTokenizer, BertModel
+        # Process-wide setting, so it is applied here once rather than per request
+        if ENCODER_THREADS:
+            torch.set_num_threads(ENCODER_THREADS)
+        tokenizer = BertTokenizer.from_pretrained(model_name)
+        model = BertModel.from_pretrained(model_name)
+        model.eval()
+        return tokenizer, model
+    return get_shared_model(f"bert:{model_name}", load)
+
+def get_sentence_transformer(model_name: str, device: str = None):
+    """
+    Shared SentenceTransformer instance for a model name and device, loaded lazily
+    """
+    def load():
+        import torch
+        from sentence_transformers import SentenceTransformer
+        with torch.no_grad():
+            encoder = SentenceTransformer(model_name, device=device)
+            for param in encoder.parameters():
+                param.requires_grad = False
+        return encoder
+    return get_shared_model(f"sentence-transformers:{model_name}:{device}", load)
+
+TRIPLES_CACHE_VERSION = 1
+
+def parse_triple_line(line: str) -> Optional[Tuple[str, str, str]]:
+    """
+    Parse one knowledge-graph line into a (head, relation, tail) triple
+
+    Understands the quoted syntax ("a", "b", "c") used by tuples.txt and the
+    semicolon syntax (a; b; c) used by unique_output.txt, plus unquoted
+    (a, b, c) lines when they split into exactly three parts. Anything past
+    the third element is folded into the tail. Returns None for lines that
+    are not triples (headers, blank lines, free text).
+    """
+    line = line.strip()
+    if not (line.startswith('(') and line.endswith(')')):
+        return None
+    body = line[1:-1].strip()
+
+    if body.startswith('"') or body.startswith("'"):
+        parts = [part.strip().strip('"').strip("'") for part in body.split('", "')]
+    elif ';' in body:
+        parts = [part.strip() for part in body.split(';')]
+    else:
+        parts = [part.strip() for part in body.split(', ')]
+        if len(parts) != 3:
+            return None
+
+    if len(parts) < 3 or not parts[0] or not parts[1]:
+        return None
+    tail = " ".join(part for part in parts[2:] if part)
+    if not tail:
+        return None
+    return (parts[0], parts[1], tail)
+
+def iter_triples(file_path: str) -> Iterator[Tuple[str, str, str]]:
+    """
+    Stream unique triples from a file in first-seen order, deduping in one pass
+    """
+    seen = set()
     with open(file_path, 'r') as file:
-        # Reading all lines from the file
-        lines = file.readlines()
-        
-        # Create a list to store the tuples
-        tuple_list = []
-        elements = []
-        temp_ele = ""
-        # Iterate through each line and convert it into a tuple
-        for line in lines:
-            # Strip the newline character and split by the comma
-            raw_elements = line.strip().strip('()').split('", "')
-            elements = []
-            temp_ele = ""
-            for i in range(0, len(raw_elements)):
-                if i < 2:
-                    elements.append(raw_elements[i].strip('"').strip("'"))
-                else:
-                    temp_ele += raw_elements[i].strip('"').strip("'")
-                    if i == len(raw_elements) - 1:
-                        elements.append(temp_ele)
-                    else:
-                        temp_ele += " "
-
-            if len(elements) > 0 and elements != ['']:
-                tuple_list.append(tuple(elements))
-        
-        return list(set(sorted(tuple_list)))
-
-def generate_embeddings(text):
-    global model
-    global tokenizer
+        for line in file:
+            triple = parse_triple_line(line)
+            if triple is not None and triple not in seen:
+                seen.add(triple)
+                yield triple
+
+def _triples_cache_path(file_path: str) -> str:
+    return file_path + ".triples.npz"
+
+def _file_fingerprint(file_path: str) -> np.ndarray:
+    stat = os.stat(file_path)
+    return np.array([TRIPLES_CACHE_VERSION, stat.st_size, stat.st_mtime_ns], dtype=np.int64)
+
+def write_triples_cache(file_path: str, triples: List[Tuple[str, str, str]]) -> None:
+    """
+    Write triples as columnar arrays of interned string ids
+
+    The cache holds one UTF-8 blob of unique strings with their offsets and
+    three int32 id columns (heads, relations, tails), tagged with the source
+    file's size and mtime so a stale cache is never used.
+    """
+    string_ids: Dict[str, int] = {}
+    columns = np.empty((3, len(triples)), dtype=np.int32)
+    for i, triple in enumerate(triples):
+        for column, text in enumerate(triple):
+            columns[column, i] = string_ids.setdefault(text, len(string_ids))
+
+    encoded = [text.encode('utf-8') for text in string_ids]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(data) for data in encoded], out=offsets[1:])
+    blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+    tmp_path = _triples_cache_path(file_path) + ".tmp.npz"
+    np.savez(tmp_path, fingerprint=_file_fingerprint(file_path), blob=blob, offsets=offsets,
+             heads=columns[0], relations=columns[1], tails=columns[2])
+    os.replace(tmp_path, _triples_cache_path(file_path))
+
+def load_triples_cache(file_path: str) -> Optional[List[Tuple[str, str, str]]]:
+    """
+    Load triples from the binary cache, or None if it is missing or stale
+    """
+    try:
+        with np.load(_triples_cache_path(file_path)) as cache:
+            if not np.array_equal(cache['fingerprint'], _file_fingerprint(file_path)):
+                return None
+            blob = cache['blob'].tobytes()
+            offsets = cache['offsets'].tolist()
+            heads, relations, tails = cache['heads'].tolist(), cache['relations'].tolist(), cache['tails'].tolist()
+    except (FileNotFoundError, KeyError, ValueError, OSError):
+        return None
+
+    strings = [blob[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(len(offsets) - 1)]
+    return [(strings[h], strings[r], strings[t]) for h, r, t in zip(heads, relations, tails)]
+
+def tuples_to_list(file_path, N=3, use_cache=True):
+    """
+    Unique (head, relation, tail) triples from a file, in first-seen order
+
+    Args:
+        file_path: Triples file in quoted or semicolon syntax
+        N: Kept for backwards compatibility; triples always have three elements
+        use_cache: Read/write the binary cache next to the file so repeat loads skip parsing
+    """
+    if use_cache:
+        cached = load_triples_cache(file_path)
+        if cached is not None:
+            return cached
+
+    triples = list(iter_triples(file_path))
+    if use_cache:
+        try:
+            write_triples_cache(file_path, triples)
+        except OSError as e:
+            print(f"Error writing triples cache: {e}")
+    return triples
+
+def generate_embeddings(text, model_name: str = EMBEDDING_MODEL_NAME):
+    import torch
+    tokenizer, model = get_bert_model(model_name)
     encoded_input = tokenizer(text, return_tensors='pt')
     #output = model(**encoded_input)
     with torch.no_grad():
@@ -57,103 +200,311 @@ def generate_embeddings(text):
         sentence_embedding = last_hidden_states.mean(dim=1)  # Shape: [1, hidden_size]
         return sentence_embedding
 
-def calc_cosine_similarity(text: str, term: str) -> bool:
-    # Placeholder function for calculating cosine similarity.
-    # Replace with your actual implementation.
-    return True  # Assuming all texts are relevant for demonstration purposes.
+def generate_embeddings_batch(
+    texts: List[str],
+    batch_size: int = 64,
+    model_name: str = EMBEDDING_MODEL_NAME
+):
+    """
+    Embed many texts with padded, length-bucketed batches
 
-def extract_texts_concurrently(titles_links: Dict[str, Dict[str, str]]) -> Dict[str, Dict[str, Dict[str, str]]]:
-    def extract_article_text_newspaper3k(url: str) -> tuple:
-        print(f"Processing URL: {url}")
-        article = Article(url)
-        try:
-            article.download()
-        except Exception as e:
-            print(f"Error during download: {e}")
-            return (url, "")
-        try:
-            article.parse()
-        except Exception as e:
-            print(f"Error during parsing: {e}")
-            return (url, "")
-        article_text = article.text
-        return (url, article_text)
+    Texts are tokenized once, sorted by token length and grouped so every batch
+    carries as little padding as possible. Padding is masked out of the mean
+    pooling, so each row matches what generate_embeddings returns for that text.
 
-    results = {}
+    Args:
+        texts: Texts to embed
+        batch_size: Number of texts per forward pass
+        model_name: BERT checkpoint to encode with
+
+    Returns:
+        Tensor of shape [len(texts), hidden_size] in the input order
+    """
+    import torch
+    tokenizer, model = get_bert_model(model_name)
+    if not texts:
+        return torch.empty((0, model.config.hidden_size))
+
+    encoded = tokenizer(list(texts), truncation=True, max_length=512)
+    order = sorted(range(len(texts)), key=lambda i: len(encoded['input_ids'][i]))
+    embeddings = torch.empty((len(texts), model.config.hidden_size))
+
+    with torch.no_grad():
+        for start in range(0, len(order), batch_size):
+            batch_ids = order[start:start + batch_size]
+            features = [{key: encoded[key][i] for key in encoded.keys()} for i in batch_ids]
+            batch = tokenizer.pad(features, return_tensors='pt')
+            outputs = model(**batch)
+
+            # Mean over real tokens only
+            mask = batch['attention_mask'].unsqueeze(-1).to(outputs.last_hidden_state.dtype)
+            summed = (outputs.last_hidden_state * mask).sum(dim=1)
+            embeddings[batch_ids] = summed / mask.sum(dim=1).clamp(min=1)
+
+    return embeddings
+
+def get_relevance_filter(threshold: float = RELEVANCE_THRESHOLD, model_name: str = RELEVANCE_MODEL_NAME) -> RelevanceFilter:
+    """
+    Shared RelevanceFilter on the shared sentence-transformers encoder
+
+    One filter per model and threshold, so term embeddings stay cached across runs.
+    """
+    def load():
+        encoder = get_sentence_transformer(model_name)
+        return RelevanceFilter(
+            lambda texts: encoder.encode(texts, batch_size=64, convert_to_numpy=True, show_progress_bar=False),
+            threshold=threshold
+        )
+    return get_shared_model(f"relevance:{model_name}:{threshold}", load)
+
+def calc_cosine_similarity(text: str, term: str, threshold: float = RELEVANCE_THRESHOLD) -> bool:
+    """
+    Whether an article is relevant to a search term
 
+    Single-article form of the batched check extract_texts_concurrently runs.
+    """
+    return get_relevance_filter(threshold).relevant([(term, "", text)])[0]
+
+def download_article(url: str) -> Optional[Article]:
+    """
+    Download stage: fetch the HTML for one URL (network-bound)
+
+    Returns:
+        Article with its html set, or None if the download failed
+    """
+    print(f"Processing URL: {url}")
+    article = Article(url)
+    try:
+        article.download()
+    except Exception as e:
+        print(f"Error during download: {e}")
+        return None
+    return article
+
+def parse_article(article: Article) -> str:
+    """
+    Parse stage: extract the body text from a downloaded article (CPU-bound)
+    """
+    try:
+        article.parse()
+    except Exception as e:
+        print(f"Error during parsing: {e}")
+        return ""
+    return article.text
+
+def extract_texts_concurrently(
+    titles_links: Dict[str, Dict[str, str]],
+    download_workers: int = 16,
+    parse_workers: Optional[int] = None,
+    fetcher=None,
+    store=None,
+    offline: bool = False,
+    relevance_threshold: Optional[float] = RELEVANCE_THRESHOLD
+) -> Dict[str, Dict[str, Dict[str, str]]]:
+    """
+    Download and parse every article across all terms in one pipeline
+
+    Each distinct URL is fetched once, however many terms list it. Downloads
+    run on one shared I/O pool and every finished download is handed to a
+    small parse pool, so HTML parsing never holds up network workers. With
+    an article store, fresh articles are served from it without any network
+    I/O, stale ones are revalidated (conditional GET with the async fetcher)
+    and everything fetched is written back. Articles unrelated to their term
+    are dropped by the embedding relevance filter.
+
+    Args:
+        titles_links: {term: {title: url}}
+        download_workers: Concurrent downloads
+        parse_workers: Concurrent parsers (defaults to the CPU count)
+        fetcher: Optional AsyncArticleFetcher used instead of the thread pools
+        store: Optional ArticleStore consulted before fetching
+        offline: Serve whatever the store holds (stale or not) and fetch nothing
+        relevance_threshold: Drop articles whose embedding similarity to their term is below it (None keeps all)
+
+    Returns:
+        dict: {term: {title: {url: text}}} for every term, in input order
+    """
+    urls = list(dict.fromkeys(url for links in titles_links.values() for url in links.values()))
+    print(f"Extracting {len(urls)} unique URLs for {len(titles_links)} terms")
+
+    texts = {}
+    stored = store.get_many(urls) if store is not None else {}
+    validators = {}
+    for url, record in stored.items():
+        if offline or store.is_fresh(record):
+            texts[url] = record["text"]
+        else:
+            validators[url] = {"etag": record["etag"], "last_modified": record["last_modified"]}
+    # The same article often appears under differently-decorated links; fetch it once
+    representatives = {}
+    aliases = {}
+    for url in urls:
+        if url not in texts:
+            aliases[url] = representatives.setdefault(canonicalize_url(url), url)
+    pending = list(representatives.values())
+    if offline:
+        # Read-only callers (the Streamlit view) never touch the network
+        aliases, pending = {}, []
+    if store is not None:
+        print(f"Article store: {len(texts)} of {len(urls)} URLs fresh, fetching {len(pending)}")
+
+    # Successfully fetched articles, written back to the store
+    fetched = []
+    if fetcher is not None:
+        for url, result in fetcher.fetch_all(pending, validators).items():
+            if result.status == "not_modified" and url in stored:
+                texts[url] = stored[url]["text"]
+            else:
+                texts[url] = result.text
+            # An empty extraction is not cached, or it would be served as fresh for the whole TTL
+            if result.status in ("ok", "not_modified") and texts[url]:
+                fetched.append({"url": url, "text": texts[url], "etag": result.etag, "last_modified": result.last_modified})
+        pending = []
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, download_workers)) as download_pool, \
+         concurrent.futures.ThreadPoolExecutor(max_workers=parse_workers or os.cpu_count() or 1) as parse_pool:
+        downloads = {download_pool.submit(download_article, url): url for url in pending}
+        parses = {}
+        for future in concurrent.futures.as_completed(downloads):
+            url = downloads[future]
+            article = future.result()
+            if article is None:
+                texts[url] = ""
+            else:
+                parses[parse_pool.submit(parse_article, article)] = url
+
+        for future in concurrent.futures.as_completed(parses):
+            url = parses[future]
+            texts[url] = future.result()
+            if texts[url]:
+                fetched.append({"url": url, "text": texts[url]})
+
+    for url, representative in aliases.items():
+        texts[url] = texts.get(representative, "")
+
+    if store is not None:
+        store.put_many(fetched)
+
+    # Embed every (term, article) pair in one batch and drop the irrelevant ones before any LLM spend
+    items = [(term, title, texts.get(url, "")) for term, links in titles_links.items() for title, url in links.items()]
+    checked = [item for item in items if item[2]]
+    keep = {}
+    if relevance_threshold is not None and checked:
+        keep = dict(zip(checked, get_relevance_filter(relevance_threshold).relevant(checked)))
+
+    results = {}
     for term, links in titles_links.items():
         print(f"Processing term: {term}")
         term_results = {}
-
-        # Use ThreadPoolExecutor for concurrent text extraction
-        with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-            # Create futures for each URL
-            futures = {
-                executor.submit(extract_article_text_newspaper3k, url): title 
-                for title, url in links.items()
-            }
-
-            # Collect results as they complete
-            for future in concurrent.futures.as_completed(futures):
-                title = futures[future]
-                try:
-                    url, text = future.result()
-                    text_is_relevant = calc_cosine_similarity(text, term)
-                    if text_is_relevant:
-                        term_results[title] = {url: text}
-                except Exception as e:
-                    print(f"Error processing {title}: {e}")
-
+        for title, url in links.items():
+            text = texts.get(url, "")
+            if keep.get((term, title, text), True):
+                term_results[title] = {url: text}
         results[term] = term_results
-    print(f"type of results.values() is {type(list(results.values())[0])}")
-    return list(results.values())[0]
+    return results
+
+def flatten_term_texts(term_texts: Dict[str, Dict[str, Dict[str, str]]]) -> Dict[str, Dict[str, str]]:
+    """
+    Merge per-term results from extract_texts_concurrently into {title: {url: text}}
+    """
+    flattened = {}
+    for term_results in term_texts.values():
+        for title, url_text in term_results.items():
+            flattened.setdefault(title, url_text)
+    return flattened
 
 def isValidNews(url):
-    if "livemint.com" in url or "outlookbusiness.com" in url or "businesstoday.com" in url or "financialexpress.com" in url or "reuters.com" in url or "indiatoday.in" in url or "economictimes.indiatimes.com" in url or "techcrunch.com" in url:
-        return True
-    else:
-        return False 
-    
+    # Whitelisted sources live in services/news_source_service.py (or NEWS_SOURCES_PATH)
+    return get_source_registry().is_valid(url)
+
 def extract_titles_links(news_list, term):
-    titles_links = {}
-    for item in news_list:
-        if "stories" in item:
-            for story in item["stories"]:
-                if isValidNews(story["link"]):
-                    titles_links.update({story["title"] : story["link"]})
-        else:
-            if isValidNews(item["link"]):
-                titles_links.update({item["title"] : item["link"]})
-    return {term : titles_links}
+    return {term : get_source_registry().filter_links(news_list)}
 
-def search_news(search_terms):
-    titles_links = {}
+def search_term_news(term: str, timeout: float = 30) -> List[dict]:
+    """
+    Run one Google News query through SerpApi
+
+    Args:
+        term: Search term
+        timeout: Request timeout in seconds
+
+    Returns:
+        list: The raw news_results entries (raises if the response has none)
+    """
+    params = {
+    "q": term,
+    "api_key": os.getenv("SERP_API_KEY"),
+    "engine": "google_news",
+    "gl": "in",
+    "hl": "en",
+    "num": 5
+    }
 
-    for term in search_terms:
+    search = GoogleSearch(params)
+    # SerpApi's client defaults to a 60000 second timeout
+    search.timeout = timeout
+    results = search.get_dict()
+    print(f"keys for results of {term} : {list(results.keys())}")
+
+    if "news_results" not in results:
+        raise ValueError(results.get("error", "no news_results in response"))
+    return results["news_results"]
+
+def search_news(
+    search_terms: List[str],
+    max_workers: int = 8,
+    timeout: float = 30,
+    requests_per_second: Optional[float] = 5,
+    failures: Optional[Dict[str, str]] = None
+) -> Dict[str, Dict[str, str]]:
+    """
+    Fetch news links for every search term concurrently
+
+    Terms are queried on a bounded thread pool, so a full scrape takes
+    roughly as long as the slowest request. Results are merged in
+    search_terms order, giving the same mapping the serial loop produced;
+    terms that fail are left out and reported.
+
+    Args:
+        search_terms: Terms to search for
+        max_workers: Maximum number of concurrent SerpApi requests
+        timeout: Per-term request timeout in seconds
+        requests_per_second: Rate limit across all workers (None disables it)
+        failures: Optional dict filled with {term: error message} for failed terms
+
+    Returns:
+        dict: {term: {title: link}}
+    """
+    bucket = TokenBucket(requests_per_second) if requests_per_second else None
+
+    def fetch(term):
+        if bucket is not None:
+            bucket.acquire()
         print(f"Extracting Links for {term}")
+        return search_term_news(term, timeout)
 
-        params = {
-        "q": term,
-        "api_key": os.getenv("SERP_API_KEY"),
-        "engine": "google_news",
-        "gl": "in",
-        "hl": "en",
-        "num": 5
-        }
-
-        search = GoogleSearch(params)
-        results = search.get_dict()
-        print(f"keys for results : {results}")
-        
-        try:
-            news_results = results["news_results"]
-        except Exception as err:
-            print(f"Error while extracting news : {err}")
-            continue
+    news_by_term = {}
+    errors = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {executor.submit(fetch, term): term for term in dict.fromkeys(search_terms)}
+        for future in concurrent.futures.as_completed(futures):
+            term = futures[future]
+            try:
+                news_by_term[term] = future.result()
+            except Exception as err:
+                print(f"Error while extracting news for {term} : {err}")
+                errors[term] = str(err)
 
-        # Check if the request was successful
-        titles_links.update(extract_titles_links(news_results, term))
+    titles_links = {}
+    for term in dict.fromkeys(search_terms):
+        if term in news_by_term:
+            titles_links.update(extract_titles_links(news_by_term[term], term))
 
+    print(f"Fetched news for {len(news_by_term)}/{len(news_by_term) + len(errors)} terms")
+    if errors:
+        print(f"Failed terms : {sorted(errors)}")
+    if failures is not None:
+        failures.update(errors)
     return titles_links
 
 if __name__ == "__main__":
@@ -163,7 +514,7 @@ if __name__ == "__main__":
         print(f"{k} : {v}")
 
     # Extract texts
-    extracted_texts = extract_texts_concurrently(titles_links)
+    extracted_texts = flatten_term_texts(extract_texts_concurrently(titles_links))
     # Print results
     for title, url_text in extracted_texts.items():
         print(f"Title: {title}")